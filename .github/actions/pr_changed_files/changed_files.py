@@ -0,0 +1,158 @@
+"""
+
+Files changed by a Pull Request which match a list of patterns
+
+Patterns are matched one path component at a time, with fnmatch syntax: `recipes/*/config.yml`
+matches `recipes/zlib/config.yml` but not `recipes/zlib/all/config.yml`, and `*` or `**` never
+cross a `/`. They are compiled once into a single regular expression.
+
+The changed files come from the GitHub API (`--mode api`, the files of the Pull Request) or from
+git (`--mode git`, `git diff --name-status` between the merge-base of base and head, and head),
+which needs no network access when both commits are in the local clone. Removed files are never
+listed, renamed and copied files are listed under their new name.
+
+    python3 .github/actions/pr_changed_files/changed_files.py --mode git --base origin/master 'recipes/*/*/conanfile.py'
+
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+
+def _translate_component(pattern):
+    """Regular expression of a fnmatch pattern matching a single path component"""
+    i, n = 0, len(pattern)
+    result = []
+    while i < n:
+        c = pattern[i]
+        i += 1
+        if c == "*":
+            while i < n and pattern[i] == "*":
+                i += 1
+            result.append("[^/]*")
+        elif c == "?":
+            result.append("[^/]")
+        elif c == "[":
+            j = i
+            if j < n and pattern[j] == "!":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 1
+            if j >= n:
+                result.append("\\[")
+            else:
+                stuff = pattern[i:j].replace("\\", "\\\\")
+                i = j + 1
+                if stuff.startswith("!"):
+                    stuff = "^/" + stuff[1:]
+                elif stuff.startswith("^"):
+                    stuff = "\\" + stuff
+                result.append(f"[{stuff}]")
+        else:
+            result.append(re.escape(c))
+    return "".join(result)
+
+
+def compile_patterns(patterns):
+    """Single regular expression matching any of the patterns, None when there are no patterns"""
+    alternatives = []
+    for pattern in patterns:
+        components = [component for component in pattern.strip().replace("\\", "/").split("/")
+                      if component not in ("", ".")]
+        if components:
+            alternatives.append("/".join(_translate_component(component) for component in components))
+    if not alternatives:
+        return None
+    return re.compile("(?:" + "|".join(alternatives) + ")\\Z")
+
+
+def _git(*args):
+    return subprocess.run(["git"] + list(args), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          check=True).stdout.decode("utf-8", "surrogateescape")
+
+
+def _has_commit(revision):
+    return subprocess.run(["git", "cat-file", "-e", f"{revision}^{{commit}}"],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+
+
+def merge_base(base, head, remote="origin", deepen=100, max_fetches=10):
+    """Merge-base of base and head, fetching missing history from `remote` in shallow clones"""
+    for revision in (base, head):
+        if not _has_commit(revision):
+            _git("fetch", "--no-tags", "--depth=1", remote, revision)
+    for _ in range(max_fetches + 1):
+        try:
+            return _git("merge-base", base, head).strip()
+        except subprocess.CalledProcessError:
+            if _git("rev-parse", "--is-shallow-repository").strip() != "true":
+                raise
+            _git("fetch", "--no-tags", f"--deepen={deepen}", remote, base, head)
+    raise Exception(f"No merge-base between {base} and {head} after fetching {max_fetches * deepen} more commits")
+
+
+def git_changed_files(base, head="HEAD", remote="origin"):
+    """Files added, modified, renamed or copied between the merge-base of base and head, and head"""
+    start = merge_base(base, head, remote)
+    entries = _git("diff", "--name-status", "-z", "--no-ext-diff", start, head).split("\0")
+    files = []
+    i = 0
+    while i < len(entries) - 1:
+        status = entries[i]
+        if status[:1] in ("R", "C"):
+            # R100 old new
+            path = entries[i + 2]
+            i += 3
+        else:
+            path = entries[i + 1]
+            i += 2
+        if status[:1] != "D":
+            files.append(path)
+    return files
+
+
+def api_changed_files(repository, pull_request):
+    """Files of the Pull Request which were not removed, from the GitHub API"""
+    result = subprocess.run(["gh", "api", f"/repos/{repository}/pulls/{pull_request}/files", "--paginate"],
+                            capture_output=True, check=True)
+    return [f["filename"] for f in json.loads(result.stdout) if f["status"] != "removed"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the files changed by a Pull Request which match patterns.")
+    parser.add_argument("patterns", nargs="*", help="patterns of the files to check, one per line or argument.")
+    parser.add_argument("--mode", choices=["api", "git"], default="api", help="source of the changed files.")
+    parser.add_argument("--base", help="base revision (git mode).")
+    parser.add_argument("--head", default="HEAD", help="head revision (git mode, default: %(default)s).")
+    parser.add_argument("--remote", default="origin", help="remote to fetch missing history from (git mode).")
+    parser.add_argument("--repository", default=os.getenv("GITHUB_REPOSITORY"), help="owner/name (api mode).")
+    parser.add_argument("--pull-request", help="Pull Request number (api mode).")
+    parser.add_argument("--github-output", default=os.getenv("GITHUB_OUTPUT"),
+                        help="file the outputs are appended to (default: $GITHUB_OUTPUT, else stdout).")
+    args = parser.parse_args()
+
+    regex = compile_patterns(line for pattern in args.patterns for line in pattern.splitlines())
+    if args.mode == "git":
+        if not args.base:
+            parser.error("--base is required in git mode")
+        changed = git_changed_files(args.base, args.head, args.remote)
+    else:
+        changed = api_changed_files(args.repository, args.pull_request)
+    files = [path for path in changed if regex and regex.match(path)]
+
+    outputs = f"any_changed={'true' if files else 'false'}\nall_changed_files={' '.join(files)}\n"
+    if args.github_output:
+        with open(args.github_output, "a") as output_file:
+            output_file.write(outputs)
+    else:
+        sys.stdout.write(outputs)
+
+
+if __name__ == "__main__":
+    main()
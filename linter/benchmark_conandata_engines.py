@@ -0,0 +1,62 @@
+"""
+
+Compare the 'strictyaml' and 'fast' engines of conandata_yaml_linter.py
+
+Every file is validated by both engines in this process, one after the other, so the
+times only account for the validation and not for the interpreter start. The outputs
+of both engines must be identical, otherwise the script fails.
+
+"""
+
+import argparse
+import time
+
+from conandata_yaml_linter import ENGINES, is_valid_fast, lint_file
+from yaml_linting import expand_paths
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the engines of conandata_yaml_linter.py."
+    )
+    parser.add_argument(
+        "path",
+        nargs="*",
+        default=["recipes/*/*/conandata.yml"],
+        help="files to validate, glob patterns (quoted) are expanded (default: %(default)s).",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="number of runs for each engine, the best one is kept.")
+    args = parser.parse_args()
+
+    paths = expand_paths(parser, args.path)
+    outputs = {}
+    timings = {}
+    for engine in ENGINES:
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            outputs[engine] = [lint_file(path, engine=engine) for path in paths]
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[engine] = best
+
+    fast_path = sum(1 for path in paths if is_valid_fast(_read(path)))
+    print(f"{len(paths)} files, {fast_path} validated by the fast path only")
+    for engine in ENGINES:
+        print(f"{engine:>12}: {timings[engine]:8.3f}s ({timings[engine] * 1000 / max(1, len(paths)):.2f} ms/file)")
+    print(f"{'speedup':>12}: {timings['strictyaml'] / max(timings['fast'], 1e-9):8.2f}x")
+
+    mismatches = [path for path, a, b in zip(paths, outputs["strictyaml"], outputs["fast"]) if a != b]
+    for path in mismatches:
+        print(f"Output differs between engines: {path}")
+    if mismatches:
+        raise SystemExit(1)
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+if __name__ == "__main__":
+    main()
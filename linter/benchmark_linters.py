@@ -0,0 +1,365 @@
+"""
+
+Benchmark the linters of the repository over fixed sets of recipes, and compare with a baseline
+
+For every subset of recipes (`sample`, a fixed list of recipes, or `full`, the whole tree):
+
+ * `pylint:recipe` and `pylint:test_package`: an in-process pylint run with pylintrc_recipe and
+   pylintrc_testpackage over the conanfiles, starting from empty astroid caches.
+ * `transform:<function>`: the time spent in each transform of transform_conanfile.py and
+   transform_imports.py (predicate included) during those runs.
+ * `checker:<class>`: each checker of conanv2_transition.py alone, walking the already parsed
+   conanfiles of the recipes and test packages.
+ * `yaml:conandata[<engine>]` and `yaml:config`: conandata_yaml_linter.py and config_yaml_linter.py
+   over the conandata.yml and config.yml files, in this process.
+
+Every timing is the best of `--repeat` runs. The results are written as JSON.
+
+`--compare-root` benchmarks the linter of another checkout (e.g. the base of a Pull Request) in
+the same run: the two linters are run alternately, each time in a new process, so that both see
+the same load of the machine. The script fails when a benchmark of this linter is more than
+`--max-slowdown` times the one of the other linter, and its fastest run is slower than the
+slowest run of the other linter. No threshold is in seconds, the timings of a shared CI runner
+vary too much from one run to another:
+
+    python3 linter/benchmark_linters.py --compare-root ../base --output head.json
+
+`--root` benchmarks the linter of another checkout, and `--baseline` prints the ratios with the
+results of a previous run, without checking them.
+
+"""
+
+import argparse
+import glob
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_RECIPES = [
+    "abseil", "boost", "cmake", "ffmpeg", "fmt", "grpc", "gtest", "libcurl", "libpng", "llvm-core",
+    "meson", "opencv", "openssl", "poco", "protobuf", "qt", "spdlog", "sqlite3", "xz_utils", "zlib",
+]
+SUBSETS = ["sample", "full"]
+TRANSFORM_MODULES = ["linter.transform_conanfile", "linter.transform_imports"]
+
+
+def subset_files(recipes_dir, subset):
+    """{kind: paths} of the files of a subset of the recipes"""
+    names = SAMPLE_RECIPES if subset == "sample" else ["*"]
+    files = {"recipe": [], "test_package": [], "conandata": [], "config": []}
+    for name in names:
+        folder = os.path.join(recipes_dir, name)
+        files["recipe"].extend(glob.glob(os.path.join(folder, "*", "conanfile.py")))
+        files["test_package"].extend(glob.glob(os.path.join(folder, "*", "test_*package", "conanfile.py")))
+        files["conandata"].extend(glob.glob(os.path.join(folder, "*", "conandata.yml")))
+        files["config"].extend(glob.glob(os.path.join(folder, "config.yml")))
+    return {kind: sorted(paths) for kind, paths in files.items()}
+
+
+def _load(root):
+    """Import the linter of `root`: plugins as `linter.xxx`, the YAML linters as scripts do"""
+    for path in (root, os.path.join(root, "linter")):
+        if path in sys.path:
+            sys.path.remove(path)
+        sys.path.insert(0, path)
+    # This script is in a `linter` folder too, make sure the modules of `root` are the ones imported
+    for name in list(sys.modules):
+        if name == "linter" or name.startswith("linter."):
+            del sys.modules[name]
+    modules = {name: importlib.import_module(name) for name in ["linter.conanv2_transition"] + TRANSFORM_MODULES}
+    for name in ("conandata_yaml_linter", "config_yaml_linter"):
+        sys.modules.pop(name, None)
+        modules[name] = importlib.import_module(name)
+    return modules
+
+
+class _TransformTimer:
+    """Wrap the astroid transforms registered by the linter modules, accumulating their time"""
+
+    def __init__(self, manager):
+        self.transforms = manager._transform.transforms  # pylint: disable=protected-access
+        self.times = {}
+        self.original = {}
+
+    def _timed(self, name, function):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.times[name] = self.times.get(name, 0.0) + time.perf_counter() - start
+        return wrapper
+
+    def __enter__(self):
+        for node_class, transforms in self.transforms.items():
+            self.original[node_class] = list(transforms)
+            for i, (transform, predicate) in enumerate(transforms):
+                module = getattr(transform, "__module__", "") or ""
+                if module.startswith("linter."):
+                    name = f"transform:{transform.__name__}"
+                    self.times.setdefault(name, 0.0)
+                    transforms[i] = (self._timed(name, transform), predicate and self._timed(name, predicate))
+        return self
+
+    def __exit__(self, *_):
+        for node_class, transforms in self.original.items():
+            self.transforms[node_class][:] = transforms
+
+
+def _best(function, repeat):
+    """(best time, result of the last run)"""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_pylint(root, files, repeat):
+    """Timings of complete pylint runs, and of the transforms during those runs"""
+    from astroid import MANAGER
+    from pylint.lint import Run
+    from pylint.reporters import CollectingReporter
+
+    timings = {}
+    transform_best = {}
+    for kind, rcfile in (("recipe", "pylintrc_recipe"), ("test_package", "pylintrc_testpackage")):
+        if not files[kind]:
+            continue
+        best = None
+        for _ in range(repeat):
+            MANAGER.clear_cache()
+            with _TransformTimer(MANAGER) as timer:
+                start = time.perf_counter()
+                Run([f"--rcfile={os.path.join(root, 'linter', rcfile)}", "--score=n", "--disable=duplicate-code"]
+                    + files[kind], reporter=CollectingReporter(), exit=False)
+                elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+            for name, seconds in timer.times.items():
+                transform_best.setdefault(name, {}).setdefault(kind, []).append(seconds)
+        timings[f"pylint:{kind}"] = best
+    for name, by_kind in transform_best.items():
+        timings[name] = sum(min(times) for times in by_kind.values())
+    return timings
+
+
+def bench_checkers(transition, files, repeat):
+    """Time of each checker alone walking the parsed conanfiles, and its number of messages"""
+    from astroid import MANAGER
+    from astroid.builder import AstroidBuilder
+    from pylint.lint import PyLinter
+    from pylint.reporters import CollectingReporter
+    from pylint.utils import ASTWalker, FileState
+
+    linter = PyLinter()
+    linter.set_reporter(CollectingReporter())
+    transition.register(linter)
+    checkers = [checker for checker in linter.get_checkers() if checker is not linter]
+    for checker in checkers:
+        for msgid in checker.msgs:
+            linter.enable(msgid)
+
+    paths = files["recipe"] + files["test_package"]
+    timings, messages = {}, {}
+    for checker in checkers:
+        walker = ASTWalker(linter)
+        walker.add_checker(checker)
+        best = None
+        for _ in range(repeat):
+            # Parsed again for each run, so the inference results of a previous walk aren't reused
+            modules = []
+            for path in paths:
+                try:
+                    modules.append(AstroidBuilder(MANAGER).file_build(path, "conanfile"))
+                except Exception:  # pylint: disable=broad-except
+                    continue
+            linter.reporter.messages = []
+            start = time.perf_counter()
+            for module in modules:
+                linter.set_current_module(module.name, module.file)
+                linter.file_state = FileState(module.name, linter.msgs_store, module)
+                walker.walk(module)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        name = f"checker:{type(checker).__name__}"
+        timings[name] = best
+        messages[name] = len(linter.reporter.messages)
+    return timings, messages
+
+
+def _script_runs(module, paths):
+    """Run a YAML linter as a script over each file, for the linters without `lint_file()`"""
+    for path in paths:
+        subprocess.run([sys.executable, module.__file__, path], stdout=subprocess.DEVNULL, check=False)
+
+
+def bench_yaml(modules, files, repeat):
+    """Timings of the YAML linters, and notes on the ones timed as a process per file"""
+    conandata = modules["conandata_yaml_linter"]
+    config = modules["config_yaml_linter"]
+    timings, notes = {}, {}
+    for engine in getattr(conandata, "ENGINES", ["strictyaml"]):
+        name = f"yaml:conandata[{engine}]"
+        if hasattr(conandata, "ENGINES"):
+            timings[name], _ = _best(
+                lambda engine=engine: [conandata.lint_file(path, engine=engine) for path in files["conandata"]], repeat)
+        elif hasattr(conandata, "lint_file"):
+            timings[name], _ = _best(lambda: [conandata.lint_file(path) for path in files["conandata"]], repeat)
+        else:
+            timings[name], _ = _best(lambda: _script_runs(conandata, files["conandata"]), repeat)
+            notes[name] = "a process per file, this linter has no lint_file()"
+    if hasattr(config, "lint_file"):
+        timings["yaml:config"], _ = _best(lambda: [config.lint_file(path) for path in files["config"]], repeat)
+    else:
+        timings["yaml:config"], _ = _best(lambda: _script_runs(config, files["config"]), repeat)
+        notes["yaml:config"] = "a process per file, this linter has no lint_file()"
+    return timings, notes
+
+
+def run(root, recipes_dir, subsets, repeat, skip_pylint=False):
+    modules = _load(root)
+    from pylint import __version__ as pylint_version
+    from astroid import __version__ as astroid_version
+
+    result = {"python": platform.python_version(), "pylint": pylint_version, "astroid": astroid_version,
+              "root": root, "repeat": repeat, "subsets": {}}
+    for subset in subsets:
+        files = subset_files(recipes_dir, subset)
+        timings = {}
+        messages = {}
+        if not skip_pylint:
+            timings.update(bench_pylint(root, files, repeat))
+        checker_timings, messages = bench_checkers(modules["linter.conanv2_transition"], files, repeat)
+        timings.update(checker_timings)
+        yaml_timings, notes = bench_yaml(modules, files, repeat)
+        timings.update(yaml_timings)
+        result["subsets"][subset] = {"files": {kind: len(paths) for kind, paths in files.items()},
+                                     "timings": timings, "messages": messages, "notes": notes}
+        print(f"{subset}: " + ", ".join(f"{len(paths)} {kind}" for kind, paths in files.items()), file=sys.stderr)
+    return result
+
+
+def _merge(results):
+    """One result of several runs of the same linter: best and slowest time of every benchmark"""
+    merged = dict(results[0], repeat=len(results), subsets={})
+    for subset, first in results[0]["subsets"].items():
+        runs = [result["subsets"][subset]["timings"] for result in results]
+        merged["subsets"][subset] = dict(
+            first,
+            timings={name: min(timings[name] for timings in runs) for name in first["timings"]},
+            slowest={name: max(timings[name] for timings in runs) for name in first["timings"]},
+        )
+    return merged
+
+
+def run_alternately(root, other_root, recipes_dir, subsets, repeat, skip_pylint=False):
+    """(result, other result), the linters of both roots being run alternately in new processes"""
+    # A process can only import the linter of one root
+    runs = {root: [], other_root: []}
+    with tempfile.TemporaryDirectory() as folder:
+        output = os.path.join(folder, "result.json")
+        for _ in range(repeat):
+            for path in (other_root, root):
+                command = [sys.executable, os.path.abspath(__file__), "--root", path, "--recipes", recipes_dir,
+                           "--repeat", "1", "--output", output, "--subset"] + subsets
+                subprocess.run(command + (["--skip-pylint"] if skip_pylint else []), check=True)
+                with open(output, encoding="utf-8") as f:
+                    runs[path].append(json.load(f))
+    return _merge(runs[root]), _merge(runs[other_root])
+
+
+def compare(result, baseline, max_slowdown):
+    """Rows (subset, name, baseline, current, ratio, regression) of the timings of both results
+
+    A regression is more than `max_slowdown` times slower than the baseline, and slower than all
+    the runs of the baseline. Only the results of `run_alternately` know their slowest runs.
+    """
+    rows = []
+    for subset, current in result["subsets"].items():
+        previous = baseline.get("subsets", {}).get(subset, {})
+        for name, seconds in sorted(current["timings"].items()):
+            before = previous.get("timings", {}).get(name)
+            if before is None:
+                rows.append((subset, name, None, seconds, None, False))
+                continue
+            ratio = seconds / before if before else float("inf")
+            slowest = previous.get("slowest", {}).get(name)
+            regression = slowest is not None and ratio > max_slowdown and seconds > slowest
+            rows.append((subset, name, before, seconds, ratio, regression))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the pylint plugins and the YAML linters over the recipes, and compare with a baseline."
+    )
+    parser.add_argument("--subset", choices=SUBSETS, nargs="+", default=["sample"],
+                        help="recipes to lint, a fixed sample or every recipe (default: %(default)s).")
+    parser.add_argument("--root", default=ROOT_DIR, help="repository whose linter is benchmarked (default: this one).")
+    parser.add_argument("--recipes", default=os.path.join(ROOT_DIR, "recipes"),
+                        help="recipes folder (default: %(default)s).")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of each benchmark, the best one is kept.")
+    parser.add_argument("--skip-pylint", action="store_true",
+                        help="don't time complete pylint runs nor the transforms (slow over the full tree).")
+    parser.add_argument("--output", help="write the results to this JSON file (default: stdout).")
+    parser.add_argument("--compare-root",
+                        help="repository whose linter is benchmarked alternately with this one, and compared.")
+    parser.add_argument("--baseline", help="JSON results of a previous run to print the ratios with, not checked.")
+    parser.add_argument("--max-slowdown", type=float, default=1.5,
+                        help="with --compare-root, fail when a timing is this many times the one of the other "
+                             "linter (default: %(default)s).")
+    args = parser.parse_args()
+
+    if args.compare_root and args.baseline:
+        parser.error("--compare-root and --baseline are exclusive")
+    if args.compare_root:
+        result, baseline = run_alternately(os.path.abspath(args.root), os.path.abspath(args.compare_root),
+                                           os.path.abspath(args.recipes), args.subset, args.repeat,
+                                           args.skip_pylint)
+        result["baseline"] = baseline
+    else:
+        result = run(os.path.abspath(args.root), os.path.abspath(args.recipes), args.subset, args.repeat,
+                     args.skip_pylint)
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    elif not args.baseline and not args.compare_root:
+        print(output)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    elif args.compare_root:
+        baseline = result["baseline"]
+    else:
+        return
+
+    rows = compare(result, baseline, args.max_slowdown)
+    print("| subset | benchmark | baseline | current | ratio |")
+    print("|---|---|---:|---:|---:|")
+    for subset, name, before, seconds, ratio, regression in rows:
+        before_text = f"{before:.3f}s" if before is not None else "-"
+        ratio_text = f"{ratio:.2f}x" if ratio is not None else "new"
+        print(f"| {subset} | {name} | {before_text} | {seconds:.3f}s | {ratio_text}{' :x:' if regression else ''} |")
+    notes = [f"{subset} {name} ({label}): {note}" for label, timed in (("baseline", baseline), ("current", result))
+             for subset, results in timed.get("subsets", {}).items()
+             for name, note in sorted(results.get("notes", {}).items())]
+    if notes:
+        print("\n" + "\n".join(f" * {note}" for note in notes))
+    regressions = [row for row in rows if row[5]]
+    if regressions:
+        print(f"\n{len(regressions)} benchmarks are more than {args.max_slowdown}x slower than the other linter")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+
+Measure the time of a cold pylint run over single conanfiles, with and without the Conan stubs
+
+Each run is a new pylint process, as in a pre-commit hook, linting one file. The Conan classes
+used by transform_conanfile.py are read from linter/conan_v1_stubs.py ('stubs') or parsed
+from the installed Conan modules ('conan', CCI_LINTER_CONAN_STUBS=0).
+
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+DEFAULT_FILES = [
+    "recipes/fmt/all/conanfile.py",
+    "recipes/zlib/all/conanfile.py",
+    "recipes/openssl/3.x.x/conanfile.py",
+    "recipes/boost/all/conanfile.py",
+    "recipes/fmt/all/test_package/conanfile.py",
+]
+MODES = {"conan": "0", "stubs": "1"}
+
+
+def time_pylint(path, rcfile, use_stubs):
+    env = dict(os.environ, CCI_LINTER_CONAN_STUBS=use_stubs)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "pylint", f"--rcfile={rcfile}", "--exit-zero", path],
+                   stdout=subprocess.DEVNULL, env=env, check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark cold pylint runs over single conanfiles, with and without the Conan stubs."
+    )
+    parser.add_argument("files", nargs="*", default=DEFAULT_FILES, help="conanfiles to lint (default: a few recipes).")
+    parser.add_argument("--rcfile", default="linter/pylintrc_recipe", help="pylint rcfile (default: %(default)s).")
+    parser.add_argument("--repeat", type=int, default=3, help="runs for each file and mode, the best one is kept.")
+    args = parser.parse_args()
+
+    best = {mode: [] for mode in MODES}
+    print(f"{'file':<50} {'conan':>8} {'stubs':>8}")
+    for path in args.files:
+        row = {}
+        for mode, use_stubs in MODES.items():
+            row[mode] = min(time_pylint(path, args.rcfile, use_stubs) for _ in range(args.repeat))
+            best[mode].append(row[mode])
+        print(f"{path:<50} {row['conan']:7.2f}s {row['stubs']:7.2f}s")
+
+    conan, stubs = statistics.mean(best["conan"]), statistics.mean(best["stubs"])
+    print(f"{'mean':<50} {conan:7.2f}s {stubs:7.2f}s ({(conan - stubs) * 1000:.0f} ms saved per file)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+"""
+
+Plan (and run) the builds of many recipes on N workers, longest critical path first
+
+A job is a version of a recipe. It requires the newest version, among the scheduled jobs, that
+matches each of its requirements in the static recipe index. The rank of a job is its duration
+plus the largest rank of the jobs requiring it: the time still needed, once it starts, to build
+everything depending on it. Ready jobs are started by decreasing rank (list scheduling, like
+HEFT on identical workers), so the long chains under qt, llvm-core, boost or grpc start first.
+
+Durations are the mean build time of each recipe recorded by hook_build_timing.py (see
+build_times.py), recipes never recorded use the median of the recorded ones. Without any timing
+the rank is the length of the longest chain of builds.
+
+With `--run`, every worker builds in a Conan home of its own: the Conan 2 cache is not safe for
+concurrent processes, two builds of a missing shared requirement would race. The worker homes
+(under `--homes-dir`) get the configuration of the current home (profiles, remotes, hooks...)
+and the packages of the jobs built by other workers, moved with `conan cache save/restore`
+(Conan >= 2.0.14). Conan 1 locks its cache, its workers share the current one.
+
+    python3 linter/build_scheduler.py --workers 8
+    python3 linter/build_scheduler.py zlib openssl/3.2.1 --workers 4 --run --conan-args "-pr:a ci -b missing"
+
+"""
+
+import argparse
+import heapq
+import json
+import os
+import shlex
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from build_times import DEFAULT_DB as DEFAULT_TIMINGS_DB, _conan, conan_major, format_duration, mean_durations
+from recipe_graph import DEFAULT_KINDS, RecipeGraph, _version_key, version_matches
+from recipe_impact import parse_changes
+from recipe_index import REQUIREMENT_KINDS, ROOT_DIR, add_index_arguments, open_index
+
+
+DEFAULT_LOG_DIR = os.path.join(ROOT_DIR, ".build_logs")
+DEFAULT_HOMES_DIR = os.path.join(ROOT_DIR, ".build_homes")
+
+
+class Job:
+    """Build of a version of a recipe"""
+
+    def __init__(self, name, version, folder, duration, estimated):
+        self.name = name
+        self.version = version
+        self.folder = folder
+        self.duration = duration
+        # No build of the recipe was recorded
+        self.estimated = estimated
+        self.requires = set()
+        self.consumers = set()
+        self.rank = 0.0
+
+    @property
+    def key(self):
+        return self.name, self.version
+
+    @property
+    def reference(self):
+        return f"{self.name}/{self.version}"
+
+
+def select_jobs(graph, changes=None, latest=False):
+    """{name: versions} to build: the changes and everything downstream, or the whole index"""
+    if changes:
+        selected = graph.downstream(parse_changes(graph, changes))
+    else:
+        selected = {name: set(versions) for name, versions in graph.versions.items()}
+    if latest:
+        selected = {name: {max(versions, key=_version_key)} for name, versions in selected.items() if versions}
+    return selected
+
+
+def build_jobs(graph, selected, durations):
+    """{(name, version): Job} of the selected versions, with their requirements among them"""
+    default = statistics.median(durations.values()) if durations else 1.0
+    jobs = {}
+    for name, versions in selected.items():
+        for version in versions:
+            folder = graph.versions.get(name, {}).get(version)
+            if folder is not None:
+                jobs[(name, version)] = Job(name, version, folder, durations.get(name, default), name not in durations)
+    scheduled = defaultdict(list)
+    for name, version in jobs:
+        scheduled[name].append(version)
+
+    for job in jobs.values():
+        for dependency, rows in graph.requires.get(job.name, {}).items():
+            for row in rows:
+                if row["folder"] != job.folder:
+                    continue
+                # Conan resolves a range to the newest version
+                matching = [version for version in scheduled.get(dependency, ())
+                            if version_matches(version, row["require_version"])]
+                if matching:
+                    job.requires.add((dependency, max(matching, key=_version_key)))
+    return jobs
+
+
+def break_cycles(jobs):
+    """Drop the requirements closing a cycle, return them as (job, requirement) keys"""
+    removed = []
+    state = {}
+    for root in sorted(jobs):
+        if root in state:
+            continue
+        # Iterative depth-first search, state 1 while on the stack and 2 once done
+        state[root] = 1
+        stack = [(root, iter(sorted(jobs[root].requires)))]
+        while stack:
+            key, requirements = stack[-1]
+            for requirement in requirements:
+                if requirement not in state:
+                    state[requirement] = 1
+                    stack.append((requirement, iter(sorted(jobs[requirement].requires))))
+                    break
+                if state[requirement] == 1:
+                    removed.append((key, requirement))
+            else:
+                state[key] = 2
+                stack.pop()
+    for key, requirement in removed:
+        jobs[key].requires.discard(requirement)
+    return removed
+
+
+def compute_ranks(jobs):
+    """Link the consumers of every job and set its rank, the jobs must not have cycles"""
+    for job in jobs.values():
+        job.consumers.clear()
+    for job in jobs.values():
+        for requirement in job.requires:
+            jobs[requirement].consumers.add(job.key)
+    # Reverse topological order: a job comes after every job requiring it
+    pending = {key: len(job.consumers) for key, job in jobs.items()}
+    ready = [key for key, count in pending.items() if not count]
+    while ready:
+        key = ready.pop()
+        job = jobs[key]
+        job.rank = job.duration + max((jobs[consumer].rank for consumer in job.consumers), default=0.0)
+        for requirement in job.requires:
+            pending[requirement] -= 1
+            if not pending[requirement]:
+                ready.append(requirement)
+
+
+def critical_path(jobs):
+    """Jobs of the longest chain of builds"""
+    if not jobs:
+        return []
+    job = max(jobs.values(), key=lambda job: (job.rank, job.key))
+    path = [job]
+    while job.consumers:
+        job = max((jobs[consumer] for consumer in job.consumers), key=lambda job: (job.rank, job.key))
+        path.append(job)
+    return path
+
+
+def _by_rank(job):
+    return -job.rank, job.key
+
+
+def _alphabetical(job):
+    return job.key
+
+
+def simulate(jobs, workers, priority=_by_rank):
+    """List scheduling of the jobs on `workers` identical workers
+
+    Returns the plan as a list of (start, finish, worker, job) sorted by start, and the makespan.
+    """
+    pending = {key: len(job.requires) for key, job in jobs.items()}
+    ready = [(priority(job), key) for key, job in jobs.items() if not job.requires]
+    heapq.heapify(ready)
+    idle = list(range(workers))
+    running = []
+    plan = []
+    now = 0.0
+    while ready or running:
+        while ready and idle:
+            _, key = heapq.heappop(ready)
+            worker = idle.pop(0)
+            plan.append((now, now + jobs[key].duration, worker, jobs[key]))
+            heapq.heappush(running, (now + jobs[key].duration, key, worker))
+        now, key, worker = heapq.heappop(running)
+        idle.append(worker)
+        idle.sort()
+        for consumer in jobs[key].consumers:
+            pending[consumer] -= 1
+            if not pending[consumer]:
+                heapq.heappush(ready, (priority(jobs[consumer]), consumer))
+    return plan, now
+
+
+def create_command(job, recipes_dir, major, conan_args=()):
+    path = os.path.join(recipes_dir, job.name, job.folder)
+    if major == 1:
+        return ["conan", "create", path, f"{job.reference}@"] + list(conan_args)
+    return ["conan", "create", path, "--version", job.version] + list(conan_args)
+
+
+def _run(command, log, env):
+    log.write("$ " + " ".join(shlex.quote(argument) for argument in command) + "\n")
+    log.flush()
+    return subprocess.run(command, stdout=log, stderr=subprocess.STDOUT, env=env, check=False).returncode
+
+
+def _create(command, log_path, home=None, restore=(), save=None):
+    """Run a `conan create` into a log file, return (return code, seconds)
+
+    With a Conan 2 `home`, the `restore` archives are restored into it first, and the package is
+    saved to the `save` archive after a successful build.
+    """
+    env = dict(os.environ, CONAN_HOME=home) if home else None
+    start = time.monotonic()
+    with open(log_path, "w", encoding="utf-8") as log:
+        returncode = 0
+        for archive in restore:
+            returncode = _run(["conan", "cache", "restore", archive], log, env)
+            if returncode != 0:
+                break
+        if returncode == 0:
+            returncode = _run(command, log, env)
+        if returncode == 0 and save:
+            reference, archive = save
+            returncode = _run(["conan", "cache", "save", f"{reference}:*", "--file", archive], log, env)
+    return returncode, time.monotonic() - start
+
+
+def prepare_homes(homes_dir, workers):
+    """Conan 2 homes of the workers, with the configuration of the current home and an empty cache"""
+    current = _conan("config", "home")
+    homes = []
+    for worker in range(workers):
+        home = os.path.join(homes_dir, f"worker-{worker}")
+        shutil.rmtree(home, ignore_errors=True)
+        # `p` is the package storage
+        shutil.copytree(current, home, ignore=lambda folder, names: ["p"] if folder == current else [])
+        homes.append(home)
+    os.makedirs(os.path.join(homes_dir, "packages"), exist_ok=True)
+    return homes
+
+
+def _upstream(jobs, key):
+    """Keys of the jobs `key` requires, directly or not"""
+    upstream = set()
+    stack = list(jobs[key].requires)
+    while stack:
+        requirement = stack.pop()
+        if requirement not in upstream:
+            upstream.add(requirement)
+            stack.extend(jobs[requirement].requires)
+    return upstream
+
+
+def execute(jobs, workers, recipes_dir, conan_args=(), log_dir=DEFAULT_LOG_DIR, homes_dir=DEFAULT_HOMES_DIR):
+    """Build the jobs with `workers` concurrent `conan create`, highest rank first
+
+    Consumers of a failed job are skipped. Returns {key: (status, seconds)}.
+    """
+    os.makedirs(log_dir, exist_ok=True)
+    major = conan_major()
+    homes = prepare_homes(homes_dir, workers) if major >= 2 else None
+    # Packages of the jobs built by each worker or restored in its home
+    present = [set() for _ in range(workers)]
+    idle = list(range(workers))
+    pending = {key: len(job.requires) for key, job in jobs.items()}
+    ready = [(_by_rank(job), key) for key, job in jobs.items() if not job.requires]
+    heapq.heapify(ready)
+    results = {}
+
+    def archive(key):
+        return os.path.join(homes_dir, "packages", f"{jobs[key].name}-{jobs[key].version}.tgz")
+
+    def skip(key):
+        for consumer in sorted(jobs[key].consumers):
+            if consumer not in results:
+                results[consumer] = ("skipped", 0.0)
+                print(f"[{len(results)}/{len(jobs)}] {jobs[consumer].reference}: skipped, "
+                      f"{jobs[key].reference} was not built")
+                skip(consumer)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        running = {}
+        while ready or running:
+            while ready and idle:
+                _, key = heapq.heappop(ready)
+                job = jobs[key]
+                worker = idle.pop(0)
+                log_path = os.path.join(log_dir, f"{job.name}-{job.version}.log")
+                command = create_command(job, recipes_dir, major, conan_args)
+                if homes:
+                    missing = sorted(_upstream(jobs, key) - present[worker])
+                    present[worker].update(missing)
+                    future = executor.submit(_create, command, log_path, homes[worker],
+                                             [archive(requirement) for requirement in missing],
+                                             (job.reference, archive(key)))
+                else:
+                    future = executor.submit(_create, command, log_path)
+                running[future] = key, worker
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                key, worker = running.pop(future)
+                idle.append(worker)
+                idle.sort()
+                present[worker].add(key)
+                returncode, seconds = future.result()
+                status = "ok" if returncode == 0 else "failed"
+                results[key] = (status, seconds)
+                print(f"[{len(results)}/{len(jobs)}] {jobs[key].reference}: {status} in {seconds:.0f}s")
+                if returncode != 0:
+                    skip(key)
+                    continue
+                for consumer in jobs[key].consumers:
+                    pending[consumer] -= 1
+                    if not pending[consumer] and consumer not in results:
+                        heapq.heappush(ready, (_by_rank(jobs[consumer]), consumer))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Plan the builds of recipes on N workers, longest critical path first, and optionally run them."
+    )
+    parser.add_argument("changes", nargs="*",
+                        help="changed files or references, their consumers are built too (default: every recipe).")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="concurrent builds (default: %(default)s).")
+    parser.add_argument("--latest", action="store_true", help="only build the newest version of each recipe.")
+    parser.add_argument("--kinds", nargs="+", default=list(DEFAULT_KINDS), choices=REQUIREMENT_KINDS,
+                        help="requirements to follow, build_requires are the same as tool_requires "
+                             "(default: %(default)s).")
+    parser.add_argument("--timings-db", default=DEFAULT_TIMINGS_DB,
+                        help="database of hook_build_timing.py (default: %(default)s).")
+    parser.add_argument("--top", type=int, default=30, help="jobs of the plan to show (default: %(default)s).")
+    parser.add_argument("--json", action="store_true", help="print the plan as JSON.")
+    parser.add_argument("--run", action="store_true", help="build the plan with `conan create`.")
+    parser.add_argument("--conan-args", default="", help="extra arguments of `conan create`, e.g. \"-pr:a ci\".")
+    parser.add_argument("--log-dir", default=DEFAULT_LOG_DIR, help="logs of the builds (default: %(default)s).")
+    parser.add_argument("--homes-dir", default=DEFAULT_HOMES_DIR,
+                        help="Conan 2 homes of the workers, recreated by `--run` (default: %(default)s).")
+    add_index_arguments(parser)
+    args = parser.parse_args()
+
+    with open_index(args.db, args.recipes) as index:
+        graph = RecipeGraph.from_index(index, kinds=args.kinds)
+        recipes_dir = index.recipes_dir
+    jobs = build_jobs(graph, select_jobs(graph, args.changes, args.latest), mean_durations(args.timings_db))
+    cycles = break_cycles(jobs)
+    compute_ranks(jobs)
+    plan, makespan = simulate(jobs, args.workers)
+
+    if args.json:
+        print(json.dumps({
+            "workers": args.workers,
+            "makespan": makespan,
+            "cycles": [[f"{a}/{b}" for a, b in cycle] for cycle in cycles],
+            "jobs": [{"reference": job.reference, "folder": job.folder, "worker": worker, "start": start,
+                      "duration": job.duration, "estimated": job.estimated, "rank": job.rank,
+                      "requires": sorted(f"{name}/{version}" for name, version in job.requires)}
+                     for start, _, worker, job in plan],
+        }, indent=2))
+    else:
+        _, alphabetical = simulate(jobs, args.workers, _alphabetical)
+        estimated = sum(1 for job in jobs.values() if job.estimated)
+        print(f"{len(jobs)} builds on {args.workers} workers, {estimated} without recorded duration")
+        print(f"Estimated makespan: {format_duration(makespan)} "
+              f"({format_duration(alphabetical)} in alphabetical order)")
+        path = critical_path(jobs)
+        if path:
+            print(f"Critical path ({format_duration(path[0].rank)}): " + " -> ".join(job.reference for job in path))
+        for job, requirement in cycles:
+            print(f"Requirement cycle: ignored {job[0]}/{job[1]} -> {requirement[0]}/{requirement[1]}",
+                  file=sys.stderr)
+        print(f"{'start':>8} {'duration':>8} {'rank':>8} worker  reference")
+        for start, _, worker, job in plan[:args.top]:
+            duration = format_duration(job.duration) + ("*" if job.estimated else "")
+            print(f"{format_duration(start):>8} {duration:>8} {format_duration(job.rank):>8} {worker:>6}  "
+                  f"{job.reference}")
+
+    if args.run:
+        results = execute(jobs, args.workers, recipes_dir, shlex.split(args.conan_args), args.log_dir,
+                          args.homes_dir)
+        failed = sorted(jobs[key].reference for key, (status, _) in results.items() if status == "failed")
+        print(f"{len(results)} builds: {len(failed)} failed, logs in {args.log_dir}")
+        if failed:
+            print("Failed: " + ", ".join(failed), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
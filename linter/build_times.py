@@ -0,0 +1,201 @@
+"""
+
+Install the build timing hook, and rank the recipes by build cost from the timings it recorded
+
+A build is the set of phases recorded for a reference by one Conan process (one `conan create`):
+export, source, build, package, package_info and the build and test of its test_package. The
+cost of a build is the sum of the wall time of its phases. The commands of build() are split
+in configure, compile and install steps.
+
+    python3 linter/build_times.py install
+    conan create recipes/zlib/all --version 1.3.1
+    python3 linter/build_times.py report --top 20
+
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from hook_build_timing import DEFAULT_DB
+
+
+HOOK_NAME = "hook_build_timing"
+HOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{HOOK_NAME}.py")
+PHASES = ["export", "source", "build", "package", "package_info", "test_build", "test"]
+STEPS = ["configure", "compile", "install", "other"]
+
+
+def _conan(*args):
+    return subprocess.run(["conan"] + list(args), stdout=subprocess.PIPE, check=True, text=True).stdout.strip()
+
+
+def conan_major():
+    """Major version of the conan client in the PATH"""
+    return int(_conan("--version").split()[-1].split(".")[0])
+
+
+def hooks_folder():
+    """(folder of the hooks of the current Conan home, Conan major version)"""
+    major = conan_major()
+    home = _conan("config", "home")
+    if major == 1:
+        return os.path.join(home, "hooks"), 1
+    return os.path.join(home, "extensions", "hooks"), 2
+
+
+def install(uninstall=False):
+    folder, major = hooks_folder()
+    destination = os.path.join(folder, f"{HOOK_NAME}.py")
+    if uninstall:
+        if major == 1:
+            subprocess.run(["conan", "config", "rm", f"hooks.{HOOK_NAME}"], check=False)
+        if os.path.exists(destination):
+            os.remove(destination)
+        print(f"Removed {destination}")
+        return
+    os.makedirs(folder, exist_ok=True)
+    shutil.copy2(HOOK_PATH, destination)
+    if major == 1:
+        # Conan 1.x only runs the hooks listed in conan.conf
+        _conan("config", "set", f"hooks.{HOOK_NAME}")
+    print(f"Installed {destination}, timings are written to {DEFAULT_DB}")
+
+
+def load_builds(db_path=DEFAULT_DB, since=None, names=None):
+    """Builds recorded in the database, as dicts with the wall time of each phase and step"""
+    if not os.path.exists(db_path):
+        return []
+    connection = sqlite3.connect(db_path)
+    connection.row_factory = sqlite3.Row
+    try:
+        sql = "SELECT run, reference, name, version, package_id, phase, wall, cpu, peak_rss_kb, success FROM timings"
+        parameters = []
+        if since is not None:
+            sql += " WHERE started >= ?"
+            parameters.append(since)
+        rows = connection.execute(sql, parameters).fetchall()
+    finally:
+        connection.close()
+
+    builds = {}
+    for row in rows:
+        if row["name"] is None or (names and row["name"] not in names):
+            continue
+        build = builds.setdefault((row["run"], row["reference"]), {
+            "reference": row["reference"], "name": row["name"], "version": row["version"], "package_id": None,
+            "phases": defaultdict(float), "steps": defaultdict(float), "cpu": 0.0, "peak_rss_kb": 0, "failed": False,
+        })
+        phase, _, step = row["phase"].partition(":")
+        if step:
+            if phase == "build":
+                build["steps"][step] += row["wall"]
+        else:
+            build["phases"][phase] += row["wall"]
+            build["cpu"] += row["cpu"] or 0.0
+        if row["package_id"] and phase == "build":
+            build["package_id"] = row["package_id"]
+        build["peak_rss_kb"] = max(build["peak_rss_kb"], row["peak_rss_kb"] or 0)
+        build["failed"] = build["failed"] or not row["success"]
+    for build in builds.values():
+        build["wall"] = sum(build["phases"].values())
+    # Exports and package_info() alone are not builds
+    return [build for build in builds.values() if {"source", "build", "test_build"} & set(build["phases"])]
+
+
+def recipe_costs(builds):
+    """Cost of each recipe name, sorted by total build time"""
+    recipes = {}
+    for build in builds:
+        recipe = recipes.setdefault(build["name"], {
+            "name": build["name"], "builds": 0, "total": 0.0, "cpu": 0.0, "peak_rss_kb": 0,
+            "phases": defaultdict(float), "steps": defaultdict(float), "versions": set(),
+        })
+        recipe["builds"] += 1
+        recipe["total"] += build["wall"]
+        recipe["cpu"] += build["cpu"]
+        recipe["peak_rss_kb"] = max(recipe["peak_rss_kb"], build["peak_rss_kb"])
+        recipe["versions"].add(build["version"])
+        for phase, wall in build["phases"].items():
+            recipe["phases"][phase] += wall
+        for step, wall in build["steps"].items():
+            recipe["steps"][step] += wall
+    for recipe in recipes.values():
+        recipe["mean"] = recipe["total"] / recipe["builds"]
+        # CPU time for each second of wall time, close to 1 for a serial build
+        recipe["parallelism"] = recipe["cpu"] / recipe["total"] if recipe["total"] else 0.0
+        recipe["versions"] = sorted(version for version in recipe["versions"] if version)
+    return sorted(recipes.values(), key=lambda recipe: recipe["total"], reverse=True)
+
+
+def mean_durations(db_path=DEFAULT_DB, since=None):
+    """{name: mean seconds of a build} of the recorded recipes"""
+    return {recipe["name"]: recipe["mean"] for recipe in recipe_costs(load_builds(db_path, since))}
+
+
+def format_duration(seconds):
+    """`12.3s`, `4.5m` or `1.2h`, `-` for None"""
+    if seconds is None:
+        return "-"
+    if seconds >= 3600:
+        return f"{seconds / 3600:.1f}h"
+    if seconds >= 60:
+        return f"{seconds / 60:.1f}m"
+    return f"{seconds:.1f}s"
+
+
+def report(recipes, top=None):
+    recipes = recipes[:top] if top else recipes
+    columns = ["source", "configure", "compile", "install", "package", "test"]
+    print(f"{'recipe':30} {'builds':>6} {'total':>8} {'mean':>8} " + " ".join(f"{c:>9}" for c in columns)
+          + f" {'cpu/wall':>8} {'peak RSS':>9}")
+    for recipe in recipes:
+        builds = recipe["builds"]
+        means = {
+            "source": recipe["phases"]["source"],
+            "configure": recipe["steps"]["configure"],
+            "compile": recipe["steps"]["compile"],
+            "install": recipe["steps"]["install"],
+            "package": recipe["phases"]["package"],
+            "test": recipe["phases"]["test_build"] + recipe["phases"]["test"],
+        }
+        print(f"{recipe['name']:30} {builds:>6} {format_duration(recipe['total']):>8} "
+              f"{format_duration(recipe['mean']):>8} "
+              + " ".join(f"{format_duration(means[column] / builds):>9}" for column in columns)
+              + f" {recipe['parallelism']:>8.1f} {recipe['peak_rss_kb'] / 1024:>7.0f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record the time spent building recipes, and rank them by build cost.")
+    subparsers = parser.add_subparsers(dest="command")
+    install_parser = subparsers.add_parser("install", help="install the timing hook in the current Conan home.")
+    install_parser.add_argument("--uninstall", action="store_true", help="remove the hook instead.")
+    report_parser = subparsers.add_parser("report", help="rank the recipes by build cost (default).")
+    report_parser.add_argument("names", nargs="*", help="only report these recipes.")
+    report_parser.add_argument("--db", default=DEFAULT_DB, help="timings database (default: %(default)s).")
+    report_parser.add_argument("--days", type=float, default=None, help="only use the builds of the last N days.")
+    report_parser.add_argument("--top", type=int, default=None, help="only show the N most expensive recipes.")
+    report_parser.add_argument("--json", action="store_true", help="print the results as JSON.")
+    args = parser.parse_args(sys.argv[1:] or ["report"])
+
+    if args.command == "install":
+        install(args.uninstall)
+        return
+    since = time.time() - args.days * 86400 if args.days else None
+    recipes = recipe_costs(load_builds(args.db, since, set(args.names)))
+    if args.json:
+        print(json.dumps(recipes[:args.top] if args.top else recipes, indent=2))
+    elif not recipes:
+        print(f"No build recorded in {args.db}")
+    else:
+        report(recipes, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import re
+
+from pylint.checkers import BaseChecker
+from pylint.interfaces import IAstroidChecker
+from astroid import nodes
+
+WHY_SERIAL_BUILD = "Build tools run directly with `self.run()` build with a single job unless they are told otherwise. " \
+                   "Use the CMake, Meson, Autotools or MSBuild helpers which pass the number of jobs of the profile, or pass " \
+                   "it explicitly, e.g. `self.run(f\"make -j{build_jobs(self)}\")` with `from conan.tools.build import build_jobs`. " \
+                   "`nmake` can't build in parallel, `jom` is a parallel replacement."
+WHY_SINGLE_JOB_BUILD = "The build tool or helper is given a single job explicitly (`-j1`, `--parallel 1`, `/m:1`...), " \
+                       "which ignores the number of jobs of the profile. Remove it, or disable the message with a " \
+                       "comment explaining why the build can't run in parallel."
+
+# Tools which build serially unless given a job count
+SERIAL_TOOLS = ["make", "gmake", "mingw32-make", "nmake", "b2", "bjam", "msbuild", "scons", "cmake"]
+# Tools which build in parallel by default, only reported with an explicit single job
+PARALLEL_TOOLS = ["ninja", "jom"]
+
+_JOBS = {
+    "msbuild": re.compile(r"(?:^|\s)[/-](?:m|maxcpucount)(?::(\S+))?(?=\s|$)", re.IGNORECASE),
+    "cmake": re.compile(r"(?:^|\s)(?:--parallel|-j)(?:[\s=]+([^-\s]\S*))?(?=\s|$)"),
+}
+_DEFAULT_JOBS = re.compile(r"(?:^|\s)(?:-j|--jobs)(?:[\s=]*([^-\s]\S*))?(?=\s|$)")
+_SINGLE_JOB = re.compile(r"""(?:^|\s)["']?(?:-j\s*1|--jobs[\s=]1|[/-]m:1|--parallel[\s=]1)["']?(?=\s|$)""", re.IGNORECASE)
+
+
+_TOOL_PLACEHOLDER = re.compile(r"(?:^|[._])(nmake|mingw32_make|make|b2|msbuild|jom|ninja)(?:_program|_cmd|_exe|_path)?(?:\(\))?$",
+                               re.IGNORECASE)
+# Properties and variables followed to find the text of a command
+_MAX_DEPTH = 4
+
+
+def _command_texts(node, methods, depth=0):
+    """Possible texts of a command, expressions which can't be resolved become `{expression}`
+
+    Local variables and properties of the recipe are followed: `self.run(self._make_cmd)`.
+    """
+    if isinstance(node, nodes.Const) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, nodes.JoinedStr):
+        return ["".join(value.value if isinstance(value, nodes.Const) else "{" + value.value.as_string() + "}"
+                        for value in node.values)]
+    if depth < _MAX_DEPTH:
+        if isinstance(node, nodes.BinOp) and node.op == "+":
+            return [left + right for left in _command_texts(node.left, methods, depth + 1)
+                    for right in _command_texts(node.right, methods, depth + 1)]
+        if isinstance(node, nodes.BinOp) and node.op == "%" and isinstance(node.left, nodes.Const) \
+                and isinstance(node.left.value, str):
+            # "make %s" % target or "%s %s" % (make, extra)
+            arguments = iter(node.right.elts if isinstance(node.right, nodes.Tuple) else [node.right])
+
+            def substitute(match):
+                if match.group() == "%%":
+                    return "%"
+                argument = next(arguments, None)
+                return "{}" if argument is None else _command_texts(argument, methods, depth + 1)[0]
+            return [re.sub(r"%%|%[sdr]", substitute, node.left.value)]
+        if isinstance(node, nodes.IfExp):
+            return _command_texts(node.body, methods, depth + 1) + _command_texts(node.orelse, methods, depth + 1)
+        if isinstance(node, nodes.Call) and isinstance(node.func, nodes.Attribute) \
+                and isinstance(node.func.expr, nodes.Const) and isinstance(node.func.expr.value, str):
+            # " ".join(["make", "-j4"]) or "make {}".format(target)
+            if node.func.attrname == "join" and node.args and isinstance(node.args[0], (nodes.List, nodes.Tuple)):
+                return [node.func.expr.value.join(_command_texts(element, methods, depth + 1)[0]
+                                                  for element in node.args[0].elts)]
+            if node.func.attrname == "format":
+                template = node.func.expr.value
+                for argument in node.args + [keyword.value for keyword in node.keywords or []]:
+                    template = re.sub(r"{[^}]*}", lambda _, argument=argument: "{" + argument.as_string() + "}",
+                                      template, count=1)
+                return [template]
+        if isinstance(node, nodes.Attribute) and isinstance(node.expr, nodes.Name) and node.expr.name == "self" \
+                and node.attrname in methods and methods[node.attrname].decoratornames() & {"builtins.property"}:
+            # self._make_cmd, a property
+            texts = []
+            for statement in methods[node.attrname].nodes_of_class(nodes.Return, skip_klass=nodes.FunctionDef):
+                if statement.value is not None:
+                    texts.extend(_command_texts(statement.value, methods, depth + 1))
+            if texts:
+                return texts
+        if isinstance(node, nodes.Name):
+            # command = f"nmake -f makefile.vc"; self.run(command)
+            _, assignments = node.lookup(node.name)
+            texts, resolved = [], False
+            for assignment in assignments:
+                if isinstance(assignment, nodes.AssignName) and isinstance(assignment.parent, nodes.Assign):
+                    value = assignment.parent.value
+                    value_texts = _command_texts(value, methods, depth + 1)
+                    texts.extend(value_texts)
+                    resolved = resolved or value_texts != ["{" + value.as_string() + "}"]
+            if resolved:
+                return texts
+            # make = tools.get_env("CONAN_MAKE_PROGRAM", ...): the name of the variable tells the tool
+            return ["{" + node.name + "}"]
+    return ["{" + node.as_string() + "}"]
+
+
+def _tool(words):
+    """Build tool run by a command, None when it isn't one"""
+    for word in words:
+        if "=" in word and not word.startswith("{"):
+            # Environment variables: CC=clang make
+            continue
+        word = word.strip("\"'")
+        if word.startswith("{") and word.endswith("}"):
+            # {self._make_program} or {nmake}
+            match = _TOOL_PLACEHOLDER.search(word[1:-1])
+            if match:
+                return match.group(1).lower().replace("_", "-")
+            continue
+        name = word.replace("\\", "/").rsplit("/", 1)[-1].lower()
+        name = name[:-4] if name.endswith(".exe") else name
+        if name == "cmake":
+            return "cmake" if "--build" in words else None
+        return name if name in SERIAL_TOOLS + PARALLEL_TOOLS else None
+    return None
+
+
+def serial_invocations(command):
+    """Build tools of a command (which may chain several with && or ;) which run with a single job
+
+    Returns (tool, forced) pairs, `forced` when the command asks for a single job explicitly.
+    """
+    serial = []
+    for part in re.split(r"&&|\|\||;|\|", command):
+        words = part.split()
+        tool = _tool(words)
+        if tool is None or (tool in ("make", "gmake", "mingw32-make", "nmake") and "install" in words):
+            # `make install` follows the actual build
+            continue
+        if tool == "nmake":
+            serial.append((tool, False))
+            continue
+        arguments = " ".join(words[1:])
+        match = _JOBS.get(tool, _DEFAULT_JOBS).search(arguments)
+        if match is None:
+            if tool in SERIAL_TOOLS:
+                serial.append((tool, False))
+        elif match.group(1) == "1":
+            serial.append((tool, True))
+    return serial
+
+
+class SerialBuild(BaseChecker):
+    """
+       Build tools invoked from build() should run with the number of jobs of the profile
+
+       Known gaps: commands built over several statements (`command += " -j4"`) and values which are
+       neither literals, recipe properties nor local variables are not followed.
+    """
+
+    __implements__ = IAstroidChecker
+
+    name = "conan-serial-build"
+    msgs = {
+        "W9015": (
+            "`%s` is invoked without a job count, the recipe builds with a single job",
+            "conan-serial-build",
+            WHY_SERIAL_BUILD,
+        ),
+        "W9016": (
+            "`%s` is forced to a single job",
+            "conan-single-job-build",
+            WHY_SINGLE_JOB_BUILD,
+        ),
+    }
+
+    def visit_classdef(self, node: nodes.ClassDef) -> None:
+        methods = {method.name: method for method in node.mymethods()}
+        if "build" not in methods:
+            return
+        # MAKEFLAGS="-j..." in the environment makes every make invocation parallel
+        make_flags = any(isinstance(const.value, str) and const.value == "MAKEFLAGS"
+                         for const in node.nodes_of_class(nodes.Const))
+
+        # build() and the methods it calls, self._build_xxx()
+        reachable, pending = set(), ["build"]
+        while pending:
+            name = pending.pop()
+            if name in reachable:
+                continue
+            reachable.add(name)
+            for call in methods[name].nodes_of_class(nodes.Call):
+                if isinstance(call.func, nodes.Attribute) and isinstance(call.func.expr, nodes.Name) \
+                        and call.func.expr.name == "self" and call.func.attrname in methods:
+                    pending.append(call.func.attrname)
+
+        for name in sorted(reachable):
+            for call in methods[name].nodes_of_class(nodes.Call):
+                self._check_call(call, methods, make_flags)
+
+    def _check_call(self, call: nodes.Call, methods: dict, make_flags: bool) -> None:
+        if isinstance(call.func, nodes.Attribute) and call.func.attrname == "run" \
+                and isinstance(call.func.expr, nodes.Name) and call.func.expr.name == "self" and call.args:
+            tools = set()
+            for command in _command_texts(call.args[0], methods):
+                tools.update(serial_invocations(command))
+            for tool, forced in sorted(tools):
+                if make_flags and not forced and tool in ("make", "gmake", "mingw32-make"):
+                    continue
+                self.add_message("conan-single-job-build" if forced else "conan-serial-build", node=call, args=(tool,),
+                                 line=call.lineno)
+            return
+        # autotools.make(args=["-j1"]), cmake.build(cli_args=["--parallel", "1"])...
+        for argument in call.args + [keyword.value for keyword in call.keywords or []]:
+            elements = argument.elts if isinstance(argument, (nodes.List, nodes.Tuple)) else [argument]
+            # The elements of a list are separate arguments: ["--parallel", "1"]
+            arguments = " ".join(element.value for element in elements
+                                 if isinstance(element, nodes.Const) and isinstance(element.value, str))
+            if _SINGLE_JOB.search(arguments):
+                self.add_message("conan-single-job-build", node=call, args=(call.func.as_string(),), line=call.lineno)
+                return
@@ -0,0 +1,583 @@
+# Generated by linter/generate_conan_stubs.py, do not edit.
+# Conan version: 1.64.1
+# pylint: skip-file
+
+from collections import OrderedDict
+from conans.client.build.cppstd_flags import cppstd_default
+from conans.client.file_copier import report_copied_files
+from conans.client.graph.graph import CONTEXT_HOST
+from conans.client.tools.win import MSVS_DEFAULT_TOOLSETS_INVERSE
+from conans.errors import ConanException
+from conans.model.env_info import EnvValues
+from conans.model.info import PACKAGE_ID_INVALID
+from conans.model.info import PACKAGE_ID_UNKNOWN
+from conans.model.info import PythonRequiresInfo
+from conans.model.info import RequirementsInfo
+from conans.model.info import _PackageReferenceList
+from conans.model.options import OptionsValues
+from conans.model.ref import ConanFileReference
+from conans.model.values import Values
+from conans.paths import CONANINFO
+from conans.util.config_parser import ConfigParser
+from conans.util.files import load
+from conans.util.files import mkdir
+from conans.util.files import walk
+from conans.util.sha import sha1
+import fnmatch
+import os
+import shutil
+
+
+# From conans.model.info
+class ConanInfo(object):
+
+    def copy(self):
+        """ Useful for build_id implementation
+        """
+        result = ConanInfo()
+        result.invalid = self.invalid
+        result.settings = self.settings.copy()
+        result.options = self.options.copy()
+        result.requires = self.requires.copy()
+        result.python_requires = self.python_requires.copy()
+        return result
+
+    @staticmethod
+    def create(settings, options, prefs_direct, prefs_indirect, default_package_id_mode, python_requires, default_python_requires_id_mode):
+        result = ConanInfo()
+        result.invalid = None
+        result.full_settings = settings
+        result.settings = settings.copy()
+        result.full_options = options
+        result.options = options.copy()
+        result.options.clear_indirect()
+        result.full_requires = _PackageReferenceList(prefs_direct)
+        result.requires = RequirementsInfo(prefs_direct, default_package_id_mode)
+        result.requires.add(prefs_indirect, default_package_id_mode)
+        result.full_requires.extend(prefs_indirect)
+        result.recipe_hash = None
+        result.env_values = EnvValues()
+        result.vs_toolset_compatible()
+        result.discard_build_settings()
+        result.default_std_matching()
+        result.python_requires = PythonRequiresInfo(python_requires, default_python_requires_id_mode)
+        return result
+
+    @staticmethod
+    def loads(text):
+        parser = ConfigParser(text, ['settings', 'full_settings', 'options', 'full_options', 'requires', 'full_requires', 'scope', 'recipe_hash', 'env'], raise_unexpected_field=False)
+        result = ConanInfo()
+        result.invalid = None
+        result.settings = Values.loads(parser.settings)
+        result.full_settings = Values.loads(parser.full_settings)
+        result.options = OptionsValues.loads(parser.options)
+        result.full_options = OptionsValues.loads(parser.full_options)
+        result.full_requires = _PackageReferenceList.loads(parser.full_requires)
+        result.requires = RequirementsInfo(result.full_requires, 'semver_direct_mode')
+        result.recipe_hash = parser.recipe_hash or None
+        result.env_values = EnvValues.loads(parser.env)
+        return result
+
+    def dumps(self):
+
+        def indent(text):
+            if not text:
+                return ''
+            return '\n'.join(('    ' + line for line in text.splitlines()))
+        result = list()
+        result.append('[settings]')
+        result.append(indent(self.settings.dumps()))
+        result.append('\n[requires]')
+        result.append(indent(self.requires.dumps()))
+        result.append('\n[options]')
+        result.append(indent(self.options.dumps()))
+        result.append('\n[full_settings]')
+        result.append(indent(self.full_settings.dumps()))
+        result.append('\n[full_requires]')
+        result.append(indent(self.full_requires.dumps()))
+        result.append('\n[full_options]')
+        result.append(indent(self.full_options.dumps()))
+        result.append('\n[recipe_hash]\n%s' % indent(self.recipe_hash))
+        result.append('\n[env]')
+        result.append(indent(self.env_values.dumps()))
+        return '\n'.join(result) + '\n'
+
+    def clone(self):
+        q = self.copy()
+        q.full_settings = self.full_settings.copy()
+        q.full_options = self.full_options.copy()
+        q.full_requires = _PackageReferenceList.loads(self.full_requires.dumps())
+        return q
+
+    def __eq__(self, other):
+        """ currently just for testing purposes
+        """
+        return self.dumps() == other.dumps()
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    @staticmethod
+    def load_file(conan_info_path):
+        """ load from file
+        """
+        try:
+            config_text = load(conan_info_path)
+        except IOError:
+            raise ConanException('Does not exist %s' % conan_info_path)
+        else:
+            return ConanInfo.loads(config_text)
+
+    @staticmethod
+    def load_from_package(package_folder):
+        info_path = os.path.join(package_folder, CONANINFO)
+        return ConanInfo.load_file(info_path)
+
+    def package_id(self):
+        """ The package_id of a conans is the sha1 of its specific requirements,
+        options and settings
+        """
+        if self.invalid:
+            return PACKAGE_ID_INVALID
+        result = [self.settings.sha]
+        self.options.filter_used(self.requires.pkg_names)
+        result.append(self.options.sha)
+        requires_sha = self.requires.sha
+        if requires_sha is None:
+            return PACKAGE_ID_UNKNOWN
+        if requires_sha == PACKAGE_ID_INVALID:
+            self.invalid = 'Invalid transitive dependencies'
+            return PACKAGE_ID_INVALID
+        result.append(requires_sha)
+        if self.python_requires:
+            result.append(self.python_requires.sha)
+        if hasattr(self, 'conf'):
+            result.append(self.conf.sha)
+        package_id = sha1('\n'.join(result).encode())
+        return package_id
+
+    def serialize_min(self):
+        """
+        This info will be shown in search results.
+        """
+        conan_info_json = {'settings': dict(self.settings.serialize()), 'options': dict(self.options.serialize()['options']), 'full_requires': self.full_requires.serialize(), 'recipe_hash': self.recipe_hash}
+        return conan_info_json
+
+    def header_only(self):
+        self.settings.clear()
+        self.options.clear()
+        self.requires.clear()
+    clear = header_only
+
+    def msvc_compatible(self):
+        if self.settings.compiler != 'msvc':
+            return
+        compatible = self.clone()
+        version = compatible.settings.compiler.version
+        runtime = compatible.settings.compiler.runtime
+        runtime_type = compatible.settings.compiler.runtime_type
+        compatible.settings.compiler = 'Visual Studio'
+        from conan.tools.microsoft.visual import msvc_version_to_vs_ide_version
+        visual_version = msvc_version_to_vs_ide_version(version)
+        compatible.settings.compiler.version = visual_version
+        runtime = 'MT' if runtime == 'static' else 'MD'
+        if runtime_type == 'Debug':
+            runtime = '{}d'.format(runtime)
+        compatible.settings.compiler.runtime = runtime
+        return compatible
+
+    def apple_clang_compatible(self):
+        if not self.settings.compiler or self.settings.compiler != 'apple-clang' or self.settings.compiler.version != '13':
+            return
+        compatible = self.clone()
+        compatible.settings.compiler.version = '13.0'
+        return compatible
+
+    def vs_toolset_compatible(self):
+        """Default behaviour, same package for toolset v140 with compiler=Visual Studio 15 than
+        using Visual Studio 14"""
+        if self.full_settings.compiler != 'Visual Studio':
+            return
+        toolset = str(self.full_settings.compiler.toolset)
+        version = MSVS_DEFAULT_TOOLSETS_INVERSE.get(toolset)
+        if version is not None:
+            self.settings.compiler.version = version
+            del self.settings.compiler.toolset
+
+    def vs_toolset_incompatible(self):
+        """Will generate different packages for v140 and visual 15 than the visual 14"""
+        if self.full_settings.compiler != 'Visual Studio':
+            return
+        self.settings.compiler.version = self.full_settings.compiler.version
+        self.settings.compiler.toolset = self.full_settings.compiler.toolset
+
+    def discard_build_settings(self):
+        if self.full_settings.os and self.full_settings.os_build:
+            del self.settings.os_build
+        if self.full_settings.arch and self.full_settings.arch_build:
+            del self.settings.arch_build
+
+    def include_build_settings(self):
+        self.settings.os_build = self.full_settings.os_build
+        self.settings.arch_build = self.full_settings.arch_build
+
+    def default_std_matching(self):
+        """
+        If we are building with gcc 7, and we specify -s cppstd=gnu14, it's the default, so the
+        same as specifying None, packages are the same
+        """
+        if self.full_settings.compiler == 'msvc':
+            return
+        if self.full_settings.compiler and self.full_settings.compiler.version:
+            default = cppstd_default(self.full_settings)
+            if str(self.full_settings.cppstd) == default:
+                self.settings.cppstd = None
+            if str(self.full_settings.compiler.cppstd) == default:
+                self.settings.compiler.cppstd = None
+
+    def default_std_non_matching(self):
+        if self.full_settings.cppstd:
+            self.settings.cppstd = self.full_settings.cppstd
+        if self.full_settings.compiler.cppstd:
+            self.settings.compiler.cppstd = self.full_settings.compiler.cppstd
+
+    def shared_library_package_id(self):
+        if 'shared' in self.full_options and self.full_options.shared:
+            for dep_name in self.requires.pkg_names:
+                dep_options = self.full_options[dep_name]
+                if 'shared' not in dep_options or not dep_options.shared:
+                    self.requires[dep_name].package_revision_mode()
+
+    def parent_compatible(self, *_, **kwargs):
+        """If a built package for Intel has to be compatible for a Visual/GCC compiler
+        (consumer). Transform the visual/gcc full_settings into an intel one"""
+        if 'compiler' not in kwargs:
+            raise ConanException('Specify \'compiler\' as a keywork argument. e.g: \'parent_compiler(compiler="intel")\' ')
+        self.settings.compiler = kwargs['compiler']
+        kwargs.pop('compiler')
+        for setting_name in kwargs:
+            setattr(self.settings.compiler, setting_name, kwargs[setting_name])
+        self.settings.compiler.base = self.full_settings.compiler
+        for field in self.full_settings.compiler.fields:
+            value = getattr(self.full_settings.compiler, field)
+            setattr(self.settings.compiler.base, field, value)
+
+    def base_compatible(self):
+        """If a built package for Visual/GCC has to be compatible for an Intel compiler
+          (consumer). Transform the Intel profile into an visual/gcc one"""
+        if not self.full_settings.compiler.base:
+            raise ConanException("The compiler '{}' has no 'base' sub-setting".format(self.full_settings.compiler))
+        self.settings.compiler = self.full_settings.compiler.base
+        for field in self.full_settings.compiler.base.fields:
+            value = getattr(self.full_settings.compiler.base, field)
+            setattr(self.settings.compiler, field, value)
+
+
+# From conans.client.graph.graph_manager
+class _RecipeBuildRequires(OrderedDict):
+
+    def __init__(self, conanfile, default_context):
+        super(_RecipeBuildRequires, self).__init__()
+        for require_type in ('build_requires', 'tool_requires'):
+            build_requires = getattr(conanfile, require_type, [])
+            if not isinstance(build_requires, (list, tuple)):
+                build_requires = [build_requires]
+            self._default_context = default_context
+            for build_require in build_requires:
+                self.add(build_require, context=self._default_context)
+
+    def add(self, build_require, context, force_host_context=False):
+        if build_require is None:
+            return
+        if not isinstance(build_require, ConanFileReference):
+            build_require = ConanFileReference.loads(build_require)
+        build_require.force_host_context = force_host_context
+        self[build_require.name, context] = build_require
+
+    def __call__(self, build_require, force_host_context=False):
+        context = CONTEXT_HOST if force_host_context else self._default_context
+        self.add(build_require, context, force_host_context)
+
+    def __str__(self):
+        items = ['{} ({})'.format(br, ctxt) for ((_, ctxt), br) in self.items()]
+        return ', '.join(items)
+
+
+# From conans.client.file_copier
+class FileCopier(object):
+    """ main responsible of copying files from place to place:
+    package: build folder -> package folder
+    imports: package folder -> user folder
+    export: user folder -> store "export" folder
+    """
+
+    def __init__(self, source_folders, root_destination_folder):
+        """
+        Takes the base folders to copy resources src -> dst. These folders names
+        will not be used in the relative names while copying
+        param source_folders: list of folders to copy things from, typically the
+                                  store build folder
+        param root_destination_folder: The base folder to copy things to, typically the
+                                       store package folder
+        """
+        assert isinstance(source_folders, list), 'source folders must be a list'
+        self._src_folders = source_folders
+        self._dst_folder = root_destination_folder
+        self._copied = []
+
+    def report(self, output):
+        return report_copied_files(self._copied, output)
+
+    def __call__(self, pattern, dst='', src='', keep_path=True, links=False, symlinks=None, excludes=None, ignore_case=True):
+        """
+        param pattern: an fnmatch file pattern of the files that should be copied. Eg. *.dll
+        param dst: the destination local folder, wrt to current conanfile dir, to which
+                   the files will be copied. Eg: "bin"
+        param src: the source folder in which those files will be searched. This folder
+                   will be stripped from the dst name. Eg.: lib/Debug/x86
+        param keep_path: False if you want the relative paths to be maintained from
+                         src to dst folders, or just drop. False is useful if you want
+                         to collect e.g. many *.libs among many dirs into a single
+                         lib dir
+        param links: True to activate symlink copying
+        param excludes: Single pattern or a tuple of patterns to be excluded from the copy
+        param ignore_case: will do a case-insensitive pattern matching when True
+        return: list of copied files
+        """
+        if symlinks is not None:
+            links = symlinks
+        if os.path.isabs(src):
+            return self._copy(os.curdir, pattern, src, dst, links, ignore_case, excludes, keep_path, excluded_folders=[self._dst_folder])
+        files = []
+        for src_folder in self._src_folders:
+            excluded = [self._dst_folder]
+            excluded.extend([d for d in self._src_folders if d is not src_folder])
+            fs = self._copy(src_folder, pattern, src, dst, links, ignore_case, excludes, keep_path, excluded_folders=excluded)
+            files.extend(fs)
+        return files
+
+    def _copy(self, base_src, pattern, src, dst, symlinks, ignore_case, excludes, keep_path, excluded_folders):
+        if pattern.startswith('..'):
+            rel_dir = os.path.abspath(os.path.join(base_src, pattern))
+            base_src = os.path.dirname(rel_dir)
+            pattern = os.path.basename(rel_dir)
+        src = os.path.join(base_src, src)
+        dst = os.path.join(self._dst_folder, dst)
+        (files_to_copy, link_folders) = self._filter_files(src, pattern, symlinks, excludes, ignore_case, excluded_folders)
+        copied_files = self._copy_files(files_to_copy, src, dst, keep_path, symlinks)
+        self.link_folders(src, dst, link_folders)
+        self._copied.extend(files_to_copy)
+        return copied_files
+
+    @staticmethod
+    def _filter_files(src, pattern, links, excludes, ignore_case, excluded_folders):
+        """ return a list of the files matching the patterns
+        The list will be relative path names wrt to the root src folder
+        """
+        filenames = []
+        linked_folders = []
+        if excludes:
+            if not isinstance(excludes, (tuple, list)):
+                excludes = (excludes, )
+            if ignore_case:
+                excludes = [e.lower() for e in excludes]
+        else:
+            excludes = []
+        for (root, subfolders, files) in walk(src, followlinks=True):
+            if root in excluded_folders:
+                subfolders[:] = []
+                continue
+            if links and os.path.islink(root):
+                linked_folders.append(os.path.relpath(root, src))
+                subfolders[:] = []
+                continue
+            basename = os.path.basename(root)
+            if basename in ['.git', '.svn']:
+                subfolders[:] = []
+                continue
+            if basename == 'test_package':
+                try:
+                    subfolders.remove('build')
+                except ValueError:
+                    pass
+            relative_path = os.path.relpath(root, src)
+            compare_relative_path = relative_path.lower() if ignore_case else relative_path
+            for exclude in excludes:
+                if fnmatch.fnmatch(compare_relative_path, exclude):
+                    subfolders[:] = []
+                    files = []
+                    break
+            for f in files:
+                relative_name = os.path.normpath(os.path.join(relative_path, f))
+                filenames.append(relative_name)
+        if ignore_case:
+            pattern = pattern.lower()
+            files_to_copy = [n for n in filenames if fnmatch.fnmatch(os.path.normpath(n.lower()), pattern)]
+        else:
+            files_to_copy = [n for n in filenames if fnmatch.fnmatchcase(os.path.normpath(n), pattern)]
+        for exclude in excludes:
+            if ignore_case:
+                files_to_copy = [f for f in files_to_copy if not fnmatch.fnmatch(f.lower(), exclude)]
+            else:
+                files_to_copy = [f for f in files_to_copy if not fnmatch.fnmatchcase(f, exclude)]
+        return files_to_copy, linked_folders
+
+    @staticmethod
+    def link_folders(src, dst, linked_folders):
+        created_links = []
+        for linked_folder in linked_folders:
+            src_link = os.path.join(src, linked_folder)
+            abs_path = os.path.realpath(src_link)
+            relpath = os.path.relpath(abs_path, os.path.realpath(src))
+            if relpath.startswith('.'):
+                continue
+            link = os.readlink(src_link)
+            if os.path.isabs(link):
+                try:
+                    link = os.path.relpath(link, os.path.dirname(src_link))
+                except ValueError as e:
+                    raise ConanException("Symlink '%s' pointing to '%s' couldn't be made relative: %s" % (src_link, link, str(e)))
+            dst_link = os.path.join(dst, linked_folder)
+            try:
+                os.remove(dst_link)
+            except OSError:
+                pass
+            mkdir(os.path.dirname(dst_link))
+            os.symlink(link, dst_link)
+            created_links.append(dst_link)
+        for dst_link in created_links:
+            abs_path = os.path.realpath(dst_link)
+            if not os.path.exists(abs_path):
+                base_path = os.path.dirname(dst_link)
+                os.remove(dst_link)
+                while base_path.startswith(dst):
+                    try:
+                        os.rmdir(base_path)
+                    except OSError:
+                        break
+                    base_path = os.path.dirname(base_path)
+
+    @staticmethod
+    def _copy_files(files, src, dst, keep_path, symlinks):
+        """ executes a multiple file copy from [(src_file, dst_file), (..)]
+        managing symlinks if necessary
+        """
+        copied_files = []
+        for filename in files:
+            abs_src_name = os.path.join(src, filename)
+            filename = filename if keep_path else os.path.basename(filename)
+            abs_dst_name = os.path.normpath(os.path.join(dst, filename))
+            try:
+                os.makedirs(os.path.dirname(abs_dst_name))
+            except Exception:
+                pass
+            if symlinks and os.path.islink(abs_src_name):
+                linkto = os.readlink(abs_src_name)
+                try:
+                    os.remove(abs_dst_name)
+                except OSError:
+                    pass
+                os.symlink(linkto, abs_dst_name)
+            else:
+                shutil.copy2(abs_src_name, abs_dst_name)
+            copied_files.append(abs_dst_name)
+        return copied_files
+
+
+# From conans.client.importer
+class _FileImporter(object):
+    """ manages the copy of files, resources, libs from the local store to the user
+    space. E.g.: shared libs, dlls, they will be in the package folder of your
+    configuration in the store. But you dont want to add every package to the
+    system PATH. Those shared libs can be copied to the user folder, close to
+    the exes where they can be found without modifying the path.
+    Useful also for copying other resources as images or data files.
+    It can be also used for Golang projects, in which the packages are always
+    source based and need to be copied to the user folder to be built
+    """
+
+    def __init__(self, conanfile, dst_folder):
+        self._conanfile = conanfile
+        self._dst_folder = dst_folder
+        self.copied_files = set()
+
+    def __call__(self, pattern, dst='', src='', root_package=None, folder=False, ignore_case=True, excludes=None, keep_path=True):
+        """
+        param pattern: an fnmatch file pattern of the files that should be copied. Eg. *.dll
+        param dst: the destination local folder, wrt to current conanfile dir, to which
+                   the files will be copied. Eg: "bin"
+        param src: the source folder in which those files will be searched. This folder
+                   will be stripped from the dst name. Eg.: lib/Debug/x86
+        param root_package: fnmatch pattern of the package name ("OpenCV", "Boost") from
+                            which files will be copied. Default: all packages in deps
+        """
+        if os.path.isabs(dst):
+            real_dst_folder = dst
+        else:
+            real_dst_folder = os.path.normpath(os.path.join(self._dst_folder, dst))
+        pkgs = self._conanfile.deps_cpp_info.dependencies if not root_package else [(pkg, cpp_info) for (pkg, cpp_info) in self._conanfile.deps_cpp_info.dependencies if fnmatch.fnmatch(pkg, root_package)]
+        symbolic_dir_name = src[1:] if src.startswith('@') else None
+        src_dirs = [src]
+        for (pkg_name, cpp_info) in pkgs:
+            final_dst_path = os.path.join(real_dst_folder, pkg_name) if folder else real_dst_folder
+            file_copier = FileCopier([cpp_info.rootpath], final_dst_path)
+            if symbolic_dir_name:
+                try:
+                    src_dirs = getattr(cpp_info, symbolic_dir_name)
+                    if not isinstance(src_dirs, list):
+                        raise AttributeError
+                except AttributeError:
+                    raise ConanException("Import from unknown package folder '@%s'" % symbolic_dir_name)
+                if cpp_info.components:
+                    for (comp_name, comp) in cpp_info.components.items():
+                        src_dir = getattr(comp, symbolic_dir_name)
+                        if isinstance(src_dirs, list):
+                            src_dirs += src_dir
+            for src_dir in src_dirs:
+                files = file_copier(pattern, src=src_dir, links=True, ignore_case=ignore_case, excludes=excludes, keep_path=keep_path)
+                self.copied_files.update(files)
+
+
+# From conans.client.graph.python_requires
+class PyRequires(object):
+    """ this is the object that replaces the declared conanfile.py_requires"""
+
+    def __init__(self):
+        self._pyrequires = {}
+        self._transitive = {}
+
+    def update_transitive(self, conanfile):
+        transitive = getattr(conanfile, 'python_requires', None)
+        if not transitive:
+            return
+        for (name, transitive_py_require) in transitive.all_items():
+            existing = self._pyrequires.get(name)
+            if existing and existing.ref != transitive_py_require.ref:
+                raise ConanException('Conflict in py_requires %s - %s' % (existing.ref, transitive_py_require.ref))
+            self._transitive[name] = transitive_py_require
+
+    def all_items(self):
+        new_dict = self._pyrequires.copy()
+        new_dict.update(self._transitive)
+        return new_dict.items()
+
+    def all_refs(self):
+        return [r.ref for r in self._pyrequires.values()] + [r.ref for r in self._transitive.values()]
+
+    def items(self):
+        return self._pyrequires.items()
+
+    def __getitem__(self, item):
+        try:
+            return self._pyrequires[item]
+        except KeyError:
+            try:
+                return self._transitive[item]
+            except KeyError:
+                raise ConanException("'%s' is not a python_require" % item)
+
+    def __setitem__(self, key, value):
+        existing = self._pyrequires.get(key)
+        if existing:
+            raise ConanException("The python_require '%s' already exists" % key)
+        self._pyrequires[key] = value
@@ -1,4 +1,6 @@
 import argparse
+import functools
+import re
 from strictyaml import (
     dirty_load,
     MapCombined,
@@ -10,65 +12,92 @@ from strictyaml import (
     Enum,
     Any,
 )
-from yaml_linting import file_path
+from yaml_linting import add_path_arguments, expand_paths, lint_files
+
+try:
+    import yaml
+    from yaml import CSafeLoader as FastLoader
+except ImportError:  # PyYAML is optional, or built without libyaml
+    FastLoader = None
 
 
 CONANDATA_YAML_URL = "https://github.com/conan-io/conan-center-index/blob/master/docs/adding_packages/conandata_yml_format.md"
 
 
+# Schemas are built once per process and shared by every validated file
+patch_fields = MapCombined(
+    {
+        "patch_file": Str(),
+        Optional("patch_description"): Str(),
+        Optional("patch_type"): Enum(
+            ["official", "conan", "portability", "bugfix", "vulnerability"]
+        ),
+        Optional("patch_source"): Str(),
+        # No longer required for v2 recipes with layouts
+        Optional("base_path"): Str(),
+    },
+    Str(),
+    Any()
+)
+schema = MapCombined(
+    {
+        "sources": MapPattern(Str(), Any(), minimum_keys=1),
+        Optional("patches"): MapPattern(Str(), Seq(Any()), minimum_keys=1),
+    },
+    Str(),
+    Any(),
+)
+PATCH_TYPES = ["official", "conan", "portability", "bugfix", "vulnerability"]
+PATCH_STR_FIELDS = ["patch_file", "patch_description", "patch_type", "patch_source", "base_path"]
+ENGINES = ["strictyaml", "fast"]
+
+# strictyaml refuses anchors, aliases and tags. A match here may be a false positive (e.g. inside
+# a quoted string), which is confirmed with the parser events
+STRICTYAML_DISALLOWED_TOKENS = re.compile(r"(^|[\s\[{,])[&*!]")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Validate Conan's 'conandata.yaml' file to ConanCenterIndex's requirements."
     )
+    add_path_arguments(parser)
     parser.add_argument(
-        "path",
-        nargs="?",
-        type=file_path,
-        help="file to validate.",
+        "--engine",
+        choices=ENGINES,
+        default="strictyaml",
+        help="'fast' checks files with libyaml first and only parses the ones which are "
+             "not valid with strictyaml, the output is the same.",
     )
     args = parser.parse_args()
 
-    patch_fields = MapCombined(
-        {
-            "patch_file": Str(),
-            Optional("patch_description"): Str(),
-            Optional("patch_type"): Enum(
-                ["official", "conan", "portability", "bugfix", "vulnerability"]
-            ),
-            Optional("patch_source"): Str(),
-            # No longer required for v2 recipes with layouts
-            Optional("base_path"): Str(),
-        },
-        Str(),
-        Any()
-    )
-    schema = MapCombined(
-        {
-            "sources": MapPattern(Str(), Any(), minimum_keys=1),
-            Optional("patches"): MapPattern(Str(), Seq(Any()), minimum_keys=1),
-        },
-        Str(),
-        Any(),
-    )
+    lint_files(functools.partial(lint_file, engine=args.engine), expand_paths(parser, args.path), args.jobs)
+
 
-    with open(args.path, encoding="utf-8") as f:
+def lint_file(path, engine="strictyaml"):
+    """Validate a single conandata.yml, returning the annotations to print"""
+    output = []
+
+    with open(path, encoding="utf-8") as f:
         content = f.read()
 
+    if engine == "fast" and is_valid_fast(content):
+        return output
+
     try:
         parsed = dirty_load(content, schema, allow_flow_style=True)
     except YAMLValidationError as error:
-        pretty_print_yaml_validate_error(args, error) # Error when "source" is missing or when "patches" has no versions
-        return
+        output.append(pretty_print_yaml_validate_error(path, error)) # Error when "source" is missing or when "patches" has no versions
+        return output
     except BaseException as error:
-        pretty_print_yaml_validate_error(args, error) # YAML could not be parsed
-        return
+        output.append(pretty_print_yaml_validate_error(path, error)) # YAML could not be parsed
+        return output
 
     if "patches" in parsed:
         for version in parsed["patches"]:
             patches = parsed["patches"][version]
             if version not in parsed["sources"]:
-                print(
-                    f"::warning file={args.path},line={patches.start_line},endline={patches.end_line},"
+                output.append(
+                    f"::warning file={path},line={patches.start_line},endline={patches.end_line},"
                     f"title=conandata.yml inconsistency"
                     f"::Patch(es) are listed for version `{version}`, but there is source for this version."
                     f" You should either remove `{version}` from the `patches` section, or add it to the"
@@ -79,23 +108,96 @@ def main():
                 try:
                     parsed["patches"][version][i].revalidate(patch_fields)
                 except YAMLValidationError as error:
-                    pretty_print_yaml_validate_warning(args, error) # Warning when patch fields are not followed
+                    output.append(pretty_print_yaml_validate_warning(path, error)) # Warning when patch fields are not followed
                     continue
+    return output
 
 
+def is_valid_fast(content):
+    """Check with libyaml whether a conandata.yml has nothing to report
 
-def pretty_print_yaml_validate_error(args, error):
+    The document is only composed into nodes, which is done in C, and the schema is checked
+    over them. Reporting is left to strictyaml: anything this function is not sure about,
+    including every file which has an error or a warning, returns False so the file is
+    validated again by `dirty_load` and the annotations (and their lines) are the same.
+    """
+    if FastLoader is None:
+        return False
+    try:
+        if STRICTYAML_DISALLOWED_TOKENS.search(content) and _has_disallowed_tokens(content):
+            return False
+        root = yaml.compose(content, Loader=FastLoader)
+    except yaml.YAMLError:
+        return False
+
+    if not isinstance(root, yaml.MappingNode) or not _has_unique_scalar_keys(root):
+        return False
+    fields = _mapping_fields(root)
+    sources = fields.get("sources")
+    if not isinstance(sources, yaml.MappingNode) or not sources.value:
+        return False
+    patches = fields.get("patches")
+    if patches is None:
+        return True
+    if not isinstance(patches, yaml.MappingNode) or not patches.value:
+        return False
+
+    versions = _mapping_fields(sources)
+    for version_node, patch_list in patches.value:
+        if version_node.value not in versions or not isinstance(patch_list, yaml.SequenceNode):
+            return False
+        for patch in patch_list.value:
+            if not isinstance(patch, yaml.MappingNode):
+                return False
+            patch_fields = _mapping_fields(patch)
+            if "patch_file" not in patch_fields:
+                return False
+            for name in PATCH_STR_FIELDS:
+                if name in patch_fields and not isinstance(patch_fields[name], yaml.ScalarNode):
+                    return False
+            if "patch_type" in patch_fields and patch_fields["patch_type"].value not in PATCH_TYPES:
+                return False
+    return True
+
+
+def _has_disallowed_tokens(content):
+    for event in yaml.parse(content, Loader=FastLoader):
+        if isinstance(event, yaml.AliasEvent) or getattr(event, "anchor", None) or getattr(event, "tag", None):
+            return True
+    return False
+
+
+def _has_unique_scalar_keys(root):
+    """strictyaml requires every mapping, at any depth, to have unique scalar keys"""
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, yaml.MappingNode):
+            keys = [key.value for key, _ in node.value if isinstance(key, yaml.ScalarNode)]
+            if len(keys) != len(node.value) or len(set(keys)) != len(keys):
+                return False
+            stack.extend(value for _, value in node.value)
+        elif isinstance(node, yaml.SequenceNode):
+            stack.extend(node.value)
+    return True
+
+
+def _mapping_fields(node):
+    return {key.value: value for key, value in node.value}
+
+
+def pretty_print_yaml_validate_error(path, error):
     snippet = error.context_mark.get_snippet().replace("\n", "%0A")
-    print(
-        f"::error file={args.path},line={error.context_mark.line},endline={error.problem_mark.line+1},"
+    return (
+        f"::error file={path},line={error.context_mark.line},endline={error.problem_mark.line+1},"
         f"title=conandata.yml schema error"
         f"::Schema outlined in {CONANDATA_YAML_URL}#patches-fields is not followed.%0A%0A{error.problem} in %0A{snippet}%0A"
     )
-    
-def pretty_print_yaml_validate_warning(args, error):
+
+def pretty_print_yaml_validate_warning(path, error):
     snippet = error.context_mark.get_snippet().replace("\n", "%0A")
-    print(
-        f"::warning file={args.path},line={error.context_mark.line},endline={error.problem_mark.line+1},"
+    return (
+        f"::warning file={path},line={error.context_mark.line},endline={error.problem_mark.line+1},"
         f"title=conandata.yml schema warning"
         f"::Schema outlined in {CONANDATA_YAML_URL}#patches-fields is not followed.%0A%0A{error.problem} in %0A{snippet}%0A"
     )
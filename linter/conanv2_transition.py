@@ -10,6 +10,7 @@ from linter.check_import_conanfile import ImportConanFile
 from linter.check_import_errors import ImportErrorsConanException, ImportErrorsConanInvalidConfiguration, ImportErrors
 from linter.check_import_tools import ImportTools
 from linter.check_layout_src_folder import LayoutSrcFolder
+from linter.check_serial_build import SerialBuild
 from linter.check_version_attribute import VersionAttribute
 
 
@@ -21,4 +22,5 @@ def register(linter: PyLinter) -> None:
     linter.register_checker(ImportErrorsConanInvalidConfiguration(linter))
     linter.register_checker(ImportTools(linter))
     linter.register_checker(LayoutSrcFolder(linter))
+    linter.register_checker(SerialBuild(linter))
     linter.register_checker(VersionAttribute(linter))
@@ -0,0 +1,131 @@
+"""
+
+Generate linter/conan_v1_stubs.py, the classes used by transform_conanfile.py
+
+transform_conanfile.py needs a few classes from Conan 1.x to describe the members that Conan
+injects into ConanFile. Parsing the Conan modules where they live, for each pylint run, is slow,
+so their source is copied into a single small module. Names used by those classes are imported
+from where they were defined, astroid only resolves them when they are inferred.
+
+The stubs must be generated with the Conan version listed in .c3i/config_v1.yml:
+
+    pip install conan==<version>
+    python3 linter/generate_conan_stubs.py
+
+"""
+
+import argparse
+import os
+import re
+import sys
+
+import astroid
+from astroid import nodes
+
+
+LINTER_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(LINTER_DIR)
+STUBS_PATH = os.path.join(LINTER_DIR, "conan_v1_stubs.py")
+
+STUB_CLASSES = [
+    ("conans.model.info", "ConanInfo"),
+    ("conans.client.graph.graph_manager", "_RecipeBuildRequires"),
+    ("conans.client.file_copier", "FileCopier"),
+    ("conans.client.importer", "_FileImporter"),
+    ("conans.client.graph.python_requires", "PyRequires"),
+]
+
+
+def pinned_conan_version():
+    with open(os.path.join(ROOT_DIR, ".c3i", "config_v1.yml"), encoding="utf-8") as f:
+        match = re.search(r"^conan:\s*\n\s+version:\s*['\"]?([^'\"\s]+)", f.read(), re.MULTILINE)
+    return match.group(1) if match else None
+
+
+def _free_names(class_node):
+    """Names used by the class that are resolved at the scope of its module"""
+    names = set()
+    for name_node in class_node.nodes_of_class(nodes.Name):
+        frame, assignments = name_node.lookup(name_node.name)
+        if assignments and isinstance(frame, nodes.Module) and frame is class_node.root():
+            names.add(name_node.name)
+    for base in class_node.bases:
+        if isinstance(base, nodes.Name):
+            names.add(base.name)
+    return names
+
+
+def _import_for(module, name):
+    """Import statement binding `name` as it is bound in `module`"""
+    _, assignments = module.lookup(name)
+    assignment = assignments[0]
+    if isinstance(assignment, nodes.ImportFrom):
+        modname = assignment.modname
+        if assignment.level:
+            modname = module.relative_to_absolute_name(modname, assignment.level)
+        for imported, alias in assignment.names:
+            if (alias or imported) == name:
+                return f"from {modname} import {imported}" + (f" as {alias}" if alias else "")
+    elif isinstance(assignment, nodes.Import):
+        for imported, alias in assignment.names:
+            if alias == name:
+                return f"import {imported} as {alias}"
+            if imported.split(".")[0] == name:
+                return f"import {imported}"
+    # Defined in the module itself
+    return f"from {module.name} import {name}"
+
+
+def generate():
+    imports = {}
+    classes = []
+    stub_names = {classname for _, classname in STUB_CLASSES}
+    for modname, classname in STUB_CLASSES:
+        module = astroid.MANAGER.ast_from_module_name(modname)
+        class_node = module[classname]
+        for name in sorted(_free_names(class_node)):
+            if name == "object" or name in stub_names:
+                continue
+            statement = _import_for(module, name)
+            if imports.setdefault(name, statement) != statement:
+                raise Exception(f"'{name}' is bound to different objects: '{imports[name]}' and '{statement}'")
+        source = "\n".join(line.rstrip() for line in class_node.as_string().strip().splitlines())
+        classes.append(f"# From {modname}\n{source}\n")
+
+    from conans import __version__ as conan_version
+    header = [
+        "# Generated by linter/generate_conan_stubs.py, do not edit.",
+        f"# Conan version: {conan_version}",
+        "# pylint: skip-file",
+        "",
+    ]
+    body = sorted(set(imports.values())) + ["", ""] + ["\n\n".join(classes)]
+    return "\n".join(header + body), conan_version
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate linter/conan_v1_stubs.py from the installed Conan.")
+    parser.add_argument("--output", default=STUBS_PATH, help="file to write (default: %(default)s).")
+    parser.add_argument("--check", action="store_true", help="fail if the stubs on disk are not up to date.")
+    args = parser.parse_args()
+
+    content, conan_version = generate()
+    pinned = pinned_conan_version()
+    if pinned and pinned != conan_version:
+        print(f"Installed Conan is {conan_version} but .c3i/config_v1.yml pins {pinned}, "
+              f"install it with 'pip install conan=={pinned}'", file=sys.stderr)
+        sys.exit(1)
+
+    if args.check:
+        with open(args.output, encoding="utf-8") as f:
+            if f.read() != content:
+                print(f"{args.output} is out of date, run 'python3 linter/generate_conan_stubs.py'", file=sys.stderr)
+                sys.exit(1)
+        return
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+if __name__ == "__main__":
+    main()
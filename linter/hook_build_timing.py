@@ -0,0 +1,251 @@
+"""
+
+Conan hook recording the time spent in each method of the recipes built locally
+
+For every export(), source(), build(), package() and package_info() of a recipe, and every
+build() and test() of a test_package, the wall time, the CPU time (of Conan and of the processes
+it waited for: compilers, build tools...) and the peak resident memory are written to a SQLite
+database. The commands of build() run with `self.run()` are recorded too, classified as
+configure, compile or install steps.
+
+The peak memory is the largest of any single process since the start of Conan, so a phase never
+reports less than the phases before it. CPU time of child processes isn't available on Windows.
+
+Install it with linter/build_times.py, which also ranks the recipes from the database:
+
+    python3 linter/build_times.py install
+    python3 linter/build_times.py report
+
+The database is CCI_BUILD_TIMES_DB, by default ~/.cache/conan-center-index/build_times.sqlite.
+Set CCI_BUILD_TIMING=0 to disable the hook without uninstalling it. This file is standalone,
+it works as a Conan 1.x hook and as a Conan 2 hook.
+
+"""
+
+import os
+import re
+import socket
+import sqlite3
+import time
+import uuid
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+DEFAULT_DB = os.environ.get("CCI_BUILD_TIMES_DB",
+                            os.path.join(os.path.expanduser("~"), ".cache", "conan-center-index", "build_times.sqlite"))
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS timings (
+    id INTEGER PRIMARY KEY,
+    run TEXT,
+    host TEXT,
+    reference TEXT,
+    name TEXT,
+    version TEXT,
+    package_id TEXT,
+    phase TEXT,
+    command TEXT,
+    started REAL,
+    wall REAL,
+    cpu REAL,
+    peak_rss_kb INTEGER,
+    success INTEGER
+);
+CREATE INDEX IF NOT EXISTS timings_name ON timings(name, phase);
+"""
+# One run per Conan process, so the phases of a `conan create` can be grouped
+RUN = uuid.uuid4().hex
+COMMAND_STEPS = [
+    ("install", re.compile(r"(?:^|\s)(?:install|--install)(?:\s|$)")),
+    ("configure", re.compile(r"(?:^|[\s/\\\"'])(?:(?:configure|config|Configure|autoreconf|qmake|premake\d?|genie|gyp)"
+                             r"(?:[\s\"'.]|$)|cmake(?:\.exe)?[\"']?\s+(?!--build|--install|-E)|meson(?:\.exe)?[\"']?\s+setup)")),
+    ("compile", re.compile(r"(?:^|[\s/\\\"'])(?:make|gmake|mingw32-make|nmake|jom|ninja|b2|bjam|msbuild|scons|xcodebuild"
+                           r"|cmake(?:\.exe)?[\"']?\s+--build|meson(?:\.exe)?[\"']?\s+compile)(?:\.exe)?(?:[\s\"']|$)",
+                           re.IGNORECASE)),
+]
+
+_started = {}
+
+
+def _enabled():
+    return os.environ.get("CCI_BUILD_TIMING", "1") not in ("0", "false", "False")
+
+
+def _sample():
+    """(wall, cpu, peak_rss_kb) now"""
+    times = os.times()
+    cpu = times.user + times.system + times.children_user + times.children_system
+    peak = None
+    if resource is not None:
+        peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                   resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+        if os.uname().sysname == "Darwin":
+            # In bytes on macOS
+            peak //= 1024
+    return time.time(), cpu, peak
+
+
+def _identity(conanfile, kwargs):
+    """(reference, name, version, package_id) of the conanfile"""
+    package_id = kwargs.get("package_id")
+    if package_id is None:
+        info = getattr(conanfile, "info", None)
+        try:
+            package_id = info.package_id() if info is not None else None
+        except Exception:
+            package_id = None
+    name, version = getattr(conanfile, "name", None), getattr(conanfile, "version", None)
+    if name:
+        return f"{name}/{version}", name, str(version) if version else None, package_id
+    # test_package, tested_reference_str is `name/version@user/channel#revision`
+    tested = getattr(conanfile, "tested_reference_str", None) or getattr(conanfile, "display_name", None) or ""
+    match = re.search(r"([^/\s(]+)/([^@#\s)]+)", tested)
+    if match:
+        return f"{match.group(1)}/{match.group(2)}", match.group(1), match.group(2), None
+    return tested or None, None, None, None
+
+
+def _record(rows):
+    if not rows:
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(DEFAULT_DB)), exist_ok=True)
+    connection = sqlite3.connect(DEFAULT_DB, timeout=60)
+    try:
+        connection.executescript(SCHEMA)
+        with connection:
+            connection.executemany(
+                "INSERT INTO timings (run, host, reference, name, version, package_id, phase, command, started, wall, "
+                "cpu, peak_rss_kb, success) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    finally:
+        connection.close()
+
+
+def _row(identity, phase, command, start, end, success):
+    return (RUN, socket.gethostname()) + tuple(identity) + (phase, command, start[0], end[0] - start[0],
+                                                            end[1] - start[1], end[2], int(success))
+
+
+def command_step(command):
+    """'configure', 'compile', 'install' or 'other' for a command run by build()"""
+    for step, regex in COMMAND_STEPS:
+        if regex.search(command):
+            return step
+    return "other"
+
+
+def _timed(conanfile, function, phase, identity):
+    """Wrap a method of the conanfile instance so each call is recorded
+
+    With phase None, the method is `run()` and its calls are recorded as steps of the method
+    running them: `build:compile`, `test:other`...
+    """
+
+    def wrapper(*args, **kwargs):
+        start = _sample()
+        success = False
+        outer = getattr(conanfile, "_build_timing_phase", None)
+        if phase is not None:
+            conanfile._build_timing_phase = phase
+        try:
+            result = function(*args, **kwargs)
+            success = True
+            return result
+        finally:
+            if phase is not None:
+                conanfile._build_timing_phase = outer
+                _record([_row(identity, phase, None, start, _sample(), success)])
+            elif outer is not None and args:
+                command = str(args[0])
+                _record([_row(identity, f"{outer}:{command_step(command)}", command, start, _sample(), success)])
+
+    return wrapper
+
+
+def _conanfile(args, kwargs):
+    # Conan 1.x passes keyword arguments with an `output`, Conan 2 passes the conanfile
+    return kwargs.get("conanfile") or (args[0] if args else None)
+
+
+def _pre(phase, args, kwargs):
+    conanfile = _conanfile(args, kwargs)
+    if conanfile is None or not _enabled():
+        return
+    identity = _identity(conanfile, kwargs)
+    test_package = identity[1] is not None and not getattr(conanfile, "name", None)
+    if test_package:
+        phase = f"test_{phase}"
+    if phase not in ("build", "test_build"):
+        _started[(id(conanfile), phase)] = (identity, _sample())
+        return
+    # build() is wrapped rather than timed between the hooks, so failed builds are recorded too.
+    # So are the commands it runs, and test() which has no hook.
+    wrapped = ["build", "run", "test"] if test_package else ["build", "run"]
+    conanfile._build_timing_methods = {name: vars(conanfile).get(name) for name in wrapped}
+    conanfile.build = _timed(conanfile, conanfile.build, phase, identity)
+    conanfile.run = _timed(conanfile, conanfile.run, None, identity)
+    if test_package:
+        conanfile.test = _timed(conanfile, conanfile.test, "test", identity)
+
+
+def _post(phase, args, kwargs):
+    conanfile = _conanfile(args, kwargs)
+    if conanfile is None:
+        return
+    if not getattr(conanfile, "name", None) and _identity(conanfile, kwargs)[1] is not None:
+        phase = f"test_{phase}"
+    started = _started.pop((id(conanfile), phase), None)
+    if "_build_timing_methods" in vars(conanfile) and phase != "test_build":
+        # test() runs after post_build(), the methods of a test_package stay wrapped
+        for name, method in conanfile._build_timing_methods.items():
+            if method is None:
+                vars(conanfile).pop(name, None)
+            else:
+                setattr(conanfile, name, method)
+        vars(conanfile).pop("_build_timing_phase", None)
+        del conanfile._build_timing_methods
+    if started is not None:
+        identity, start = started
+        _record([_row(identity, phase, None, start, _sample(), True)])
+
+
+def pre_export(*args, **kwargs):
+    _pre("export", args, kwargs)
+
+
+def post_export(*args, **kwargs):
+    _post("export", args, kwargs)
+
+
+def pre_source(*args, **kwargs):
+    _pre("source", args, kwargs)
+
+
+def post_source(*args, **kwargs):
+    _post("source", args, kwargs)
+
+
+def pre_build(*args, **kwargs):
+    _pre("build", args, kwargs)
+
+
+def post_build(*args, **kwargs):
+    _post("build", args, kwargs)
+
+
+def pre_package(*args, **kwargs):
+    _pre("package", args, kwargs)
+
+
+def post_package(*args, **kwargs):
+    _post("package", args, kwargs)
+
+
+def pre_package_info(*args, **kwargs):
+    _pre("package_info", args, kwargs)
+
+
+def post_package_info(*args, **kwargs):
+    _post("package_info", args, kwargs)
@@ -0,0 +1,209 @@
+"""
+
+Content-addressed cache of the pylint messages of every linted file
+
+An entry is keyed by the content of the file, the rcfile, the sources of the linter plugins,
+the pylint version and the pylint arguments, never by the path of the file: a conanfile.py
+copied to another folder (or another checkout, or another machine) is a cache hit, which costs
+hashing the file instead of a pylint run. The paths of the messages are the ones of the
+requested file.
+
+The cache is a folder (`.lint_cache/` by default, or $CCI_LINT_CACHE) written by
+pylint_runner.py and lint_server.py. It can be moved between machines as a tarball, e.g.
+the `lint-cache` artifact of the linter workflow:
+
+    python3 linter/lint_cache.py export lint-cache.tar.gz
+    python3 linter/lint_cache.py import lint-cache.tar.gz
+    python3 linter/lint_cache.py prune --days 30
+
+"""
+
+import argparse
+import fnmatch
+import glob
+import hashlib
+import io
+import json
+import os
+import re
+import tarfile
+import time
+
+
+LINTER_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.environ.get("CCI_LINT_CACHE", os.path.join(os.path.dirname(LINTER_DIR), ".lint_cache"))
+# Bumped when the key or the content of the entries change, or to invalidate wrong entries
+# (3: the empty results stored for files given as `./path` or absolute paths)
+CACHE_FORMAT = "3"
+# The modules loaded by the rcfiles, the runners and other scripts of the folder don't change the messages
+PLUGIN_SOURCES = ["conanv2_transition.py", "check_*.py", "transform_*.py", "conan_v1_stubs.py"]
+ENTRY_NAME = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{64}\.json$")
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_sha256(path):
+    with open(path, "rb") as f:
+        return _sha256(f.read())
+
+
+def _pylint_version():
+    try:
+        from pylint import __version__
+    except ImportError:
+        return "unknown"
+    return __version__
+
+
+def plugins_hash():
+    """Hash of the sources of the pylint plugins and transforms"""
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(LINTER_DIR, "*.py"))):
+        name = os.path.basename(path)
+        if any(fnmatch.fnmatch(name, pattern) for pattern in PLUGIN_SOURCES):
+            digest.update(name.encode())
+            digest.update(file_sha256(path).encode())
+    return digest.hexdigest()
+
+
+def config_hash(rcfile, pylint_args):
+    """Hash of everything, except the linted file, that may change pylint output"""
+    digest = hashlib.sha256()
+    digest.update(CACHE_FORMAT.encode())
+    digest.update(file_sha256(rcfile).encode())
+    digest.update(plugins_hash().encode())
+    digest.update(_pylint_version().encode())
+    digest.update("\0".join(pylint_args).encode())
+    return digest.hexdigest()
+
+
+def _path_context(path):
+    """The only part of the path the plugins look at: PackageName expects no `name` in test_*/ folders"""
+    return "test" if fnmatch.fnmatch(os.path.basename(os.path.dirname(os.path.abspath(path))), "test_*") else ""
+
+
+def file_key(path, config):
+    return _sha256(f"{config}:{_path_context(path)}:{file_sha256(path)}".encode())
+
+
+def _entry_path(cache_dir, key):
+    return os.path.join(cache_dir, key[:2], f"{key}.json")
+
+
+def load(cache_dir, key, path):
+    """Cached messages of a file, with `path` as their path. None when not cached"""
+    entry = _entry_path(cache_dir, key)
+    try:
+        with open(entry, encoding="utf-8") as f:
+            messages = json.load(f)
+        # The modification time is the last use, for `prune`
+        os.utime(entry)
+    except (OSError, ValueError):
+        return None
+    for message in messages:
+        message["path"] = path
+    return messages
+
+
+def store(cache_dir, key, messages):
+    folder = os.path.join(cache_dir, key[:2])
+    os.makedirs(folder, exist_ok=True)
+    # Write to a temporary file first, several runners may share the same cache
+    tmp = os.path.join(folder, f"{key}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump([{name: value for name, value in message.items() if name != "path"} for message in messages], f)
+    os.replace(tmp, _entry_path(cache_dir, key))
+
+
+def entries(cache_dir):
+    """Names of the entries of the cache, relative to the cache folder"""
+    names = []
+    for path in glob.glob(os.path.join(cache_dir, "??", "*.json")):
+        name = os.path.relpath(path, cache_dir).replace(os.sep, "/")
+        if ENTRY_NAME.match(name):
+            names.append(name)
+    return sorted(names)
+
+
+def export_cache(cache_dir, tarball):
+    """Write the entries of the cache to a tarball, returns their number"""
+    names = entries(cache_dir)
+    with tarfile.open(tarball, "w:gz") as tar:
+        for name in names:
+            with open(os.path.join(cache_dir, name), "rb") as f:
+                data = f.read()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            tar.addfile(info, io.BytesIO(data))
+    return len(names)
+
+
+def import_cache(cache_dir, tarball):
+    """Add the entries of a tarball to the cache, returns the number of new entries
+
+    Entries are content-addressed, so an existing one is never replaced. Anything else in the
+    tarball is ignored.
+    """
+    added = 0
+    with tarfile.open(tarball, "r:*") as tar:
+        for member in tar:
+            if not member.isfile() or not ENTRY_NAME.match(member.name):
+                continue
+            destination = os.path.join(cache_dir, *member.name.split("/"))
+            if os.path.exists(destination):
+                continue
+            try:
+                messages = json.load(tar.extractfile(member))
+            except ValueError:
+                continue
+            store(cache_dir, os.path.basename(member.name)[:-len(".json")], messages)
+            added += 1
+    return added
+
+
+def prune(cache_dir, days):
+    """Remove the entries not used for `days` days, returns their number"""
+    limit = time.time() - days * 86400
+    removed = 0
+    for name in entries(cache_dir):
+        path = os.path.join(cache_dir, name)
+        try:
+            if os.path.getmtime(path) < limit:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export, import and prune the cache of pylint results.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="cache folder (default: %(default)s).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="write the cache to a tarball.")
+    export_parser.add_argument("tarball", help="path of the .tar.gz to write.")
+    import_parser = subparsers.add_parser("import", help="add the entries of a tarball to the cache.")
+    import_parser.add_argument("tarball", nargs="+", help="tarballs written by `export`.")
+    prune_parser = subparsers.add_parser("prune", help="remove the entries which were not used recently.")
+    prune_parser.add_argument("--days", type=float, default=30, help="age of the removed entries (default: %(default)s).")
+    subparsers.add_parser("stats", help="print the number of entries and the size of the cache.")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        print(f"Exported {export_cache(args.cache_dir, args.tarball)} entries to {args.tarball}")
+    elif args.command == "import":
+        for tarball in args.tarball:
+            print(f"Imported {import_cache(args.cache_dir, tarball)} new entries from {tarball}")
+    elif args.command == "prune":
+        print(f"Removed {prune(args.cache_dir, args.days)} entries")
+    else:
+        names = entries(args.cache_dir)
+        size = sum(os.path.getsize(os.path.join(args.cache_dir, name)) for name in names)
+        print(f"{len(names)} entries, {size / 1024 / 1024:.1f}MB in {args.cache_dir}")
+
+
+if __name__ == "__main__":
+    main()
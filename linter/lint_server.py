@@ -0,0 +1,358 @@
+"""
+
+Long-lived pylint server, the Conan modules, plugins and transforms are only loaded once
+
+A cold pylint run over a single conanfile spends most of its time importing pylint, registering
+the conanv2_transition plugins and parsing the Conan classes the transforms need. The server
+does it once and lints every request in the same process, reusing the astroid manager: only the
+requested files are parsed again. The messages of a file are kept until its content, the rcfile,
+the pylint arguments or the linter sources change, so saving an unchanged file costs nothing.
+Files which are not in memory are looked up in the cache of lint_cache.py, shared with
+pylint_runner.py, before running pylint.
+
+Requests come from a local socket (`serve`, one connection at a time) or from stdin
+(`serve --stdin`), one per line:
+
+    {"files": ["recipes/zlib/all/conanfile.py"], "rcfile": "linter/pylintrc_recipe", "args": [], "cwd": "..."}
+    recipes/zlib/all/conanfile.py recipes/zlib/all/test_package/conanfile.py
+
+A JSON request is answered by a JSON line with the parseable `output`, the `messages` as written
+by `pylint --output-format=json` and the pylint exit `status`. A plain line of paths is answered
+by the parseable output, the format matched by linter/recipe_linter.json, and an empty line.
+Without an rcfile, files of a test_package use pylintrc_testpackage, others pylintrc_recipe.
+
+    python3 linter/lint_server.py lint recipes/zlib/all/conanfile.py   # starts the server if needed
+    python3 linter/lint_server.py watch "recipes/zlib/*/conanfile.py" "recipes/zlib/*/test_*/conanfile.py"
+
+When the linter sources change the server answers with a cold pylint process and stops after
+the request, the next `lint` starts a new one.
+
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import time
+
+import lint_cache
+from lint_cache import DEFAULT_CACHE_DIR, LINTER_DIR, config_hash, file_key, plugins_hash
+from pylint_runner import exit_status, file_id, group_messages, parseable, run_pylint
+
+
+ROOT_DIR = os.path.dirname(LINTER_DIR)
+RECIPE_RCFILE = os.path.join(LINTER_DIR, "pylintrc_recipe")
+TEST_PACKAGE_RCFILE = os.path.join(LINTER_DIR, "pylintrc_testpackage")
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), f"cci-lint-server-{os.getuid() if hasattr(os, 'getuid') else 0}.sock")
+WARMUP_FILES = ["recipes/zlib/all/conanfile.py", "recipes/zlib/all/test_package/conanfile.py"]
+
+
+def default_rcfile(path):
+    parts = path.replace("\\", "/").split("/")
+    return TEST_PACKAGE_RCFILE if any(re.match(r"test_.*package$", part) for part in parts[:-1]) else RECIPE_RCFILE
+
+
+class Linter:
+    """pylint in the current process, with the messages of the last version of every file"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        # The plugins of the rcfiles are imported as `linter.xxx`
+        if ROOT_DIR not in sys.path:
+            sys.path.insert(0, ROOT_DIR)
+        # Imported late, so `serve --help` and the client don't pay for it
+        from astroid import MANAGER
+        from pylint.lint import Run
+        from pylint.reporters import CollectingReporter
+        self._manager = MANAGER
+        self._run = Run
+        self._reporter_class = CollectingReporter
+        self.plugins = plugins_hash()
+        self.stale = False
+        self.cache_dir = cache_dir
+        # {absolute path: (key, messages)}
+        self.results = {}
+
+    def _forget(self, paths):
+        """Drop the modules parsed from `paths`, astroid would return them even after a change"""
+        paths = {os.path.normcase(path) for path in paths}
+        for name, module in list(self._manager.astroid_cache.items()):
+            if module.file and os.path.normcase(os.path.abspath(module.file)) in paths:
+                del self._manager.astroid_cache[name]
+
+    def _pylint(self, files, rcfile, pylint_args):
+        """Messages of a pylint run in this process, grouped by file (see group_messages)"""
+        self._forget(files)
+        reporter = self._reporter_class()
+        self._run([f"--rcfile={rcfile}", "--score=n", "--disable=duplicate-code"] + pylint_args + files,
+                  reporter=reporter, exit=False)
+        messages = []
+        for message in reporter.messages:
+            path = os.path.abspath(message.abspath)
+            messages.append({
+                "type": message.category,
+                "module": message.module,
+                "obj": message.obj,
+                "line": message.line,
+                "column": message.column,
+                "endLine": message.end_line,
+                "endColumn": message.end_column,
+                "path": path,
+                "symbol": message.symbol,
+                "message": message.msg or "",
+                "message-id": message.msg_id,
+            })
+        return group_messages(files, messages)
+
+    def lint(self, files, rcfile, pylint_args=None):
+        """Messages of `files` (absolute paths), linting only those which changed. Returns (messages, linted)
+
+        The path of the messages is absolute.
+        """
+        pylint_args = pylint_args or []
+        if not self.stale and plugins_hash() != self.plugins:
+            print("The linter sources changed, the server lints with new pylint processes until it is restarted",
+                  file=sys.stderr)
+            self.stale = True
+        config = config_hash(rcfile, pylint_args)
+        keys = {path: file_key(path, config) for path in files}
+        pending = []
+        for path in files:
+            if self.results.get(path, (None,))[0] == keys[path]:
+                continue
+            cached = lint_cache.load(self.cache_dir, keys[path], path) if self.cache_dir else None
+            if cached is None:
+                pending.append(path)
+            else:
+                self.results[path] = (keys[path], cached)
+        unknown = []
+        if pending:
+            if self.stale:
+                by_file, unknown = run_pylint(pending, rcfile, pylint_args)
+                for message in unknown:
+                    message["path"] = os.path.abspath(message["path"])
+            else:
+                by_file, unknown = self._pylint(pending, rcfile, pylint_args)
+            for path in pending:
+                messages = by_file[file_id(path)]
+                for message in messages:
+                    message["path"] = path
+                if unknown and not messages:
+                    # Maybe not linted, see pylint_runner.lint(): linted again by the next request
+                    self.results.pop(path, None)
+                    continue
+                self.results[path] = (keys[path], messages)
+                if self.cache_dir:
+                    lint_cache.store(self.cache_dir, keys[path], messages)
+        return [message for path in files for message in self.results.get(path, (None, []))[1]] + unknown, \
+            len(pending)
+
+    def handle(self, files, rcfile=None, pylint_args=None, cwd=None):
+        """Messages of the files (relative to `cwd`), with their paths as given"""
+        cwd = cwd or os.getcwd()
+        groups = {}
+        for path in files:
+            groups.setdefault(rcfile or default_rcfile(path), []).append(path)
+        messages, linted = [], 0
+        for group_rcfile, paths in groups.items():
+            absolute = [os.path.abspath(os.path.join(cwd, path)) for path in paths]
+            given = dict(zip(absolute, paths))
+            missing = [path for path in absolute if not os.path.isfile(path)]
+            for path in missing:
+                messages.append({"type": "fatal", "module": "", "obj": "", "line": 1, "column": 0, "endLine": None,
+                                 "endColumn": None, "path": given[path], "symbol": "fatal",
+                                 "message": "No such file", "message-id": "F0001"})
+            absolute = [path for path in absolute if path not in missing]
+            if not absolute:
+                continue
+            lint_messages, group_linted = self.lint(absolute, os.path.join(cwd, group_rcfile), pylint_args)
+            linted += group_linted
+            for message in lint_messages:
+                # The path of the file as requested
+                messages.append(dict(message, path=given.get(message["path"], message["path"])))
+        return messages, linted
+
+    def answer(self, line, cwd=None):
+        """Answer to a request line, None for an empty line"""
+        line = line.strip()
+        if not line:
+            return None
+        if line.startswith("{"):
+            try:
+                request = json.loads(line)
+                messages, linted = self.handle(request.get("files", []), request.get("rcfile"),
+                                               request.get("args", []), request.get("cwd", cwd))
+            except Exception as error:  # pylint: disable=broad-except
+                return json.dumps({"error": f"{type(error).__name__}: {error}"}) + "\n"
+            return json.dumps({"output": "".join(parseable(message) + "\n" for message in messages),
+                               "messages": messages, "status": exit_status(messages), "linted": linted}) + "\n"
+        messages, _ = self.handle(line.split(), cwd=cwd)
+        return "".join(parseable(message) + "\n" for message in messages) + "\n"
+
+    def warmup(self):
+        # Always a pylint run, a cache hit wouldn't load anything
+        for path in WARMUP_FILES:
+            path = os.path.join(ROOT_DIR, path)
+            if os.path.isfile(path):
+                self._pylint([path], default_rcfile(path), [])
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            response = self.server.linter.answer(line.decode("utf-8"))
+            if response is not None:
+                self.wfile.write(response.encode("utf-8"))
+                self.wfile.flush()
+
+
+def _server(address):
+    if isinstance(address, tuple):
+        return socketserver.TCPServer(address, _RequestHandler)
+    if os.path.exists(address):
+        # Left by a server which didn't stop cleanly
+        os.remove(address)
+    return socketserver.UnixStreamServer(address, _RequestHandler)
+
+
+def serve(address, stdin=False, cache_dir=DEFAULT_CACHE_DIR):
+    linter = Linter(cache_dir)
+    start = time.perf_counter()
+    linter.warmup()
+    print(f"Linter ready in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    if stdin:
+        for line in sys.stdin:
+            response = linter.answer(line)
+            if response is not None:
+                sys.stdout.write(response)
+                sys.stdout.flush()
+        return
+    with _server(address) as server:
+        server.linter = linter
+        print(f"Listening on {address}", file=sys.stderr)
+        try:
+            while not linter.stale:
+                server.handle_request()
+        finally:
+            if not isinstance(address, tuple) and os.path.exists(address):
+                os.remove(address)
+
+
+def _connect(address):
+    family = socket.AF_INET if isinstance(address, tuple) else socket.AF_UNIX
+    connection = socket.socket(family, socket.SOCK_STREAM)
+    connection.connect(address)
+    return connection
+
+
+def request(address, files, rcfile=None, pylint_args=None, start_timeout=60):
+    """Send a lint request to the server, starting it when none is running"""
+    try:
+        connection = _connect(address)
+    except OSError:
+        command = [sys.executable, os.path.abspath(__file__), "serve"]
+        command += ["--port", str(address[1])] if isinstance(address, tuple) else ["--socket", address]
+        subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                         start_new_session=True)
+        deadline = time.monotonic() + start_timeout
+        while True:
+            time.sleep(0.2)
+            try:
+                connection = _connect(address)
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+    with connection, connection.makefile("rwb") as stream:
+        stream.write((json.dumps({"files": files, "rcfile": rcfile, "args": pylint_args or [],
+                                  "cwd": os.getcwd()}) + "\n").encode("utf-8"))
+        stream.flush()
+        response = json.loads(stream.readline())
+    if "error" in response:
+        raise Exception(f"Lint server error: {response['error']}")
+    return response
+
+
+def _expand(patterns):
+    files = []
+    for pattern in patterns:
+        files.extend(sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern])
+    return files
+
+
+def watch(patterns, rcfile=None, pylint_args=None, interval=1.0, cache_dir=DEFAULT_CACHE_DIR):
+    """Lint the files matching `patterns` every time they change, until interrupted"""
+    linter = Linter(cache_dir)
+    mtimes = {}
+    while True:
+        changed = []
+        for path in _expand(patterns):
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            if mtimes.get(path) != mtime:
+                mtimes[path] = mtime
+                changed.append(path)
+        if changed:
+            start = time.perf_counter()
+            messages, _ = linter.handle(changed, rcfile, pylint_args)
+            for message in messages:
+                print(parseable(message))
+            print(f"[{time.strftime('%H:%M:%S')}] {len(changed)} files linted in {time.perf_counter() - start:.1f}s, "
+                  f"{len(messages)} messages", file=sys.stderr, flush=True)
+        time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep pylint and the Conan linter plugins loaded between runs.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve_parser = subparsers.add_parser("serve", help="answer lint requests from a local socket or stdin.")
+    lint_parser = subparsers.add_parser("lint", help="lint files with the server, starting it if needed. "
+                                                     "Unknown arguments are forwarded to pylint.")
+    watch_parser = subparsers.add_parser("watch", help="lint files every time they change. "
+                                                       "Unknown arguments are forwarded to pylint.")
+    for subparser in (serve_parser, lint_parser):
+        subparser.add_argument("--socket", default=DEFAULT_SOCKET, help="path of the socket (default: %(default)s).")
+        subparser.add_argument("--port", type=int, help="use a TCP socket on localhost instead.")
+    serve_parser.add_argument("--stdin", action="store_true", help="read the requests from stdin.")
+    lint_parser.add_argument("files", nargs="+", help="files to lint.")
+    lint_parser.add_argument("--json", action="store_true", help="print the messages as pylint JSON output.")
+    watch_parser.add_argument("files", nargs="+", help="files to watch, globs are expanded again on every check.")
+    watch_parser.add_argument("--interval", type=float, default=1.0, help="seconds between checks.")
+    for subparser in (lint_parser, watch_parser):
+        subparser.add_argument("--rcfile", help="pylint rcfile (default: depends on the file, see above).")
+    for subparser in (serve_parser, watch_parser):
+        subparser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                               help="lint_cache.py folder shared with pylint_runner.py (default: %(default)s).")
+        subparser.add_argument("--no-cache", action="store_true", help="only keep the results in memory.")
+    args, pylint_args = parser.parse_known_args()
+    if pylint_args and args.command == "serve":
+        parser.error(f"unrecognized arguments: {' '.join(pylint_args)}")
+
+    if args.command == "watch":
+        try:
+            watch(args.files, args.rcfile, pylint_args, args.interval, None if args.no_cache else args.cache_dir)
+        except KeyboardInterrupt:
+            pass
+        return
+    address = ("127.0.0.1", args.port) if args.port else args.socket
+    if args.command == "serve":
+        serve(address, args.stdin, None if args.no_cache else args.cache_dir)
+        return
+    response = request(address, args.files, args.rcfile and os.path.abspath(args.rcfile), pylint_args)
+    if args.json:
+        print(json.dumps(response["messages"], indent=4))
+    else:
+        sys.stdout.write(response["output"])
+    sys.exit(response["status"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+
+Find the heavy requirements recipes add unconditionally, which could be behind an option
+
+Every requirement of the static recipe index is classified by the conditions guarding it:
+
+ * `option`: a condition reads `self.options` (the requirement can be disabled by an option).
+ * `settings`: otherwise, a condition reads the settings (`self.settings`, `is_msvc(self)`...).
+ * `unconditional`: the requirement is added for every configuration (conditions on the version
+   only select the versions of the recipe adding it).
+
+Properties and methods of the recipe used in a condition (`self._with_zlib`) are followed in
+the conanfile.py. The unconditional requirements are weighted by the size of the subgraph they
+pull (the dependency and everything it requires, see recipe_fanin.py) and the build time of
+that subgraph recorded by build_times.py. A requirement is reported when its upstream project
+can build without it: the recipe passes a switch for it to the build system (a string like
+`ARROW_WITH_ZLIB`, `--with-zlib` or `-Dzlib=enabled`), or other recipes make it optional.
+
+    python3 linter/optional_requirements.py --top 30
+    python3 linter/optional_requirements.py arrow opencv gdal --all
+
+"""
+
+import argparse
+import ast
+import json
+import os
+import re
+import statistics
+from collections import defaultdict
+
+from build_times import DEFAULT_DB as DEFAULT_TIMINGS_DB, format_duration, mean_durations
+from recipe_fanin import FanInGraph, _bits
+from recipe_graph import DEFAULT_KINDS, RecipeGraph
+from recipe_index import ROOT_DIR, add_index_arguments, class_methods, find_conanfile_class, open_index
+
+
+CLASSES = ["unconditional", "option", "settings"]
+SETTINGS_ATTRIBUTES = {"settings", "settings_build", "settings_target"}
+# Methods of the recipe which can't pass a switch to the build system
+REQUIREMENT_METHOD_NAMES = {"requirements", "build_requirements", "validate", "validate_build", "config_options",
+                            "configure", "package_id", "package_info", "layout", "export", "export_sources"}
+
+
+class _Conditions:
+    """Classify the conditions of the requirements of one conanfile"""
+
+    def __init__(self, path):
+        self.methods = {}
+        self.switches = []
+        self._cache = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                tree = ast.parse(f.read())
+        except (OSError, SyntaxError, ValueError):
+            return
+        class_node = find_conanfile_class(tree)
+        if class_node is None:
+            return
+        self.methods = class_methods(class_node)
+        for name, method in self.methods.items():
+            if name in REQUIREMENT_METHOD_NAMES:
+                continue
+            for node in ast.walk(method):
+                if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                    self.switches.append(node.value)
+
+    def _reads(self, node, seen):
+        """Set of 'option', 'settings' and 'version' read by an expression"""
+        reads = set()
+        for child in ast.walk(node):
+            if isinstance(child, ast.Attribute) and isinstance(child.value, ast.Name) and child.value.id == "self":
+                if child.attr == "options":
+                    reads.add("option")
+                elif child.attr in SETTINGS_ATTRIBUTES:
+                    reads.add("settings")
+                elif child.attr == "version":
+                    reads.add("version")
+                elif child.attr in self.methods and child.attr not in seen:
+                    reads |= self._method_reads(child.attr, seen | {child.attr})
+            elif isinstance(child, ast.Attribute) and child.attr in ("options", "settings") \
+                    and isinstance(child.value, ast.Attribute) and child.value.attr == "info":
+                # self.info.options, self.info.settings
+                reads.add("option" if child.attr == "options" else "settings")
+            elif isinstance(child, ast.Call) and isinstance(child.func, ast.Name) \
+                    and any(isinstance(arg, ast.Name) and arg.id == "self" for arg in child.args):
+                # is_msvc(self), is_apple_os(self), cross_building(self)... read the settings
+                reads.add("settings")
+        return reads
+
+    def _method_reads(self, name, seen):
+        if name not in self._cache:
+            self._cache[name] = set()
+            self._cache[name] = self._reads(self.methods[name], seen)
+        return self._cache[name]
+
+    def classify(self, conditions):
+        reads = set()
+        for condition in conditions:
+            if condition.startswith(("for ", "except")):
+                # Loops and exception handlers don't depend on the configuration
+                continue
+            try:
+                node = ast.parse(f"({condition})", mode="eval")
+            except SyntaxError:
+                continue
+            reads |= self._reads(node, frozenset())
+        if "option" in reads:
+            return "option"
+        if "settings" in reads:
+            return "settings"
+        return "unconditional"
+
+    def switch(self, dependency):
+        """A string of the build methods which looks like a switch of the build system for `dependency`"""
+        names = {dependency.lower()}
+        if dependency.startswith("lib") and len(dependency) > 5:
+            names.add(dependency[3:].lower())
+        alternatives = "|".join(re.escape(name).replace(r"\-", "[-_]?").replace("_", "[-_]?") for name in names)
+        pattern = re.compile(rf"(with|without|enable|disable|use|no)[-_]?({alternatives})(?![\w-])|^-D({alternatives})=",
+                             re.IGNORECASE)
+        for value in self.switches:
+            if pattern.search(value):
+                return value
+        return None
+
+
+def classify(index):
+    """Requirements of the index as dicts with their `class`, and the switches of their recipe"""
+    paths = {(row["name"], row["folder"]): row["path"] for row in index.query("SELECT name, folder, path FROM recipes")}
+    conditions = {}
+    requirements = []
+    for row in index.requirements(kinds=["requires"]):
+        if not row["require_name"] or row["require_name"] == row["name"]:
+            continue
+        key = (row["name"], row["folder"])
+        if key not in conditions:
+            path = paths.get(key) or ""
+            conditions[key] = _Conditions(path if os.path.isabs(path) else os.path.join(ROOT_DIR, path))
+        requirement = dict(row)
+        requirement["conditions"] = json.loads(row["conditions"] or "[]")
+        requirement["class"] = conditions[key].classify(requirement["conditions"])
+        requirement["switch"] = conditions[key].switch(row["require_name"]) if requirement["class"] == "unconditional" \
+            else None
+        requirements.append(requirement)
+    return requirements
+
+
+def _folder_classes(requirements):
+    """{(name, folder, dependency): class}, the least restrictive class of the requirements of a folder"""
+    classes = {}
+    for requirement in requirements:
+        key = (requirement["name"], requirement["folder"], requirement["require_name"])
+        current = classes.get(key)
+        if current is None or CLASSES.index(requirement["class"]) < CLASSES.index(current):
+            classes[key] = requirement["class"]
+    return classes
+
+
+def heavy_requirements(requirements, fanin, durations, report_all=False):
+    """Unconditional requirements, with the size and build time of the subgraph they pull, heaviest first"""
+    default = statistics.median(durations.values()) if durations else 1.0
+    classes = _folder_classes(requirements)
+    # Recipes using each dependency, and those which can disable it
+    users, optional = defaultdict(set), defaultdict(set)
+    for (name, _, dependency), requirement_class in classes.items():
+        users[dependency].add(name)
+        if requirement_class == "option":
+            optional[dependency].add(name)
+
+    rows = []
+    seen = set()
+    for requirement in requirements:
+        key = (requirement["name"], requirement["folder"], requirement["require_name"])
+        if classes[key] != "unconditional" or key in seen or requirement["require_name"] not in fanin.index:
+            continue
+        seen.add(key)
+        dependency = requirement["require_name"]
+        subgraph = list(_bits(fanin.upstream[fanin.index[dependency]]))
+        optional_elsewhere = sorted(optional[dependency] - {requirement["name"]})
+        if not report_all and not requirement["switch"] and not optional_elsewhere:
+            continue
+        rows.append({
+            "name": requirement["name"],
+            "folder": requirement["folder"],
+            "requirement": dependency,
+            "line": requirement["line"],
+            "subgraph": len(subgraph),
+            "weighted": sum(durations.get(fanin.names[i], default) for i in subgraph),
+            "switch": requirement["switch"],
+            "optional_in": len(optional_elsewhere),
+            "used_by": len(users[dependency]),
+        })
+    return sorted(rows, key=lambda row: (-row["weighted"], -row["subgraph"], row["name"], row["requirement"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="List the heavy requirements added unconditionally by recipes, which upstream can build without."
+    )
+    parser.add_argument("names", nargs="*", help="only report these recipes.")
+    parser.add_argument("--top", type=int, default=50, help="requirements to show, 0 for all (default: %(default)s).")
+    parser.add_argument("--all", action="store_true",
+                        help="also report the unconditional requirements without any sign of being optional.")
+    parser.add_argument("--timings-db", default=DEFAULT_TIMINGS_DB,
+                        help="database of hook_build_timing.py (default: %(default)s).")
+    parser.add_argument("--json", action="store_true", help="print the requirements as JSON.")
+    add_index_arguments(parser)
+    args = parser.parse_args()
+
+    with open_index(args.db, args.recipes) as index:
+        requirements = classify(index)
+        fanin = FanInGraph(RecipeGraph.from_index(index, kinds=DEFAULT_KINDS))
+    durations = mean_durations(args.timings_db)
+    rows = heavy_requirements(requirements, fanin, durations, args.all)
+    if args.names:
+        rows = [row for row in rows if row["name"] in args.names]
+    rows = rows[:args.top] if args.top else rows
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    counts = defaultdict(int)
+    for requirement_class in _folder_classes(requirements).values():
+        counts[requirement_class] += 1
+    print(", ".join(f"{counts[requirement_class]} {requirement_class}" for requirement_class in CLASSES)
+          + " requirements (one per recipe folder and dependency)")
+    if not durations:
+        print(f"No build recorded in {args.timings_db}, every recipe counts as a 1s build")
+    print(f"{'recipe':36} {'requirement':24} {'subgraph':>8} {'build':>8} {'optional in':>11}  switch")
+    for row in rows:
+        recipe = f"{row['name']}/{row['folder']}:{row['line']}"
+        print(f"{recipe:36} {row['requirement']:24} {row['subgraph']:>8} {format_duration(row['weighted']):>8} "
+              f"{row['optional_in']:>4}/{row['used_by']:<6}  {row['switch'] or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,507 @@
+"""
+
+Size of the package ID space of each recipe, from its options and its package_id() erasures
+
+The theoretical space is the product of the number of values of every option. The effective
+space is the number of distinct package IDs left once the erasures of the recipe are applied:
+`del self.info.options.<option>`, `self.info.clear()`... in package_id(), and the options
+removed with `del self.options.<option>` or `rm_safe()` in config_options() and configure().
+Erasures guarded by conditions on options (`if self.info.options.header_only:`) are evaluated
+for every combination of the options of the conditions. Erasures guarded by anything else (the
+settings, a helper...) are listed as conditional but not applied: the effective space is an
+upper bound.
+
+Options which never affect the binary are the options erased unconditionally, and the options
+which the recipe never reads outside of their removal.
+
+Settings values are not enumerable, erased settings are listed but not counted.
+
+    python3 linter/package_id_matrix.py --top 20
+    python3 linter/package_id_matrix.py ffmpeg opencv qt --json
+
+"""
+
+import argparse
+import ast
+import itertools
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from recipe_index import _Source, add_index_arguments, class_attributes, class_methods, find_conanfile_class, open_index
+
+
+ERASURE_METHODS = ["config_options", "configure", "package_id"]
+# Read by the toolchains or the Conan 2 `implements` without being mentioned by the recipe
+IMPLICIT_OPTIONS = {"shared", "fPIC", "header_only"}
+FALSEY_VALUES = {"false", "none", "0", "off", ""}
+# Combinations of the options of the conditions enumerated to compute the effective space
+MAX_COMBINATIONS = 4096
+
+
+def _option_values(values):
+    """Number of values of an option, None when unbounded ("ANY" or not literal)"""
+    if not isinstance(values, list):
+        return None
+    if any(isinstance(value, str) and value.upper() == "ANY" for value in values):
+        return None
+    return len(values) or 1
+
+
+def _truthy(value):
+    return value is not None and str(value).lower() not in FALSEY_VALUES
+
+
+def _is_self(node):
+    return isinstance(node, ast.Name) and node.id == "self"
+
+
+def _options_owner(node):
+    """'options' for `self.options`, 'info' for `self.info.options`, None otherwise"""
+    if not (isinstance(node, ast.Attribute) and node.attr == "options"):
+        return None
+    if _is_self(node.value):
+        return "options"
+    if isinstance(node.value, ast.Attribute) and node.value.attr == "info" and _is_self(node.value.value):
+        return "info"
+    return None
+
+
+def _is_info(node, attribute=None):
+    """`self.info`, or `self.info.<attribute>`"""
+    if attribute is not None:
+        if not (isinstance(node, ast.Attribute) and node.attr == attribute):
+            return False
+        node = node.value
+    return isinstance(node, ast.Attribute) and node.attr == "info" and _is_self(node.value)
+
+
+def _iterates_options(node):
+    """`self.options`, `self.default_options.keys()`..., every option may be read through the loop"""
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr in ("keys", "items"):
+        node = node.func.value
+    if _options_owner(node):
+        return True
+    return isinstance(node, ast.Attribute) and node.attr == "default_options" and _is_self(node.value)
+
+
+def _string(node, bindings):
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.Name):
+        return bindings.get(node.id)
+    return None
+
+
+def _option_read(node, bindings):
+    """Option read by `self.options.X`, `self.info.options.X` or `.get_safe("X")`, None otherwise"""
+    if isinstance(node, ast.Attribute) and _options_owner(node.value) and node.attr not in ("get_safe", "rm_safe"):
+        return node.attr
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "get_safe" \
+            and _options_owner(node.func.value) and node.args:
+        return _string(node.args[0], bindings)
+    return None
+
+
+class _Condition:
+    """Predicate on the values of some options, built from the test of an `if`"""
+
+    def __init__(self, options, predicate, text):
+        self.options = options
+        self.predicate = predicate
+        self.text = text
+
+    def __call__(self, values):
+        return self.predicate(values)
+
+
+def _condition(node, bindings):
+    """_Condition of a test using only options and literals, None when it uses anything else"""
+    option = _option_read(node, bindings)
+    if option:
+        return _Condition({option}, lambda values: _truthy(values[option]), option)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        operand = _condition(node.operand, bindings)
+        if operand is None:
+            return None
+        return _Condition(operand.options, lambda values: not operand(values), f"not {operand.text}")
+    if isinstance(node, ast.BoolOp):
+        operands = [_condition(value, bindings) for value in node.values]
+        if any(operand is None for operand in operands):
+            return None
+        combine = all if isinstance(node.op, ast.And) else any
+        return _Condition(set().union(*(operand.options for operand in operands)),
+                          lambda values: combine(operand(values) for operand in operands),
+                          "(" + (" and " if combine is all else " or ").join(o.text for o in operands) + ")")
+    if isinstance(node, ast.Compare) and len(node.ops) == 1:
+        option = _option_read(node.left, bindings)
+        try:
+            literal = ast.literal_eval(node.comparators[0])
+        except (ValueError, TypeError, SyntaxError):
+            return None
+        if not option:
+            return None
+        operator = node.ops[0]
+        if isinstance(operator, (ast.Eq, ast.NotEq)):
+            expected = isinstance(operator, ast.Eq)
+            return _Condition({option}, lambda values: (str(values[option]) == str(literal)) == expected,
+                              f"{option} {'==' if expected else '!='} {literal!r}")
+        if isinstance(operator, (ast.In, ast.NotIn)) and isinstance(literal, (list, tuple, set)):
+            expected = isinstance(operator, ast.In)
+            literals = {str(item) for item in literal}
+            return _Condition({option}, lambda values: (str(values[option]) in literals) == expected,
+                              f"{option} {'in' if expected else 'not in'} {sorted(literals)}")
+    return None
+
+
+class _ErasureVisitor(ast.NodeVisitor):
+    """Collect the erasures of a method with the conditions guarding them
+
+    Every erasure is (conditions, kind, target), conditions are _Condition or the source text
+    of a test which isn't only about options. Kinds are 'option' (erased option), 'options'
+    (every option), 'settings' (a setting, or every setting when target is None), 'requires'
+    and 'rewrite' (option whose value is replaced).
+    """
+
+    def __init__(self, source, method):
+        self.source = source
+        self.method = method
+        self.conditions = []
+        self.bindings = {}
+        self.erasures = []
+
+    def _add(self, kind, target=None):
+        self.erasures.append((list(self.conditions), kind, target))
+
+    def _visit_guarded(self, condition, statements):
+        self.conditions.append(condition)
+        for statement in statements:
+            self.visit(statement)
+        self.conditions.pop()
+
+    def visit_If(self, node):
+        condition = _condition(node.test, self.bindings)
+        text = self.source.segment(node.test)
+        self._visit_guarded(condition or text, node.body)
+        if node.orelse:
+            if condition is None:
+                negated = f"not ({text})"
+            else:
+                text = condition.text[4:] if condition.text.startswith("not ") else f"not {condition.text}"
+                negated = _Condition(condition.options, lambda values: not condition(values), text)
+            self._visit_guarded(negated, node.orelse)
+
+    def visit_For(self, node):
+        # for option in ["with_a", "with_b"]: self.options.rm_safe(option)
+        try:
+            items = ast.literal_eval(node.iter)
+        except (ValueError, TypeError, SyntaxError):
+            items = None
+        if isinstance(node.target, ast.Name) and isinstance(items, (list, tuple)) \
+                and all(isinstance(item, str) for item in items):
+            for item in items:
+                self.bindings[node.target.id] = item
+                for statement in node.body:
+                    self.visit(statement)
+            self.bindings.pop(node.target.id, None)
+            return
+        self._visit_guarded(f"for {self.source.segment(node.target)} in {self.source.segment(node.iter)}",
+                            node.body + node.orelse)
+
+    def visit_Try(self, node):
+        # `del self.options.fPIC` in a try block is the usual way to remove an option which may not exist
+        for statement in node.body:
+            self.visit(statement)
+        for handler in node.handlers:
+            self._visit_guarded(f"except {self.source.segment(handler.type) if handler.type else ''}", handler.body)
+        for statement in node.orelse + node.finalbody:
+            self.visit(statement)
+
+    def visit_Delete(self, node):
+        for target in node.targets:
+            if isinstance(target, ast.Attribute) and _options_owner(target.value):
+                self._add("option", target.attr)
+            elif isinstance(target, ast.Attribute) and _is_info(target.value, "settings"):
+                self._add("settings", target.attr)
+
+    def visit_Assign(self, node):
+        for target in node.targets:
+            if self.method == "package_id" and isinstance(target, ast.Attribute) \
+                    and _options_owner(target.value) == "info":
+                self._add("rewrite", target.attr)
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        function = node.func
+        if isinstance(function, ast.Attribute):
+            if function.attr == "rm_safe" and _options_owner(function.value) and node.args:
+                option = _string(node.args[0], self.bindings)
+                if option:
+                    self._add("option", option)
+            elif function.attr == "rm_safe" and _is_info(function.value, "settings") and node.args:
+                self._add("settings", _string(node.args[0], self.bindings))
+            elif function.attr in ("clear", "header_only") and _is_info(function.value):
+                self._add("options")
+                self._add("settings")
+                self._add("requires")
+            elif function.attr == "clear" and _options_owner(function.value) == "info":
+                self._add("options")
+            elif function.attr == "clear" and _is_info(function.value, "settings"):
+                self._add("settings")
+            elif function.attr == "clear" and _is_info(function.value, "requires"):
+                self._add("requires")
+        elif isinstance(function, ast.Name) and function.id == "delattr" and len(node.args) == 2 \
+                and _options_owner(node.args[0]):
+            option = _string(node.args[1], self.bindings)
+            if option:
+                self._add("option", option)
+        self.generic_visit(node)
+
+
+class _ReadVisitor(ast.NodeVisitor):
+    """Options read by the recipe, out of their removal and of package_id()"""
+
+    def __init__(self):
+        self.read = set()
+        self.strings = set()
+        self.dynamic = False
+
+    def visit_Delete(self, node):
+        pass
+
+    def visit_Attribute(self, node):
+        if isinstance(node.ctx, ast.Load) and _options_owner(node.value) and node.attr not in ("get_safe", "rm_safe"):
+            self.read.add(node.attr)
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        function = node.func
+        if isinstance(function, ast.Attribute) and function.attr == "rm_safe":
+            return
+        if isinstance(function, ast.Name) and function.id in ("getattr", "hasattr") and node.args \
+                and _options_owner(node.args[0]):
+            option = _string(node.args[1], {}) if len(node.args) > 1 else None
+            if option:
+                self.read.add(option)
+            else:
+                self.dynamic = True
+        elif isinstance(function, ast.Attribute) and function.attr == "get_safe" and _options_owner(function.value) \
+                and node.args and _string(node.args[0], {}) is None:
+            # self.options.get_safe(f"with_{name}")
+            self.dynamic = True
+        elif any(_iterates_options(argument) for argument in node.args + [keyword.value for keyword in node.keywords]):
+            # self._enabled_modules(self.options)
+            self.dynamic = True
+        self.generic_visit(node)
+
+    def visit_Assign(self, node):
+        # options = self.info.options if info else self.options
+        values = [node.value.body, node.value.orelse] if isinstance(node.value, ast.IfExp) else [node.value]
+        if any(_iterates_options(value) for value in values):
+            self.dynamic = True
+        self.generic_visit(node)
+
+    def visit_For(self, node):
+        # for option in self.options:
+        if _iterates_options(node.iter):
+            self.dynamic = True
+        self.generic_visit(node)
+
+    def visit_comprehension(self, node):
+        if _iterates_options(node.iter):
+            self.dynamic = True
+        self.generic_visit(node)
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, str):
+            self.strings.add(node.value)
+
+
+def analyze_conanfile(source, options):
+    """Erasures and unused options of a conanfile, `options` is {option: values} from the index"""
+    tree = ast.parse(source)
+    source = _Source(source)
+    class_node = find_conanfile_class(tree)
+    if class_node is None:
+        raise Exception("No class found in conanfile")
+    attributes = class_attributes(class_node)
+    methods = class_methods(class_node)
+
+    erasures = []
+    for name in ERASURE_METHODS:
+        if name in methods:
+            visitor = _ErasureVisitor(source, name)
+            for statement in methods[name].body:
+                visitor.visit(statement)
+            erasures.extend((name, conditions, kind, target) for conditions, kind, target in visitor.erasures)
+    implements = attributes.get("implements")
+    implements = ast.literal_eval(implements) if isinstance(implements, (ast.List, ast.Tuple)) else []
+    if "auto_shared_fpic" in implements:
+        erasures.append(("configure", [_Condition({"shared"}, lambda values: _truthy(values["shared"]), "shared")],
+                         "option", "fPIC"))
+    if "auto_header_only" in implements:
+        erasures.append(("package_id",
+                         [_Condition({"header_only"}, lambda values: _truthy(values["header_only"]), "header_only")],
+                         "options", None))
+
+    reader = _ReadVisitor()
+    for statement in class_node.body:
+        if isinstance(statement, ast.FunctionDef) and statement.name == "package_id":
+            continue
+        if isinstance(statement, ast.Assign) and any(isinstance(target, ast.Name)
+                                                     and target.id in ("options", "default_options")
+                                                     for target in statement.targets):
+            continue
+        reader.visit(statement)
+    # The conditions of the package_id() erasures do read the options, `if self.info.options.header_only:`
+    for _, conditions, _, _ in erasures:
+        for condition in conditions:
+            if isinstance(condition, _Condition):
+                reader.read.update(condition.options)
+    unused = [] if reader.dynamic else sorted(
+        option for option in options
+        if option not in IMPLICIT_OPTIONS and option not in reader.read and option not in reader.strings
+    )
+    return erasures, unused
+
+
+def _space(sizes):
+    """(product of the bounded sizes, unbounded options)"""
+    bounded = math.prod(size for size in sizes.values() if size is not None)
+    return bounded, sorted(option for option, size in sizes.items() if size is None)
+
+
+def id_space(options, erasures):
+    """Theoretical and effective ID spaces, and the erasures which couldn't be evaluated"""
+    sizes = {option: _option_values(values) for option, values in options.items()}
+    theoretical = _space(sizes)
+
+    known, conditional = [], []
+    for method, conditions, kind, target in erasures:
+        if kind not in ("option", "options") or (kind == "option" and target not in sizes):
+            continue
+        if all(isinstance(condition, _Condition) and condition.options <= set(sizes) for condition in conditions):
+            known.append((conditions, kind, target))
+        else:
+            conditional.append((method, conditions, kind, target))
+
+    variables = sorted(set().union(*(condition.options for conditions, _, _ in known for condition in conditions)))
+    if any(sizes[option] is None for option in variables) \
+            or math.prod(sizes[option] for option in variables) > MAX_COMBINATIONS:
+        # Too many combinations to enumerate, conditional erasures are not applied
+        conditional.extend(("package_id", conditions, kind, target) for conditions, kind, target in known if conditions)
+        known = [erasure for erasure in known if not erasure[0]]
+        variables = []
+
+    others = [option for option in sizes if option not in variables]
+    ids = {}
+    for combination in itertools.product(*(options[option] for option in variables)):
+        values = dict(zip(variables, combination))
+        erased = set()
+        for conditions, kind, target in known:
+            if all(condition(values) for condition in conditions):
+                erased.update(sizes if kind == "options" else {target})
+        # Combinations with the same kept values and the same kept options give the same package IDs
+        key = (tuple((option, str(value)) for option, value in values.items() if option not in erased),
+               frozenset(option for option in others if option not in erased))
+        ids[key] = key[1]
+
+    effective_count, effective_unbounded = 0, set()
+    for kept in ids.values():
+        bounded, unbounded = _space({option: sizes[option] for option in kept})
+        effective_count += bounded
+        effective_unbounded.update(unbounded)
+    return theoretical, (effective_count, sorted(effective_unbounded)), conditional
+
+
+def _condition_text(conditions):
+    return " and ".join(condition.text if isinstance(condition, _Condition) else condition
+                        for condition in conditions)
+
+
+def analyze_recipe(job):
+    recipes_dir, row = job
+    options = json.loads(row["options"] or "{}")
+    result = {"name": row["name"], "folder": row["folder"], "options": len(options)}
+    try:
+        with open(os.path.join(os.path.dirname(recipes_dir), row["path"]), encoding="utf-8") as f:
+            erasures, unused = analyze_conanfile(f.read(), options)
+    except Exception as error:
+        result["error"] = f"{type(error).__name__}: {error}"
+        return result
+
+    theoretical, effective, conditional = id_space(options, erasures)
+    never = {option: "unused" for option in unused}
+    for method, conditions, kind, target in erasures:
+        if not conditions and kind == "option" and target in options:
+            never[target] = f"erased in {method}()"
+        elif not conditions and kind == "options" and method == "package_id":
+            never.update({option: "erased in package_id()" for option in options})
+    result.update({
+        "theoretical": theoretical[0], "theoretical_unbounded": theoretical[1],
+        "effective": effective[0], "effective_unbounded": effective[1],
+        "never_affect": dict(sorted(never.items())),
+        "conditional_erasures": [
+            {"method": method, "kind": kind, "target": target, "when": _condition_text(conditions)}
+            for method, conditions, kind, target in conditional
+        ],
+        "erased_settings": sorted({target or "*" for method, conditions, kind, target in erasures
+                                   if kind == "settings" and not conditions}),
+        "erased_requires": any(kind == "requires" and not conditions for _, conditions, kind, _ in erasures),
+    })
+    return result
+
+
+def _format_space(count, unbounded):
+    text = str(count) if count < 10 ** 6 else f"2^{math.log2(count):.1f}"
+    if unbounded:
+        text += f" x {len(unbounded)} unbounded option{'s' if len(unbounded) > 1 else ''}"
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Theoretical and effective package ID spaces of the recipes, from their options and erasures."
+    )
+    parser.add_argument("names", nargs="*", help="recipes to analyze (default: every recipe).")
+    parser.add_argument("--top", type=int, default=None, help="only show the N recipes with the largest effective space.")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON.")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of worker processes.")
+    add_index_arguments(parser)
+    args = parser.parse_args()
+
+    with open_index(args.db, args.recipes) as index:
+        sql = "SELECT name, folder, path, options FROM recipes WHERE error IS NULL"
+        rows = [dict(row) for row in index.query(sql) if not args.names or row["name"] in args.names]
+        recipes_dir = index.recipes_dir
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        results = list(executor.map(analyze_recipe, [(recipes_dir, row) for row in rows], chunksize=16))
+
+    for result in results:
+        if "error" in result:
+            print(f"{result['name']}/{result['folder']}: {result['error']}", file=sys.stderr)
+    results = [result for result in results if "error" not in result]
+    results.sort(key=lambda result: (result["effective"], result["theoretical"]), reverse=True)
+    if args.top:
+        results = results[:args.top]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for result in results:
+        print(f"{result['name']}/{result['folder']}: {result['options']} options, "
+              f"theoretical {_format_space(result['theoretical'], result['theoretical_unbounded'])}, "
+              f"effective {_format_space(result['effective'], result['effective_unbounded'])}")
+        for option, reason in result["never_affect"].items():
+            print(f"    never affects the binary: {option} ({reason})")
+        for erasure in result["conditional_erasures"]:
+            target = erasure["target"] or "every option"
+            print(f"    erased in {erasure['method']}() when {erasure['when']}: {target}")
+        if result["erased_settings"]:
+            print(f"    erased settings: {', '.join(result['erased_settings'])}")
+
+
+if __name__ == "__main__":
+    main()
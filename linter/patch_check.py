@@ -0,0 +1,280 @@
+"""
+
+Apply the patches listed in conandata.yml to the upstream sources, without building
+
+For every version of the selected recipes, the source archive is taken from the cache of
+source_prefetch.py (and downloaded when missing), extracted once into <cache>/extracted/<sha256>
+and the patches are applied in order, with GNU patch, to a copy of that tree. Copies are made
+of hardlinks (or reflinks, or plain copies), and the files a patch modifies are copied first,
+so the extracted trees are never modified and are reused by the next runs.
+
+Versions are checked in parallel. Patches which don't apply are reported with the GitHub
+annotations used by the YAML linters.
+
+    python3 linter/patch_check.py recipes/boost/all/conandata.yml
+    python3 linter/patch_check.py zlib/1.3.1
+
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from recipe_graph import RecipeGraph
+from recipe_impact import parse_changes
+from recipe_index import add_index_arguments, open_index
+from source_prefetch import DEFAULT_CACHE_DIR, fetch
+
+
+LINK_MODES = ["hardlink", "reflink", "copy"]
+
+
+def _check_members(archive, destination):
+    """Raise tarfile.TarError for the members of a tar archive which would be written outside of `destination`
+
+    For the Pythons without the extraction filters of tarfile (PEP 706)
+    """
+    root = os.path.realpath(destination)
+    for member in archive.getmembers():
+        paths = [os.path.join(destination, member.name)]
+        if member.issym():
+            paths.append(os.path.join(destination, os.path.dirname(member.name), member.linkname))
+        elif member.islnk():
+            paths.append(os.path.join(destination, member.linkname))
+        for path in paths:
+            if os.path.commonpath([root, os.path.realpath(path)]) != root:
+                raise tarfile.TarError(f"{member.name} would be extracted outside of the destination")
+
+
+def extract(archive, cache_dir, sha256):
+    """Extract `archive` once into the cache, return the extracted folder
+
+    Members of tar archives can't be written outside of the folder (zipfile already sanitizes the
+    paths), tarfile.TarError is raised for such archives.
+    """
+    destination = os.path.join(cache_dir, "extracted", sha256)
+    if os.path.isdir(destination):
+        return destination
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=os.path.dirname(destination), prefix=f"{sha256}.tmp")
+    try:
+        if zipfile.is_zipfile(archive):
+            with zipfile.ZipFile(archive) as f:
+                f.extractall(tmp)
+        else:
+            with tarfile.open(archive) as f:
+                if hasattr(tarfile, "data_filter"):
+                    f.extractall(tmp, filter="data")
+                else:
+                    _check_members(f, tmp)
+                    f.extractall(tmp)
+        try:
+            os.rename(tmp, destination)
+        except OSError:
+            # Extracted meanwhile by another process
+            pass
+    finally:
+        if os.path.isdir(tmp):
+            shutil.rmtree(tmp, ignore_errors=True)
+    return destination
+
+
+def source_roots(extracted):
+    """Candidate source folders: the single top folder of the archive (strip_root=True), then the archive root"""
+    entries = os.listdir(extracted)
+    roots = []
+    if len(entries) == 1 and os.path.isdir(os.path.join(extracted, entries[0])):
+        roots.append(os.path.join(extracted, entries[0]))
+    roots.append(extracted)
+    return roots
+
+
+def copy_tree(source, destination, link_mode):
+    if link_mode == "reflink":
+        subprocess.run(["cp", "-r", "--reflink=auto", source, destination], check=True)
+    elif link_mode == "hardlink":
+        shutil.copytree(source, destination, symlinks=True, copy_function=os.link)
+    else:
+        shutil.copytree(source, destination, symlinks=True)
+
+
+def _patched_files(patch_content):
+    files = set()
+    for line in patch_content.splitlines():
+        if line.startswith(("--- ", "+++ ")):
+            path = line[4:].split("\t")[0].strip()
+            if path != "/dev/null":
+                files.add(path)
+    return files
+
+
+def _strip_levels(patch_content):
+    """Strip levels to try, the one of `a/` `b/` prefixes first"""
+    return [1, 0] if re.search(r"^\+\+\+ b/", patch_content, re.MULTILINE) else [0, 1]
+
+
+def _break_links(base, patch_content, strip):
+    """Replace the hardlinks of the files a patch modifies by copies, so the shared tree is untouched"""
+    for path in _patched_files(patch_content):
+        path = os.path.join(base, *path.split("/")[strip:])
+        if os.path.isfile(path) and not os.path.islink(path) and os.stat(path).st_nlink > 1:
+            tmp = f"{path}.patch_check"
+            shutil.copy2(path, tmp)
+            os.replace(tmp, path)
+
+
+def _base_candidates(root, base_path):
+    """base_path, then base_path without its leading folders (e.g. 'source_subfolder', 'qt5')"""
+    parts = [part for part in (base_path or "").replace("\\", "/").split("/") if part]
+    candidates = [os.path.join(root, *parts[i:]) for i in range(len(parts) + 1)]
+    return [candidate for candidate in candidates if os.path.isdir(candidate)]
+
+
+def apply_patch(tree, patch_file, base_path):
+    """Apply a patch to the working tree, return None or the output of the failed attempt"""
+    with open(patch_file, encoding="utf-8", errors="replace") as f:
+        content = f.read()
+    output = None
+    for base in _base_candidates(tree, base_path):
+        # Like patch-ng, another strip level is tried when the patch doesn't apply with the first one
+        for strip in _strip_levels(content):
+            command = ["patch", f"-p{strip}", "--batch", "--forward", "--silent", "--no-backup-if-mismatch",
+                       "--reject-file=-", "-d", base, "-i", os.path.abspath(patch_file)]
+            dry_run = subprocess.run(command + ["--dry-run"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                     text=True)
+            if dry_run.returncode == 0:
+                _break_links(base, content, strip)
+                subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, check=True)
+                return None
+            output = output or dry_run.stdout.strip()
+    return output or f"base_path '{base_path}' not found in the sources"
+
+
+def _conandata_line(conandata, version, patch_file):
+    """Line of the patch entry in conandata.yml, 1-based, 0 when not found"""
+    try:
+        with open(conandata, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return 0
+    in_patches = in_version = False
+    for number, line in enumerate(lines, 1):
+        if re.match(r"^patches:", line):
+            in_patches = True
+        elif in_patches and re.match(rf"^\s+['\"]?{re.escape(version)}['\"]?:", line):
+            in_version = True
+        elif in_version and patch_file in line and "patch_file" in line:
+            return number
+    return 0
+
+
+def check_version(job):
+    """Apply the patches of one version, return the annotations"""
+    recipe_folder, version, sha256, archive, patches, cache_dir, link_mode = job
+    conandata = os.path.join(recipe_folder, "conandata.yml")
+    try:
+        extracted = extract(archive, cache_dir, sha256)
+    except tarfile.TarError as error:
+        return [_annotation(conandata, 0, f"Sources of version `{version}` can't be extracted.", str(error))]
+    best = None
+    for root in source_roots(extracted):
+        errors = []
+        workdir = tempfile.mkdtemp(dir=os.path.join(cache_dir, "extracted"), prefix="worktree-")
+        try:
+            tree = os.path.join(workdir, "src")
+            copy_tree(root, tree, link_mode)
+            for patch_file, base_path in patches:
+                path = os.path.join(recipe_folder, patch_file)
+                if not os.path.isfile(path):
+                    errors.append((patch_file, f"Patch `{patch_file}` of version `{version}` does not exist.", ""))
+                    continue
+                output = apply_patch(tree, path, base_path)
+                if output:
+                    errors.append((patch_file, f"Patch `{patch_file}` does not apply to the sources of version `{version}`.", output))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        if not errors:
+            return []
+        if best is None or len(errors) < len(best):
+            best = errors
+
+    return [_annotation(conandata, _conandata_line(conandata, version, patch_file), summary, output)
+            for patch_file, summary, output in best]
+
+
+def _annotation(conandata, line, summary, output):
+    details = output.replace("%", "%25").replace("\r", "").replace("\n", "%0A")
+    return (f"::error file={os.path.relpath(conandata)},line={line},"
+            f"title=conandata.yml patch error"
+            f"::{summary}" + (f"%0A%0A{details}%0A" if details else ""))
+
+
+def collect_jobs(index, changed, cache_dir, link_mode, offline):
+    jobs = []
+    for name, versions in sorted(changed.items()):
+        folders = index.versions(name)
+        for version in sorted(versions):
+            folder = folders.get(version)
+            patches = [(row["patch_file"], row["base_path"]) for row in index.query(
+                "SELECT patch_file, base_path FROM patches WHERE name = ? AND folder = ? AND version = ?",
+                (name, folder, version)) if row["patch_file"]]
+            if not patches:
+                continue
+            sources = index.query("SELECT urls, sha256 FROM sources WHERE name = ? AND folder = ? AND version = ?",
+                                  (name, folder, version))
+            if len(sources) != 1 or not sources[0]["sha256"]:
+                print(f"Skipping {name}/{version}: patches can only be checked for a single source archive "
+                      f"with a sha256", file=sys.stderr)
+                continue
+            sha256 = sources[0]["sha256"].lower()
+            if offline:
+                archive = os.path.join(cache_dir, sha256[:2], sha256)
+                archive = archive if os.path.isfile(archive) else None
+            else:
+                archive, _, _ = fetch(cache_dir, sha256, json.loads(sources[0]["urls"]))
+            if not archive:
+                print(f"Skipping {name}/{version}: sources not available", file=sys.stderr)
+                continue
+            recipe_folder = os.path.join(index.recipes_dir, name, folder)
+            jobs.append((recipe_folder, version, sha256, archive, patches, cache_dir, link_mode))
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Apply the patches of conandata.yml files to their cached sources."
+    )
+    parser.add_argument("changes", nargs="+", help="changed files or references (name or name/version).")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="sources cache folder (default: %(default)s).")
+    parser.add_argument("--link-mode", choices=LINK_MODES, default="hardlink",
+                        help="how working trees are copied from the extracted sources (default: %(default)s).")
+    parser.add_argument("--offline", action="store_true", help="do not download missing sources.")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of worker processes.")
+    add_index_arguments(parser)
+    args = parser.parse_args()
+
+    with open_index(args.db, args.recipes) as index:
+        graph = RecipeGraph.from_index(index)
+        changed = parse_changes(graph, args.changes)
+        jobs = collect_jobs(index, changed, args.cache_dir, args.link_mode, args.offline)
+
+    errors = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        for annotations in executor.map(check_version, jobs):
+            for annotation in annotations:
+                print(annotation)
+                errors += annotation.startswith("::error")
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
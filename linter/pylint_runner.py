@@ -0,0 +1,160 @@
+"""
+
+Run pylint over many recipes in parallel, caching the results of every file
+
+Files are split in chunks and every chunk is linted by its own pylint process. The
+messages reported for each file are stored in the cache of lint_cache.py, keyed by the
+content of the file, the rcfile, the sources of the linter plugins and the pylint version,
+so only the files affected by a change are linted again. The output is the same JSON list
+pylint writes with `--output-format=json`, or its `parseable` output (the format matched by
+linter/recipe_linter.json) with the pylint exit status.
+
+The `duplicate-code` check compares files against each other, so its result depends on
+how files are chunked and can't be cached per file: it is always disabled.
+
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import lint_cache
+from lint_cache import DEFAULT_CACHE_DIR, LINTER_DIR, config_hash, file_key
+
+
+# Bits of the pylint exit status
+STATUS = {"fatal": 1, "error": 2, "warning": 4, "refactor": 8, "convention": 16}
+
+
+def file_id(path):
+    """Identifier of a file, the same for any path to it (`./recipes/...`, absolute...)"""
+    return os.path.normcase(os.path.realpath(path))
+
+
+def group_messages(files, messages):
+    """({file_id: messages} of the requested `files`, messages of the files which were not requested)
+
+    pylint reports paths as it wants, so messages are matched to files by `file_id`.
+    """
+    by_file = {file_id(path): [] for path in files}
+    unknown = []
+    for message in messages:
+        messages_of_file = by_file.get(file_id(message["path"]))
+        if messages_of_file is None:
+            unknown.append(message)
+        else:
+            messages_of_file.append(message)
+    return by_file, unknown
+
+
+def run_pylint(files, rcfile, pylint_args):
+    """Lint a chunk of files in a single pylint process, return the messages grouped by file (see group_messages)"""
+    cmd = [sys.executable, "-m", "pylint", f"--rcfile={rcfile}", "--output-format=json",
+           "--score=n", "--exit-zero", "--disable=duplicate-code"] + pylint_args + files
+    res = subprocess.run(cmd, stdout=subprocess.PIPE, check=True)
+    return group_messages(files, json.loads(res.stdout or "[]"))
+
+
+def parseable(message):
+    """Message in `--output-format=parseable`"""
+    return f"{message['path']}:{message['line']}: [{message['message-id']}({message['symbol']}), " \
+           f"{message['obj']}] {message['message']}"
+
+
+def exit_status(messages):
+    status = 0
+    for message in messages:
+        status |= STATUS.get(message["type"], 0)
+    return status
+
+
+def _chunks(items, jobs, chunk_size):
+    if not chunk_size:
+        # A few chunks per job keeps the workers busy when some chunks are slower
+        chunk_size = max(1, min(50, len(items) // (jobs * 4) or 1))
+    return [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+
+def lint(files, rcfile, pylint_args=None, jobs=None, cache_dir=DEFAULT_CACHE_DIR, chunk_size=None):
+    """Lint `files`, reusing cached results when available. Returns the list of pylint messages"""
+    pylint_args = pylint_args or []
+    jobs = jobs or os.cpu_count() or 1
+    config = config_hash(rcfile, pylint_args)
+
+    # {file_id: messages}
+    results = {}
+    pending = {}
+    for path in files:
+        key = file_key(path, config)
+        cached = lint_cache.load(cache_dir, key, path) if cache_dir else None
+        if cached is None:
+            pending[path] = key
+        else:
+            results[file_id(path)] = cached
+
+    unknown = []
+    if pending:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            chunks = _chunks(list(pending), jobs, chunk_size)
+            for chunk, (by_file, chunk_unknown) in zip(chunks, executor.map(
+                    lambda chunk: run_pylint(chunk, rcfile, pylint_args), chunks)):
+                results.update(by_file)
+                unknown.extend(chunk_unknown)
+                for path in chunk:
+                    messages = by_file[file_id(path)]
+                    # Without messages of its own, a file of a chunk with messages for unknown files may
+                    # not have been linted: its (empty) result is not cached
+                    if cache_dir and (messages or not chunk_unknown):
+                        lint_cache.store(cache_dir, pending[path], messages)
+
+    print(f"Linted {len(files)} files ({len(files) - len(pending)} cached, {len(pending)} linted)",
+          file=sys.stderr)
+    if unknown:
+        print(f"pylint reported {len(unknown)} messages for files which were not requested: "
+              f"{', '.join(sorted({message['path'] for message in unknown}))}", file=sys.stderr)
+    return [message for path in files for message in results.get(file_id(path), [])] + unknown
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run pylint over many recipes in parallel, caching the result for each file. "
+                    "Unknown arguments are forwarded to pylint."
+    )
+    parser.add_argument("files", nargs="*", help="files to lint (globs are expanded).")
+    parser.add_argument("--rcfile", required=True, help="pylint rcfile.")
+    parser.add_argument("--output", help="write the output to this file instead of stdout.")
+    parser.add_argument("--output-format", choices=["json", "parseable"], default="json",
+                        help="`parseable` exits with the status of pylint (default: %(default)s).")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of pylint processes (defaults to the number of CPUs).")
+    parser.add_argument("--chunk-size", type=int, default=None, help="number of files linted by each pylint process.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="folder to store the results (default: %(default)s).")
+    parser.add_argument("--no-cache", action="store_true", help="do not read nor write cached results.")
+    args, pylint_args = parser.parse_known_args()
+
+    files = []
+    for pattern in args.files:
+        files.extend(sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern])
+
+    messages = lint(files, args.rcfile, pylint_args, jobs=args.jobs,
+                    cache_dir=None if args.no_cache else args.cache_dir, chunk_size=args.chunk_size)
+
+    if args.output_format == "parseable":
+        output = "\n".join(parseable(message) for message in messages)
+    else:
+        output = json.dumps(messages, indent=4)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    elif output:
+        print(output)
+    if args.output_format == "parseable":
+        sys.exit(exit_status(messages))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+
+Rank the recipes by transitive fan-in: the recipes rebuilt when they change
+
+The fan-in of a recipe is the number of recipes requiring it, directly or not, in the static
+recipe index (every version and every condition of the requirements counts). It is weighted by
+the mean build time of those recipes, recorded by hook_build_timing.py (see build_times.py):
+the time spent rebuilding everything downstream of a change. Recipes never recorded use the
+median of the recorded ones, so without any timing the weight is proportional to the fan-in.
+
+The graph is stored as integer adjacency lists, and the transitive closure is computed once per
+strongly connected component, in reverse topological order, as bitsets: the closure of a
+recipe is the union of the (already computed) closures of its direct consumers.
+
+    python3 linter/recipe_fanin.py --top 30
+    python3 linter/recipe_fanin.py --graph zlib.dot --focus zlib
+    dot -Tsvg zlib.dot -o zlib.svg
+
+"""
+
+import argparse
+import json
+import os
+import statistics
+
+from build_times import DEFAULT_DB as DEFAULT_TIMINGS_DB, format_duration, mean_durations
+from recipe_graph import DEFAULT_KINDS, RecipeGraph
+from recipe_index import REQUIREMENT_KINDS, add_index_arguments, open_index
+
+
+SORT_KEYS = ["weighted", "fanin", "direct"]
+
+
+def _bits(mask):
+    """Indexes of the bits set in `mask`"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class FanInGraph:
+    """Requirement graph as adjacency lists of integers, with the downstream closure of every node"""
+
+    def __init__(self, graph):
+        self.names = sorted(graph.nodes())
+        self.index = {name: i for i, name in enumerate(self.names)}
+        # consumers[i]: recipes requiring i, requires[i]: recipes i requires
+        self.consumers = [tuple(sorted(self.index[consumer] for consumer in graph.consumers.get(name, ())))
+                          for name in self.names]
+        self.requires = [tuple(sorted(self.index[dependency] for dependency in graph.requires.get(name, ())))
+                         for name in self.names]
+        self.closure = self._closures(self.consumers)
+        self._upstream = None
+
+    @property
+    def upstream(self):
+        """Bitset of every node and the nodes it requires, directly or not, the node included"""
+        if self._upstream is None:
+            self._upstream = self._closures(self.requires)
+        return self._upstream
+
+    def _closures(self, edges):
+        """Bitset of every node and the nodes reachable through `edges`, the node included
+
+        Iterative Tarjan: components are completed after every component they reach, so the
+        closures of their successors are already known.
+        """
+        count = len(self.names)
+        closure = [0] * count
+        order = [None] * count
+        low = [0] * count
+        on_stack = [False] * count
+        stack = []
+        counter = 0
+        for root in range(count):
+            if order[root] is not None:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, position = work.pop()
+                if position == 0:
+                    order[node] = low[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack[node] = True
+                successors = edges[node]
+                if position < len(successors):
+                    work.append((node, position + 1))
+                    successor = successors[position]
+                    if order[successor] is None:
+                        work.append((successor, 0))
+                    elif on_stack[successor]:
+                        low[node] = min(low[node], order[successor])
+                    continue
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] != order[node]:
+                    continue
+                members = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    members.append(member)
+                    if member == node:
+                        break
+                mask = 0
+                for member in members:
+                    mask |= 1 << member
+                for member in members:
+                    for successor in edges[member]:
+                        mask |= closure[successor]
+                for member in members:
+                    closure[member] = mask
+        return closure
+
+    def downstream(self, name):
+        """Names of the recipes requiring `name`, directly or not"""
+        i = self.index[name]
+        return [self.names[j] for j in _bits(self.closure[i]) if j != i]
+
+    def subgraph(self, names):
+        """Bitset of `names` and everything downstream of them"""
+        mask = 0
+        for name in names:
+            mask |= self.closure[self.index[name]]
+        return mask
+
+
+def rank(fanin, durations, sort="weighted"):
+    """Rows of the ranking, one for each recipe with a fan-in"""
+    default = statistics.median(durations.values()) if durations else 1.0
+    weights = [durations.get(name, default) for name in fanin.names]
+    rows = []
+    for i, name in enumerate(fanin.names):
+        downstream = [j for j in _bits(fanin.closure[i]) if j != i]
+        if not downstream:
+            continue
+        rows.append({
+            "name": name,
+            "direct": len(fanin.consumers[i]),
+            "fanin": len(downstream),
+            "weighted": sum(weights[j] for j in downstream),
+            "timed": sum(1 for j in downstream if fanin.names[j] in durations),
+            "build": durations.get(name),
+        })
+    return sorted(rows, key=lambda row: (-row[sort], row["name"]))
+
+
+def _selected(fanin, focus):
+    if not focus:
+        return range(len(fanin.names))
+    return sorted(_bits(fanin.subgraph(focus)))
+
+
+def to_json(fanin, rows, focus=None):
+    by_name = {row["name"]: row for row in rows}
+    selected = _selected(fanin, focus)
+    members = set(selected)
+    nodes = []
+    for i in selected:
+        row = by_name.get(fanin.names[i], {})
+        nodes.append({"name": fanin.names[i], "fanin": row.get("fanin", 0), "weighted": row.get("weighted", 0.0)})
+    # Edges go from a recipe to the recipes it requires
+    edges = [[fanin.names[i], fanin.names[j]] for i in selected for j in fanin.requires[i] if j in members]
+    return {"nodes": nodes, "edges": edges}
+
+
+def to_dot(fanin, rows, focus=None):
+    """Graphviz graph, the redder a recipe the more build time depends on it"""
+    graph = to_json(fanin, rows, focus)
+    heaviest = max((node["weighted"] for node in graph["nodes"]), default=0.0) or 1.0
+    lines = ["digraph recipes {", "  rankdir=BT;", '  node [shape=box, style=filled, fontname="Helvetica"];']
+    for node in graph["nodes"]:
+        saturation = node["weighted"] / heaviest
+        lines.append(f'  "{node["name"]}" [label="{node["name"]}\\nfan-in {node["fanin"]}", '
+                     f'fillcolor="0.000 {saturation:.3f} 1.000"];')
+    for consumer, dependency in graph["edges"]:
+        lines.append(f'  "{consumer}" -> "{dependency}";')
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rank the recipes by transitive fan-in, weighted by the build time of the recipes downstream."
+    )
+    parser.add_argument("names", nargs="*", help="only rank these recipes.")
+    parser.add_argument("--top", type=int, default=30, help="recipes to show, 0 for all (default: %(default)s).")
+    parser.add_argument("--sort", choices=SORT_KEYS, default="weighted",
+                        help="downstream build time, number of downstream recipes or of direct consumers "
+                             "(default: %(default)s).")
+    parser.add_argument("--kinds", nargs="+", default=list(DEFAULT_KINDS), choices=REQUIREMENT_KINDS,
+                        help="requirements to follow, build_requires are the same as tool_requires "
+                             "(default: %(default)s).")
+    parser.add_argument("--timings-db", default=DEFAULT_TIMINGS_DB,
+                        help="database of hook_build_timing.py (default: %(default)s).")
+    parser.add_argument("--graph", help="write the graph to this file, Graphviz (.dot, .gv) or JSON (.json).")
+    parser.add_argument("--focus", nargs="+", help="only write these recipes and the recipes downstream of them.")
+    parser.add_argument("--json", action="store_true", help="print the ranking as JSON.")
+    add_index_arguments(parser)
+    args = parser.parse_args()
+
+    with open_index(args.db, args.recipes) as index:
+        graph = RecipeGraph.from_index(index, kinds=args.kinds)
+    fanin = FanInGraph(graph)
+    for name in (args.names or []) + (args.focus or []):
+        if name not in fanin.index:
+            parser.error(f"unknown recipe {name}")
+    durations = mean_durations(args.timings_db)
+    rows = rank(fanin, durations, args.sort)
+
+    if args.graph:
+        with open(args.graph, "w", encoding="utf-8") as f:
+            if os.path.splitext(args.graph)[1] == ".json":
+                json.dump(to_json(fanin, rows, args.focus), f, indent=2)
+                f.write("\n")
+            else:
+                f.write(to_dot(fanin, rows, args.focus))
+
+    if args.names:
+        rows = [row for row in rows if row["name"] in args.names]
+    rows = rows[:args.top] if args.top else rows
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    edges = sum(len(requires) for requires in fanin.requires)
+    print(f"{len(fanin.names)} recipes, {edges} requirement edges, {len(durations)} recipes with build timings")
+    if not durations:
+        print(f"No build recorded in {args.timings_db}, every recipe counts as a 1s build")
+    print(f"{'rank':>4} {'recipe':30} {'direct':>6} {'fan-in':>6} {'downstream':>10} {'timed':>6} {'build':>8}")
+    for position, row in enumerate(rows, 1):
+        print(f"{position:>4} {row['name']:30} {row['direct']:>6} {row['fanin']:>6} "
+              f"{format_duration(row['weighted']):>10} {row['timed']:>6} {format_duration(row['build']):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+
+Cross-check the config.yml, conandata.yml and conanfile.py files of recipe folders
+
+Every file of a recipe is read once: config.yml, then the conandata.yml and the conanfile.py
+(parsed with `ast`, never imported) of each folder. The checks are:
+
+ * every version of config.yml has a folder with a conanfile.py, and sources in the
+   conandata.yml of this folder (when the recipe uses conandata.yml at all).
+ * every `patch_file` listed in conandata.yml exists in the folder.
+ * every patch file is exported with the recipe: `export_conandata_patches()` in
+   export_sources(), or a pattern of `exports_sources` (or of a `copy()` of export_sources())
+   matching it. Patterns which are not literals are assumed to export the patches.
+
+Any file of a recipe (config.yml, conandata.yml, a patch...) or its folder selects the recipe.
+Recipes are checked in parallel and the errors are printed with the annotations of the YAML
+linters.
+
+    python3 linter/recipe_folder_linter.py "recipes/*/config.yml"
+    python3 linter/recipe_folder_linter.py recipes/zlib/all/conandata.yml
+
+"""
+
+import argparse
+import ast
+import fnmatch
+import glob
+import os
+
+import yaml
+from recipe_index import class_attributes, class_methods, find_conanfile_class, _literal
+from yaml_linting import lint_files
+
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def recipe_folder(path):
+    """recipes/<name> folder of any file or folder of a recipe, None when not in a recipe"""
+    folder = os.path.abspath(path if os.path.isdir(path) else os.path.dirname(path))
+    while True:
+        if os.path.isfile(os.path.join(folder, "config.yml")):
+            return os.path.relpath(folder)
+        parent = os.path.dirname(folder)
+        if parent == folder:
+            return None
+        folder = parent
+
+
+def expand_recipes(parser, patterns):
+    folders = []
+    for pattern in patterns:
+        paths = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not paths or not all(os.path.exists(path) for path in paths):
+            parser.error(f"{pattern} does not point to a file")
+        for path in paths:
+            folder = recipe_folder(path)
+            if folder and folder not in folders:
+                folders.append(folder)
+    return folders
+
+
+def _compose(path):
+    """Root node of a YAML file, scalars keep their text and their line"""
+    with open(path, encoding="utf-8") as f:
+        return yaml.compose(f, Loader=Loader)
+
+
+def _fields(node):
+    if not isinstance(node, yaml.MappingNode):
+        return {}
+    return {key.value: (key, value) for key, value in node.value if isinstance(key, yaml.ScalarNode)}
+
+
+def _annotation(path, node, message, title):
+    line = node.start_mark.line + 1 if node is not None else 1
+    return f"::error file={path},line={line},endline={line},title={title}::{message}"
+
+
+class _Exports:
+    """Files exported as sources by a conanfile: patterns, or everything when not literal"""
+
+    def __init__(self, tree):
+        self.patterns = []
+        self.conandata_patches = False
+        self.unknown = False
+        class_node = find_conanfile_class(tree) if tree else None
+        if class_node is None:
+            self.unknown = True
+            return
+        attribute = class_attributes(class_node).get("exports_sources")
+        if attribute is not None:
+            self._add(_literal(attribute))
+        method = class_methods(class_node).get("export_sources")
+        if method is not None:
+            for node in ast.walk(method):
+                if isinstance(node, ast.Call):
+                    self._call(node)
+
+    def _add(self, value):
+        if isinstance(value, str):
+            self.patterns.append(value)
+        elif isinstance(value, (list, tuple)) and all(isinstance(pattern, str) for pattern in value):
+            self.patterns.extend(value)
+        else:
+            self.unknown = True
+
+    def _call(self, node):
+        name = node.func.attr if isinstance(node.func, ast.Attribute) else getattr(node.func, "id", None)
+        if name == "export_conandata_patches":
+            self.conandata_patches = True
+        elif name == "copy":
+            # copy(self, pattern, src, dst) of Conan 2, self.copy(pattern, dst, src) of Conan 1
+            keywords = {keyword.arg: keyword.value for keyword in node.keywords}
+            if isinstance(node.func, ast.Name):
+                arguments = node.args[1:]
+                src = keywords.get("src", arguments[1] if len(arguments) > 1 else None)
+                relative = _is_recipe_folder(src)
+            else:
+                arguments = node.args
+                relative = "src" not in keywords and len(arguments) < 3
+            pattern = keywords.get("pattern", arguments[0] if arguments else None)
+            if pattern is None or not relative:
+                self.unknown = True
+            else:
+                self._add(_literal(pattern))
+
+    def covers(self, patch_file):
+        if self.conandata_patches or self.unknown:
+            return True
+        return any(fnmatch.fnmatch(patch_file, pattern) for pattern in self.patterns)
+
+
+def _is_recipe_folder(node):
+    return isinstance(node, ast.Attribute) and node.attr == "recipe_folder"
+
+
+def _uses_conandata(tree):
+    return any(isinstance(node, ast.Attribute) and node.attr == "conan_data" for node in ast.walk(tree))
+
+
+def lint_folder(recipe_dir, config_path, folder, versions):
+    """Errors of one folder of a recipe, `versions` are the (version, node) of config.yml using it"""
+    output = []
+    folder_dir = os.path.join(recipe_dir, folder)
+    conanfile_path = os.path.join(folder_dir, "conanfile.py")
+    conandata_path = os.path.join(folder_dir, "conandata.yml")
+    if not os.path.isfile(conanfile_path):
+        for version, node in versions:
+            output.append(_annotation(config_path, node, f"Version `{version}` uses folder `{folder}`, "
+                                      f"which has no conanfile.py", "config.yml inconsistency"))
+        return output
+
+    with open(conanfile_path, encoding="utf-8") as f:
+        try:
+            tree = ast.parse(f.read(), filename=conanfile_path)
+        except SyntaxError as error:
+            return [f"::error file={conanfile_path},line={error.lineno or 1},endline={error.lineno or 1},"
+                    f"title=conanfile.py syntax error::{error.msg}"]
+
+    if not os.path.isfile(conandata_path):
+        if _uses_conandata(tree):
+            for version, node in versions:
+                output.append(_annotation(config_path, node, f"Version `{version}` has no sources, "
+                                          f"`{folder}` has no conandata.yml", "config.yml inconsistency"))
+        return output
+    try:
+        conandata = _fields(_compose(conandata_path))
+    except yaml.YAMLError as error:
+        mark = getattr(error, "problem_mark", None)
+        line = mark.line + 1 if mark else 1
+        return [f"::error file={conandata_path},line={line},endline={line},"
+                f"title=conandata.yml parse error::{str(error).replace(chr(10), '%0A')}"]
+
+    sources = _fields(conandata.get("sources", (None, None))[1])
+    for version, node in versions:
+        if version not in sources:
+            output.append(_annotation(config_path, node, f"Version `{version}` has no sources in "
+                                      f"{folder}/conandata.yml", "config.yml inconsistency"))
+
+    exports = _Exports(tree)
+    reported = set()
+    for _, (_, patches) in _fields(conandata.get("patches", (None, None))[1]).items():
+        if not isinstance(patches, yaml.SequenceNode):
+            continue
+        for patch in patches.value:
+            key, node = _fields(patch).get("patch_file", (None, None))
+            if not isinstance(node, yaml.ScalarNode) or node.value in reported:
+                continue
+            reported.add(node.value)
+            if not os.path.isfile(os.path.join(folder_dir, node.value)):
+                output.append(_annotation(conandata_path, key, f"Patch file `{node.value}` does not exist",
+                                          "conandata.yml inconsistency"))
+            elif not exports.covers(node.value):
+                output.append(_annotation(conandata_path, key, f"Patch file `{node.value}` is not exported, "
+                                          "call `export_conandata_patches(self)` in `export_sources()`",
+                                          "conandata.yml inconsistency"))
+    return output
+
+
+def lint_recipe(recipe_dir):
+    """Cross-check the files of a recipe, returning the annotations to print"""
+    config_path = os.path.join(recipe_dir, "config.yml")
+    try:
+        config = _fields(_compose(config_path))
+    except yaml.YAMLError:
+        # Reported by the config.yml linters
+        return []
+    folders = {}
+    for version, (key, entry) in _fields(config.get("versions", (None, None))[1]).items():
+        folder = _fields(entry).get("folder", (None, None))[1]
+        if isinstance(folder, yaml.ScalarNode):
+            folders.setdefault(folder.value, []).append((version, key))
+    output = []
+    for folder, versions in folders.items():
+        output.extend(lint_folder(recipe_dir, config_path, folder, versions))
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cross-check the config.yml, conandata.yml and conanfile.py files of recipe folders."
+    )
+    parser.add_argument("path", nargs="+", help="files or folders of the recipes, glob patterns (quoted) are expanded.")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="number of worker processes (defaults to the number of CPUs).")
+    args = parser.parse_args()
+
+    lint_files(lint_recipe, expand_recipes(parser, args.path), args.jobs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+
+Requirement graph of the whole index, built from the static recipe index
+
+Nodes are recipe names, an edge goes from a recipe to each recipe it requires. Every edge keeps
+the requirement rows of recipe_index.py, so the recipe folder, the version (or version range)
+and the conditions of the requirement are available. Versions of the requirements are only
+known when they are written literally in the recipe, any other requirement (computed, from an
+f-string...) is considered to match every version.
+
+"""
+
+import re
+from collections import defaultdict
+
+from recipe_index import REQUIREMENT_METHODS, open_index
+
+
+DEFAULT_KINDS = ("requires", "tool_requires")
+
+
+def _version_key(version):
+    key = []
+    for item in re.split(r"[.\-+_]", str(version)):
+        if item.isdigit():
+            key.append((0, int(item)))
+        elif item:
+            key.append((1, item))
+    # Trailing zeros don't change the version: 1.2 == 1.2.0
+    while key and key[-1] == (0, 0):
+        key.pop()
+    return tuple(key)
+
+
+def _bump(version, position):
+    """Smallest version above every version starting with the first `position` items of `version`"""
+    items = [int(item) if item.isdigit() else 0 for item in str(version).split(".")]
+    items = items[:max(position, 1)]
+    items[-1] += 1
+    return ".".join(str(item) for item in items)
+
+
+def _condition_matches(version, condition):
+    key = _version_key(version)
+    match = re.match(r"(>=|<=|>|<|=|~|\^)?(.+)", condition)
+    operator, target = match.group(1), match.group(2)
+    target_key = _version_key(target)
+    if operator == ">=":
+        return key >= target_key
+    if operator == "<=":
+        return key <= target_key
+    if operator == ">":
+        return key > target_key
+    if operator == "<":
+        return key < target_key
+    if operator == "~":
+        # ~1.2.3 -> >=1.2.3 <1.3, ~1 -> >=1 <2
+        return target_key <= key < _version_key(_bump(target, min(len(target.split(".")), 2)))
+    if operator == "^":
+        # ^1.2 -> >=1.2 <2
+        return target_key <= key < _version_key(_bump(target, 1))
+    if target.endswith("*"):
+        return str(version).startswith(target[:-1])
+    return key == target_key
+
+
+def version_matches(version, requirement):
+    """Whether `version` satisfies the version (or version range) of a requirement
+
+    Requirements which are not literal (None, with an f-string placeholder...) match any version.
+    """
+    if not requirement or "{" in requirement:
+        return True
+    if not (requirement.startswith("[") and requirement.endswith("]")):
+        return _version_key(version) == _version_key(requirement)
+    expression = requirement[1:-1].split(",")[0].strip()
+    if not expression:
+        return True
+    try:
+        return any(all(_condition_matches(version, condition) for condition in alternative.split())
+                   for alternative in expression.split("||"))
+    except (AttributeError, ValueError):
+        return True
+
+
+class RecipeGraph:
+    """Requirement graph between recipe names"""
+
+    def __init__(self, requirements, versions, kinds=DEFAULT_KINDS):
+        # requirements: rows of the 'requirements' table, versions: {name: {version: folder}}
+        # build_requires are stored as tool_requires
+        kinds = {REQUIREMENT_METHODS[kind] for kind in kinds}
+        self.versions = versions
+        self.requires = defaultdict(lambda: defaultdict(list))
+        self.consumers = defaultdict(set)
+        for row in requirements:
+            if row["kind"] not in kinds or not row["require_name"] or row["require_name"] == row["name"]:
+                continue
+            self.requires[row["name"]][row["require_name"]].append(row)
+            self.consumers[row["require_name"]].add(row["name"])
+
+    @classmethod
+    def from_index(cls, index=None, kinds=DEFAULT_KINDS):
+        index = index or open_index()
+        versions = defaultdict(dict)
+        for row in index.query("SELECT name, version, folder FROM versions"):
+            versions[row["name"]][row["version"]] = row["folder"]
+        return cls(index.requirements(kinds=list(kinds)), versions, kinds)
+
+    def nodes(self):
+        return set(self.versions) | set(self.requires) | set(self.consumers)
+
+    def folders_of(self, name, versions):
+        return {self.versions.get(name, {}).get(version) for version in versions} - {None}
+
+    def affected_versions(self, consumer, dependency, dependency_versions):
+        """Versions of `consumer` whose requirement on `dependency` matches any of `dependency_versions`"""
+        folders = set()
+        for row in self.requires[consumer][dependency]:
+            if any(version_matches(version, row["require_version"]) for version in dependency_versions):
+                folders.add(row["folder"])
+        return {version for version, folder in self.versions.get(consumer, {}).items() if folder in folders}
+
+    def downstream(self, changed):
+        """{name: versions} rebuilt because of `changed` ({name: versions}), `changed` included"""
+        affected = {name: set(versions) for name, versions in changed.items()}
+        pending = list(affected)
+        while pending:
+            dependency = pending.pop()
+            for consumer in self.consumers.get(dependency, ()):
+                versions = self.affected_versions(consumer, dependency, affected[dependency])
+                new = versions - affected.get(consumer, set())
+                if new:
+                    affected.setdefault(consumer, set()).update(new)
+                    pending.append(consumer)
+        return affected
+
+    def topological_levels(self, names):
+        """Group `names` in levels, every recipe only requires recipes of previous levels
+
+        Recipes in a requirement cycle can't be ordered, they are placed together in a last level.
+        """
+        names = set(names)
+        remaining = {name: {dep for dep in self.requires.get(name, ()) if dep in names} for name in names}
+        levels = []
+        while remaining:
+            level = sorted(name for name, deps in remaining.items() if not deps)
+            if not level:
+                levels.append(sorted(remaining))
+                break
+            levels.append(level)
+            for name in level:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(level)
+        return levels
@@ -0,0 +1,94 @@
+"""
+
+Recipes and versions to rebuild after a change, in topological build levels
+
+Changes are given as changed files (as listed by the pr_changed_files action) or as recipe
+references (`name` or `name/version`). A changed file of a recipe folder changes every version
+using that folder in config.yml, a changed config.yml changes every version of the recipe.
+Downstream recipes are found by following the requirements of the static recipe index backwards:
+a version of a consumer is rebuilt when its requirement matches a rebuilt version.
+
+Recipes of the same level don't require each other, they can be built in parallel.
+
+    python3 linter/recipe_impact.py recipes/zlib/all/conanfile.py
+    python3 linter/recipe_impact.py zlib/1.3.1 --json
+
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from recipe_graph import DEFAULT_KINDS, RecipeGraph
+from recipe_index import REQUIREMENT_KINDS, add_index_arguments, open_index
+
+
+def parse_changes(graph, changes):
+    """{name: versions} changed by a list of file paths or references"""
+    changed = {}
+    for change in changes:
+        parts = change.replace(os.sep, "/").split("/")
+        if "recipes" in parts:
+            parts = parts[parts.index("recipes") + 1:]
+            name = parts[0]
+            versions = graph.versions.get(name, {})
+            if len(parts) >= 3:
+                # recipes/<name>/<folder>/...
+                selected = {version for version, folder in versions.items() if folder == parts[1]}
+            else:
+                # recipes/<name>/config.yml
+                selected = set(versions)
+        else:
+            name, _, version = change.partition("/")
+            selected = {version} if version else set(graph.versions.get(name, {}))
+        if selected:
+            changed.setdefault(name, set()).update(selected)
+    return changed
+
+
+def impact(graph, changed):
+    """Build levels of the recipes to rebuild, as a list of [{"name":, "versions":}]"""
+    affected = graph.downstream(changed)
+    return [[{"name": name, "versions": sorted(affected[name])} for name in level]
+            for level in graph.topological_levels(affected)]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="List the recipes and versions to rebuild after a change, in topological build levels."
+    )
+    parser.add_argument("changes", nargs="*", help="changed files or references (name or name/version).")
+    parser.add_argument("--files-from", help="read changes (separated by whitespace) from this file, '-' for stdin.")
+    parser.add_argument("--kinds", nargs="+", default=list(DEFAULT_KINDS), choices=REQUIREMENT_KINDS,
+                        help="requirements to follow, build_requires are the same as tool_requires "
+                             "(default: %(default)s).")
+    parser.add_argument("--json", action="store_true", help="print the levels as JSON.")
+    add_index_arguments(parser)
+    args = parser.parse_args()
+
+    changes = list(args.changes)
+    if args.files_from:
+        stream = sys.stdin if args.files_from == "-" else open(args.files_from, encoding="utf-8")
+        with stream:
+            changes.extend(stream.read().split())
+
+    with open_index(args.db, args.recipes) as index:
+        graph = RecipeGraph.from_index(index, kinds=args.kinds)
+    changed = parse_changes(graph, changes)
+    levels = impact(graph, changed)
+
+    if args.json:
+        print(json.dumps({"changed": {name: sorted(versions) for name, versions in changed.items()},
+                          "levels": levels}, indent=2))
+        return
+    total = sum(len(recipe["versions"]) for level in levels for recipe in level)
+    print(f"{sum(len(level) for level in levels)} recipes, {total} versions to build in {len(levels)} levels")
+    for i, level in enumerate(levels):
+        print(f"Level {i}:")
+        for recipe in level:
+            print(f"  {recipe['name']}: {', '.join(recipe['versions'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,523 @@
+"""
+
+Offline index of the recipes metadata, extracted without importing Conan
+
+Every recipes/<name>/<folder>/conanfile.py is parsed with `ast` to read the attributes of its
+ConanFile class (name, package_type, settings, options, default_options) and the requirements
+it declares, as attributes or as calls to `self.requires()`, `self.tool_requires()`... They are
+joined with config.yml and conandata.yml and written to a SQLite database.
+
+The index is updated incrementally: only the recipes with a file whose size, mtime and then
+content hash changed are extracted again.
+
+    python3 linter/recipe_index.py
+    python3 linter/recipe_index.py query "SELECT name, folder FROM recipes WHERE package_type = 'header-library'"
+
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import yaml
+    YamlLoader = getattr(yaml, "CBaseLoader", yaml.BaseLoader)
+except ImportError:
+    yaml = None
+
+
+LINTER_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(LINTER_DIR)
+RECIPES_DIR = os.path.join(ROOT_DIR, "recipes")
+DEFAULT_DB = os.path.join(ROOT_DIR, ".recipe_index.sqlite")
+
+REQUIREMENT_KINDS = ["requires", "tool_requires", "build_requires", "test_requires"]
+REQUIREMENT_METHODS = {"requires": "requires", "tool_requires": "tool_requires",
+                       "build_requires": "tool_requires", "test_requires": "test_requires"}
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE files (path TEXT PRIMARY KEY, name TEXT, mtime_ns INTEGER, size INTEGER, sha256 TEXT);
+CREATE TABLE recipes (
+    name TEXT, folder TEXT, path TEXT, class_name TEXT, recipe_name TEXT, package_type TEXT,
+    settings TEXT, options TEXT, default_options TEXT, error TEXT,
+    PRIMARY KEY (name, folder)
+);
+CREATE TABLE versions (name TEXT, version TEXT, folder TEXT, PRIMARY KEY (name, version));
+CREATE TABLE requirements (
+    name TEXT, folder TEXT, kind TEXT, ref TEXT, require_name TEXT, require_version TEXT,
+    method TEXT, conditions TEXT, line INTEGER
+);
+CREATE INDEX requirements_name ON requirements (name);
+CREATE INDEX requirements_require_name ON requirements (require_name);
+CREATE TABLE sources (name TEXT, folder TEXT, version TEXT, selector TEXT, urls TEXT, sha256 TEXT);
+CREATE INDEX sources_sha256 ON sources (sha256);
+CREATE TABLE patches (
+    name TEXT, folder TEXT, version TEXT, patch_file TEXT, base_path TEXT, patch_type TEXT
+);
+"""
+RECIPE_TABLES = ["recipes", "versions", "requirements", "sources", "patches"]
+
+
+def _sha256_file(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _extractor_hash():
+    """The index is rebuilt from scratch when the extraction code changes"""
+    return _sha256_file(os.path.abspath(__file__))
+
+
+def load_yaml(path):
+    """Load a YAML file with every scalar as a string, `1.10` must not become `1.1`"""
+    if yaml is None:
+        raise Exception("PyYAML is required to read config.yml and conandata.yml files")
+    with open(path, encoding="utf-8") as f:
+        return yaml.load(f, Loader=YamlLoader) or {}
+
+
+def _literal(node):
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return None
+
+
+class _Source:
+    """Source of a conanfile, split in lines once (`ast.get_source_segment` splits it on every call)"""
+
+    def __init__(self, text):
+        self.text = text
+        self.lines = text.splitlines(True)
+
+    def segment(self, node):
+        if getattr(node, "end_lineno", None) is None:
+            return ""
+        # Column offsets are in UTF-8 bytes
+        first, last = node.lineno - 1, node.end_lineno - 1
+        if first == last:
+            return self.lines[first].encode()[node.col_offset:node.end_col_offset].decode()
+        parts = [self.lines[first].encode()[node.col_offset:].decode()]
+        parts.extend(self.lines[first + 1:last])
+        parts.append(self.lines[last].encode()[:node.end_col_offset].decode())
+        return "".join(parts)
+
+
+def _ref_text(source, node):
+    """Text of a reference, f-strings keep their `{expression}` placeholders"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for value in node.values:
+            if isinstance(value, ast.Constant):
+                parts.append(str(value.value))
+            else:
+                parts.append("{" + source.segment(value.value) + "}")
+        return "".join(parts)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "format" \
+            and isinstance(node.func.value, ast.Constant) and isinstance(node.func.value.value, str):
+        # "zlib/{}".format(version)
+        template = node.func.value.value
+        for argument in node.args:
+            template = template.replace("{}", "{" + source.segment(argument) + "}", 1)
+        return template
+    return None
+
+
+def split_ref(ref):
+    """'zlib/[>=1.2.11 <2]@user/channel' -> ('zlib', '[>=1.2.11 <2]'), None when not a literal name"""
+    if not ref or "/" not in ref:
+        return None, None
+    name, version = ref.split("/", 1)
+    version = version.split("@", 1)[0].split("#", 1)[0]
+    if not name or "{" in name:
+        return None, version or None
+    return name, version or None
+
+
+def _is_conanfile_class(node):
+    for base in node.bases:
+        if isinstance(base, ast.Name) and base.id == "ConanFile":
+            return True
+        if isinstance(base, ast.Attribute) and base.attr == "ConanFile":
+            return True
+    return False
+
+
+def find_conanfile_class(tree):
+    classes = [node for node in tree.body if isinstance(node, ast.ClassDef)]
+    for node in classes:
+        if _is_conanfile_class(node):
+            return node
+    return classes[-1] if classes else None
+
+
+def class_attributes(class_node):
+    """Value nodes of the attributes assigned in the body of the class"""
+    attributes = {}
+    for statement in class_node.body:
+        if isinstance(statement, ast.Assign):
+            for target in statement.targets:
+                if isinstance(target, ast.Name):
+                    attributes[target.id] = statement.value
+        elif isinstance(statement, ast.AnnAssign) and isinstance(statement.target, ast.Name) and statement.value:
+            attributes[statement.target.id] = statement.value
+    return attributes
+
+
+def class_methods(class_node):
+    return {node.name: node for node in class_node.body if isinstance(node, ast.FunctionDef)}
+
+
+def _options(node):
+    """{option: [values]} of an options or default_options dict, values are None when not literal"""
+    if not isinstance(node, ast.Dict):
+        return None
+    options = {}
+    for key, value in zip(node.keys, node.values):
+        if isinstance(key, ast.Constant) and isinstance(key.value, str):
+            options[key.value] = _literal(value)
+    return options
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+class _RequirementsVisitor(ast.NodeVisitor):
+    """Collect `self.requires(...)`-like calls and the conditions guarding them"""
+
+    def __init__(self, source, method):
+        self.source = source
+        self.method = method
+        self.conditions = []
+        self.requirements = []
+
+    def _visit_guarded(self, condition, statements):
+        self.conditions.append(condition)
+        for statement in statements:
+            self.visit(statement)
+        self.conditions.pop()
+
+    def visit_If(self, node):
+        test = self.source.segment(node.test)
+        self._visit_guarded(test, node.body)
+        if node.orelse:
+            self._visit_guarded(f"not ({test})", node.orelse)
+
+    def visit_For(self, node):
+        self.visit(node.iter)
+        self._visit_guarded(f"for {self.source.segment(node.target)} in {self.source.segment(node.iter)}", node.body)
+        for statement in node.orelse:
+            self.visit(statement)
+
+    def visit_Try(self, node):
+        for statement in node.body + node.orelse + node.finalbody:
+            self.visit(statement)
+        for handler in node.handlers:
+            self._visit_guarded(f"except {self.source.segment(handler.type) if handler.type else ''}".strip(), handler.body)
+
+    def visit_Call(self, node):
+        func = node.func
+        if isinstance(func, ast.Attribute) and func.attr in REQUIREMENT_METHODS \
+                and isinstance(func.value, ast.Name) and func.value.id == "self" and node.args:
+            ref = _ref_text(self.source, node.args[0])
+            if ref is None:
+                ref = "{" + self.source.segment(node.args[0]) + "}"
+            self.requirements.append({
+                "kind": REQUIREMENT_METHODS[func.attr],
+                "ref": ref,
+                "method": self.method,
+                "conditions": list(self.conditions),
+                "line": node.lineno,
+            })
+        self.generic_visit(node)
+
+
+def extract_requirements(source, class_node):
+    requirements = []
+    for attribute, value in class_attributes(class_node).items():
+        if attribute not in REQUIREMENT_KINDS:
+            continue
+        elements = value.elts if isinstance(value, (ast.Tuple, ast.List)) else [value]
+        for element in elements:
+            ref = _ref_text(source, element)
+            if ref:
+                requirements.append({"kind": REQUIREMENT_METHODS[attribute], "ref": ref, "method": None,
+                                     "conditions": [], "line": element.lineno})
+    for method in class_methods(class_node).values():
+        visitor = _RequirementsVisitor(source, method.name)
+        for statement in method.body:
+            visitor.visit(statement)
+        requirements.extend(visitor.requirements)
+    for requirement in requirements:
+        requirement["require_name"], requirement["require_version"] = split_ref(requirement["ref"])
+    return requirements
+
+
+def parse_conanfile(source):
+    """Metadata of the ConanFile class in `source`"""
+    tree = ast.parse(source)
+    source = _Source(source)
+    class_node = find_conanfile_class(tree)
+    if class_node is None:
+        raise Exception("No class found in conanfile")
+    attributes = class_attributes(class_node)
+    settings = _literal(attributes["settings"]) if "settings" in attributes else None
+    return {
+        "class_name": class_node.name,
+        "recipe_name": _literal(attributes["name"]) if "name" in attributes else None,
+        "package_type": _literal(attributes["package_type"]) if "package_type" in attributes else None,
+        "settings": _as_list(settings),
+        "options": _options(attributes.get("options")) or {},
+        "default_options": _options(attributes.get("default_options")) or {},
+        "requirements": extract_requirements(source, class_node),
+    }
+
+
+def iter_sources(entry, selector=""):
+    """(selector, urls, sha256) for each archive of a conandata.yml `sources` entry"""
+    if isinstance(entry, dict):
+        if "url" in entry:
+            yield selector, _as_list(entry["url"]), entry.get("sha256")
+            return
+        for key, value in entry.items():
+            yield from iter_sources(value, f"{selector}/{key}" if selector else str(key))
+    elif isinstance(entry, list):
+        for i, value in enumerate(entry):
+            yield from iter_sources(value, f"{selector}/{i}" if selector else str(i))
+
+
+def extract_recipe(recipes_dir, name):
+    """Rows of every table for the recipe `name`"""
+    rows = {table: [] for table in RECIPE_TABLES}
+    recipe_dir = os.path.join(recipes_dir, name)
+    config_path = os.path.join(recipe_dir, "config.yml")
+    if os.path.isfile(config_path):
+        try:
+            versions = load_yaml(config_path).get("versions") or {}
+        except Exception:
+            versions = {}
+        for version, data in versions.items():
+            folder = data.get("folder") if isinstance(data, dict) else None
+            rows["versions"].append((name, version, folder))
+
+    for folder in sorted(os.listdir(recipe_dir)):
+        conanfile = os.path.join(recipe_dir, folder, "conanfile.py")
+        if not os.path.isfile(conanfile):
+            continue
+        path = os.path.relpath(conanfile, os.path.dirname(recipes_dir))
+        try:
+            with open(conanfile, encoding="utf-8") as f:
+                metadata = parse_conanfile(f.read())
+        except Exception as error:
+            rows["recipes"].append((name, folder, path, None, None, None, None, None, None, f"{type(error).__name__}: {error}"))
+        else:
+            rows["recipes"].append((name, folder, path, metadata["class_name"], metadata["recipe_name"],
+                                    metadata["package_type"], json.dumps(metadata["settings"]),
+                                    json.dumps(metadata["options"], default=str),
+                                    json.dumps(metadata["default_options"], default=str), None))
+            for requirement in metadata["requirements"]:
+                rows["requirements"].append((name, folder, requirement["kind"], requirement["ref"],
+                                             requirement["require_name"], requirement["require_version"],
+                                             requirement["method"], json.dumps(requirement["conditions"]),
+                                             requirement["line"]))
+
+        conandata_path = os.path.join(recipe_dir, folder, "conandata.yml")
+        if not os.path.isfile(conandata_path):
+            continue
+        try:
+            conandata = load_yaml(conandata_path)
+        except Exception:
+            continue
+        for version, entry in (conandata.get("sources") or {}).items():
+            for selector, urls, sha256 in iter_sources(entry):
+                rows["sources"].append((name, folder, version, selector, json.dumps(urls), sha256))
+        for version, patches in (conandata.get("patches") or {}).items():
+            for patch in patches or []:
+                if isinstance(patch, dict):
+                    rows["patches"].append((name, folder, version, patch.get("patch_file"),
+                                            patch.get("base_path"), patch.get("patch_type")))
+    return name, rows
+
+
+def _scan_recipe(recipes_dir, name):
+    """{path: (mtime_ns, size)} of the files an entry of the index depends on"""
+    files = {}
+    recipe_dir = os.path.join(recipes_dir, name)
+    with os.scandir(recipe_dir) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name == "config.yml":
+                stat = entry.stat()
+                files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            elif entry.is_dir():
+                for filename in ("conanfile.py", "conandata.yml"):
+                    path = os.path.join(entry.path, filename)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    files[path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+class RecipeIndex:
+    """SQLite index of the recipes metadata, see module documentation"""
+
+    def __init__(self, db_path=DEFAULT_DB, recipes_dir=RECIPES_DIR):
+        self.db_path = db_path
+        self.recipes_dir = recipes_dir
+        self.connection = sqlite3.connect(db_path)
+        self.connection.row_factory = sqlite3.Row
+        self._check_schema()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def _check_schema(self):
+        try:
+            row = self.connection.execute("SELECT value FROM meta WHERE key = 'extractor'").fetchone()
+        except sqlite3.DatabaseError:
+            row = None
+        if row and row[0] == _extractor_hash():
+            return
+        with self.connection:
+            tables = [r[0] for r in self.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+            for table in tables:
+                self.connection.execute(f"DROP TABLE IF EXISTS {table}")
+            self.connection.executescript(SCHEMA)
+            self.connection.execute("INSERT INTO meta VALUES ('extractor', ?)", (_extractor_hash(),))
+
+    def update(self, jobs=None, names=None):
+        """Extract again the recipes whose files changed, return the names updated and removed"""
+        known = {row["path"]: row for row in self.connection.execute("SELECT * FROM files")}
+        known_by_name = {}
+        for path, row in known.items():
+            known_by_name.setdefault(row["name"], set()).add(path)
+        present = names if names is not None else sorted(
+            entry.name for entry in os.scandir(self.recipes_dir) if entry.is_dir())
+
+        dirty = set()
+        stats = {}
+        for name in present:
+            files = _scan_recipe(self.recipes_dir, name)
+            for path, (mtime_ns, size) in files.items():
+                row = known.get(path)
+                if row and row["mtime_ns"] == mtime_ns and row["size"] == size:
+                    continue
+                sha256 = _sha256_file(path)
+                stats[path] = (name, mtime_ns, size, sha256)
+                if not row or row["sha256"] != sha256:
+                    dirty.add(name)
+            if known_by_name.get(name, set()) - set(files):
+                dirty.add(name)
+        removed = set() if names is not None else {row["name"] for row in known.values()} - set(present)
+
+        extracted = []
+        if dirty:
+            dirty_names = sorted(dirty)
+            if len(dirty_names) > 8 and (jobs or os.cpu_count() or 1) > 1:
+                with ProcessPoolExecutor(max_workers=jobs) as executor:
+                    extracted = list(executor.map(extract_recipe, [self.recipes_dir] * len(dirty_names),
+                                                  dirty_names, chunksize=16))
+            else:
+                extracted = [extract_recipe(self.recipes_dir, name) for name in dirty_names]
+
+        with self.connection:
+            for name in dirty | removed:
+                for table in RECIPE_TABLES:
+                    self.connection.execute(f"DELETE FROM {table} WHERE name = ?", (name,))
+                if name in removed:
+                    self.connection.execute("DELETE FROM files WHERE name = ?", (name,))
+            for name in dirty:
+                current = set(_scan_recipe(self.recipes_dir, name))
+                for path in known_by_name.get(name, set()) - current:
+                    self.connection.execute("DELETE FROM files WHERE path = ?", (path,))
+            for name, rows in extracted:
+                for table, values in rows.items():
+                    if values:
+                        placeholders = ", ".join("?" * len(values[0]))
+                        self.connection.executemany(f"INSERT INTO {table} VALUES ({placeholders})", values)
+            self.connection.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                                        [(path,) + values for path, values in stats.items()])
+        return sorted(dirty), sorted(removed)
+
+    def query(self, sql, parameters=()):
+        return self.connection.execute(sql, parameters).fetchall()
+
+    def recipe_names(self):
+        return [row[0] for row in self.query("SELECT DISTINCT name FROM recipes ORDER BY name")]
+
+    def versions(self, name):
+        """{version: folder} as listed in config.yml"""
+        return {row["version"]: row["folder"] for row in
+                self.query("SELECT version, folder FROM versions WHERE name = ?", (name,))}
+
+    def requirements(self, name=None, kinds=None):
+        sql = "SELECT * FROM requirements"
+        clauses, parameters = [], []
+        if name:
+            clauses.append("name = ?")
+            parameters.append(name)
+        if kinds:
+            kinds = sorted({REQUIREMENT_METHODS[kind] for kind in kinds})
+            clauses.append(f"kind IN ({', '.join('?' * len(kinds))})")
+            parameters.extend(kinds)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return self.query(sql, parameters)
+
+
+def open_index(db_path=DEFAULT_DB, recipes_dir=RECIPES_DIR, update=True, jobs=None):
+    """Open the index, bringing it up to date with the recipes folder first"""
+    index = RecipeIndex(db_path, recipes_dir)
+    if update:
+        index.update(jobs=jobs)
+    return index
+
+
+def add_index_arguments(parser):
+    parser.add_argument("--db", default=DEFAULT_DB, help="SQLite database of the index (default: %(default)s).")
+    parser.add_argument("--recipes", default=RECIPES_DIR, help="recipes folder (default: %(default)s).")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Index the metadata of the recipes in a SQLite database, without importing Conan."
+    )
+    add_index_arguments(parser)
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of worker processes.")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("update", help="update the index (default).")
+    query_parser = subparsers.add_parser("query", help="update the index and run a SQL query, rows are printed as JSON.")
+    query_parser.add_argument("sql", help="SQL query.")
+    args = parser.parse_args()
+
+    with RecipeIndex(args.db, args.recipes) as index:
+        updated, removed = index.update(jobs=args.jobs)
+        if args.command == "query":
+            for row in index.query(args.sql):
+                print(json.dumps(dict(row)))
+        else:
+            print(f"{len(updated)} recipes updated, {len(removed)} removed", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+
+Report of the recipes whose build runs with a single job, over the whole index
+
+Runs only the `conan-serial-build` and `conan-single-job-build` checks of check_serial_build.py on
+every recipe, through pylint_runner.py, so the results of unchanged recipes come from its cache.
+
+    python3 linter/serial_build_report.py
+    python3 linter/serial_build_report.py --json 'recipes/b*/*/conanfile.py'
+
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+from collections import defaultdict
+
+from pylint_runner import DEFAULT_CACHE_DIR, LINTER_DIR, lint
+
+
+ROOT_DIR = os.path.dirname(LINTER_DIR)
+DEFAULT_FILES = os.path.join("recipes", "*", "*", "conanfile.py")
+
+
+def serial_builds(files, jobs=None, cache_dir=DEFAULT_CACHE_DIR):
+    """{recipe folder: [(line, tool)]} of the serial build invocations"""
+    # The plugins are imported as `linter.xxx`
+    python_path = os.environ.get("PYTHONPATH")
+    os.environ["PYTHONPATH"] = os.pathsep.join([ROOT_DIR] + ([python_path] if python_path else []))
+    messages = lint(files, os.path.join(LINTER_DIR, "pylintrc_recipe"),
+                    ["--disable=all", "--enable=conan-serial-build,conan-single-job-build"], jobs=jobs,
+                    cache_dir=cache_dir)
+    builds = defaultdict(list)
+    for message in messages:
+        if message["symbol"] not in ("conan-serial-build", "conan-single-job-build"):
+            continue
+        tool = re.match(r"`([^`]+)`", message["message"]).group(1)
+        builds[os.path.dirname(message["path"])].append((message["line"], tool))
+    return dict(sorted(builds.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the recipes which build with a single job.")
+    parser.add_argument("files", nargs="*", default=[DEFAULT_FILES],
+                        help="conanfiles to check, globs are expanded (default: %(default)s).")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of pylint processes.")
+    parser.add_argument("--cache-dir", default=os.environ.get("CCI_LINT_CACHE", DEFAULT_CACHE_DIR),
+                        help="pylint_runner.py cache folder (default: %(default)s).")
+    parser.add_argument("--no-cache", action="store_true", help="do not read nor write cached results.")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON.")
+    args = parser.parse_args()
+
+    files = []
+    for pattern in args.files:
+        files.extend(sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern])
+    builds = serial_builds(files, args.jobs, None if args.no_cache else args.cache_dir)
+
+    if args.json:
+        print(json.dumps({folder: [{"line": line, "tool": tool} for line, tool in invocations]
+                          for folder, invocations in builds.items()}, indent=2))
+        return
+    by_tool = defaultdict(set)
+    for folder, invocations in builds.items():
+        for _, tool in invocations:
+            by_tool[tool].add(folder)
+    print(f"{len(builds)} of {len(files)} recipes build with a single job")
+    for tool, folders in sorted(by_tool.items(), key=lambda item: -len(item[1])):
+        print(f"  {tool}: {len(folders)} recipes")
+    for folder, invocations in builds.items():
+        print(f"{folder}: " + ", ".join(f"{tool} (line {line})" for line, tool in invocations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+
+Report the source archives shared between recipes, and write a lookup file for download caches
+
+Every `sources` entry of the conandata.yml files (from the recipe index) is indexed by sha256
+and by URL. The report lists:
+
+ * archives used by several recipes, or by several versions of a recipe: split packages
+   (libmount and util-linux-libuuid), renamed recipes (gettext and libgettext)...
+ * shared archives whose users list different URLs, usually other mirrors of the same file: a
+   cache keyed by URL downloads them once for each list.
+ * URLs listed with different sha256, only one of them can be right (or the archive changes
+   upstream, like the GitHub archives of a branch), and sources with the sha256 of an empty file.
+
+The lookup file maps every URL to the sha256 of its archive, and every archive to all its known
+URLs and users. A content-addressed cache (like the one of source_prefetch.py) serves the same
+archive to all its users, and gets more mirrors to try. URLs with conflicting sha256 are left out
+of the URL map.
+
+    python3 linter/source_dedup.py --top 20
+    python3 linter/source_dedup.py --lookup sources_lookup.json
+
+"""
+
+import argparse
+import json
+import os
+import sys
+import urllib.parse
+from collections import defaultdict
+
+from recipe_index import add_index_arguments, open_index
+from source_prefetch import DEFAULT_CACHE_DIR, cached
+
+
+LOOKUP_FORMAT = 1
+# sha256 of zero bytes, usually computed over a failed download
+EMPTY_SHA256 = "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"
+
+
+def archive_name(url):
+    """File name of an archive URL, `.../file.tar.gz/download` of SourceForge included"""
+    path = urllib.parse.urlsplit(url).path.rstrip("/")
+    if path.endswith("/download"):
+        path = path[:-len("/download")]
+    return path.rsplit("/", 1)[-1]
+
+
+def load_sources(index):
+    """Rows of the sources table, with the urls decoded and the sha256 in lower case"""
+    sources = []
+    for row in index.query("SELECT name, folder, version, selector, urls, sha256 FROM sources ORDER BY name, version"):
+        sources.append({
+            "name": row["name"], "folder": row["folder"], "version": row["version"], "selector": row["selector"],
+            "urls": json.loads(row["urls"]), "sha256": row["sha256"].lower() if row["sha256"] else None,
+        })
+    return sources
+
+
+def _user(source):
+    user = f"{source['name']}/{source['version']}"
+    return f"{user} ({source['selector']})" if source["selector"] else user
+
+
+def build_index(sources):
+    """({sha256: {"urls": [...], "users": [...], ...}}, {url: {sha256: [users]}})"""
+    archives = {}
+    urls = defaultdict(lambda: defaultdict(list))
+    for source in sources:
+        for url in source["urls"]:
+            urls[url][source["sha256"]].append(_user(source))
+        if not source["sha256"]:
+            continue
+        archive = archives.setdefault(source["sha256"], {"urls": [], "users": [], "names": set(),
+                                                         "url_lists": defaultdict(list)})
+        for url in source["urls"]:
+            if url not in archive["urls"]:
+                archive["urls"].append(url)
+        archive["users"].append(_user(source))
+        archive["names"].add(source["name"])
+        archive["url_lists"][tuple(source["urls"])].append(_user(source))
+    return archives, urls
+
+
+def duplicates(archives):
+    """Archives with several users, those shared between recipes first"""
+    shared = [(sha256, archive) for sha256, archive in archives.items() if len(archive["users"]) > 1]
+    return sorted(shared, key=lambda item: (-len(item[1]["names"]), -len(item[1]["users"]), item[0]))
+
+
+def mirror_variants(archives):
+    """{sha256: [{"urls":, "users":}]} of the archives whose users list different URLs"""
+    return {sha256: [{"urls": list(urls), "users": users} for urls, users in archive["url_lists"].items()]
+            for sha256, archive in sorted(archives.items()) if len(archive["url_lists"]) > 1}
+
+
+def conflicts(urls):
+    """{url: {sha256: users}} of the URLs listed with different sha256"""
+    return {url: dict(by_sha256) for url, by_sha256 in sorted(urls.items())
+            if len([sha256 for sha256 in by_sha256 if sha256]) > 1}
+
+
+def lookup(archives, urls):
+    """Content of the lookup file"""
+    conflicting = conflicts(urls)
+    return {
+        "format": LOOKUP_FORMAT,
+        "archives": {sha256: {"urls": archive["urls"], "users": archive["users"]}
+                     for sha256, archive in sorted(archives.items())},
+        "urls": {url: next(sha256 for sha256 in by_sha256 if sha256) for url, by_sha256 in sorted(urls.items())
+                 if url not in conflicting and any(by_sha256)},
+    }
+
+
+def _users(users, limit=4):
+    """Users of an archive, summarized by recipe when there are many"""
+    by_name = defaultdict(set)
+    for user in users:
+        by_name[user.split("/", 1)[0]].add(user.split("/", 1)[1].split(" ", 1)[0])
+    return ", ".join(f"{name}/{next(iter(versions))}" if len(versions) == 1
+                     else f"{name} ({', '.join(sorted(versions))})" if len(versions) <= limit
+                     else f"{name} ({len(versions)} versions)"
+                     for name, versions in sorted(by_name.items()))
+
+
+def _format_size(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report the source archives shared between recipes, and write a lookup file for download caches."
+    )
+    parser.add_argument("--top", type=int, default=None, help="only list the N most shared archives.")
+    parser.add_argument("--lookup", help="write the lookup file (JSON) to this path.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="source_prefetch.py cache, to get the size of the archives (default: %(default)s).")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON.")
+    add_index_arguments(parser)
+    args = parser.parse_args()
+
+    with open_index(args.db, args.recipes) as index:
+        sources = load_sources(index)
+    archives, urls = build_index(sources)
+    shared = duplicates(archives)
+    variants = mirror_variants(archives)
+    conflicting = conflicts(urls)
+
+    if args.lookup:
+        with open(args.lookup, "w", encoding="utf-8") as f:
+            json.dump(lookup(archives, urls), f, indent=2)
+            f.write("\n")
+
+    if args.json:
+        print(json.dumps({
+            "duplicates": [{"sha256": sha256, "users": archive["users"], "urls": archive["urls"]}
+                           for sha256, archive in shared[:args.top]],
+            "mirrors": variants,
+            "conflicts": conflicting,
+            "empty": archives.get(EMPTY_SHA256, {}).get("users", []),
+        }, indent=2))
+        return
+
+    missing = sum(1 for source in sources if not source["sha256"])
+    cross_recipe = [item for item in shared if len(item[1]["names"]) > 1]
+    saved = 0
+    for sha256, archive in shared:
+        path = cached(args.cache_dir, sha256)
+        if path:
+            saved += os.path.getsize(path) * (len(archive["users"]) - 1)
+    print(f"{len(sources)} sources, {len(archives)} distinct archives, {missing} without sha256")
+    print(f"{len(shared)} archives have several users, {len(cross_recipe)} of them are shared between recipes"
+          + (f", {_format_size(saved)} of duplicate downloads in the cache" if saved else ""))
+    print(f"{len(variants)} shared archives are listed with different URLs, "
+          f"{len(conflicting)} URLs are listed with different sha256")
+
+    if shared:
+        print("\nShared archives:")
+        for sha256, archive in shared[:args.top]:
+            print(f"  {sha256[:16]} {archive_name(archive['urls'][0]) if archive['urls'] else ''}: "
+                  + _users(archive["users"]))
+    if variants:
+        print("\nShared archives listed with different URLs:")
+        for sha256, lists in variants.items():
+            print(f"  {sha256[:16]} {archive_name(lists[0]['urls'][0]) if lists[0]['urls'] else ''}:")
+            for variant in lists:
+                print(f"    {_users(variant['users'])}: {' '.join(variant['urls'])}")
+    if EMPTY_SHA256 in archives:
+        print(f"\nSources with the sha256 of an empty file: {', '.join(archives[EMPTY_SHA256]['users'])}",
+              file=sys.stderr)
+    if conflicting:
+        print("\nURLs with different sha256:", file=sys.stderr)
+        for url, by_sha256 in conflicting.items():
+            print(f"  {url}", file=sys.stderr)
+            for sha256, users in by_sha256.items():
+                print(f"    {sha256 or '(no sha256)'}: {', '.join(users)}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
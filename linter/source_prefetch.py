@@ -0,0 +1,182 @@
+"""
+
+Download the sources listed in conandata.yml into a cache shared by every recipe
+
+Archives are stored by content, as <cache>/<sha256[:2]>/<sha256>, so an archive used by several
+recipes or versions is downloaded once. Mirrors are tried in the order of conandata.yml and the
+sha256 is computed while the archive is downloaded: a file only enters the cache once verified.
+Downloads run concurrently, with a limit of connections for each host.
+
+Any URL supported by urllib works, `file://` URLs or a local HTTP server can stand in for the
+upstream servers when testing offline.
+
+    python3 linter/source_prefetch.py zlib boost/1.84.0
+    python3 linter/source_prefetch.py --all --jobs 32
+
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from recipe_index import add_index_arguments, open_index
+
+
+DEFAULT_CACHE_DIR = os.environ.get("CCI_SOURCES_CACHE",
+                                   os.path.join(os.path.expanduser("~"), ".cache", "conan-center-index", "sources"))
+CHUNK_SIZE = 1024 * 1024
+USER_AGENT = "conan-center-index-source-prefetch"
+
+
+def cache_path(cache_dir, sha256):
+    return os.path.join(cache_dir, sha256[:2], sha256)
+
+
+def cached(cache_dir, sha256):
+    path = cache_path(cache_dir, sha256)
+    return path if os.path.isfile(path) else None
+
+
+class HostLimiter:
+    """Bound the number of concurrent connections to each host"""
+
+    def __init__(self, connections_per_host):
+        self.connections_per_host = connections_per_host
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def __call__(self, url):
+        host = urllib.parse.urlsplit(url).netloc
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.connections_per_host)
+            return self._semaphores[host]
+
+
+def _download(url, destination, sha256, timeout):
+    """Stream `url` into `destination`, return an error message or None when the sha256 matches"""
+    digest = hashlib.sha256()
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response, open(destination, "wb") as f:
+            while True:
+                chunk = response.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                f.write(chunk)
+    except (urllib.error.URLError, OSError, ValueError) as error:
+        return f"{url}: {error}"
+    if digest.hexdigest() != sha256.lower():
+        return f"{url}: sha256 mismatch, expected {sha256} got {digest.hexdigest()}"
+    return None
+
+
+def fetch(cache_dir, sha256, urls, limiter=None, timeout=60):
+    """Get the archive `sha256` into the cache, trying the mirrors in order
+
+    Returns (path, status, errors), status is 'cached', 'downloaded' or 'failed'.
+    """
+    path = cached(cache_dir, sha256)
+    if path:
+        return path, "cached", []
+    path = cache_path(cache_dir, sha256)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    errors = []
+    try:
+        for url in urls:
+            if limiter:
+                with limiter(url):
+                    error = _download(url, tmp, sha256, timeout)
+            else:
+                error = _download(url, tmp, sha256, timeout)
+            if error is None:
+                os.replace(tmp, path)
+                return path, "downloaded", errors
+            errors.append(error)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return None, "failed", errors
+
+
+def select_sources(index, references=None):
+    """{sha256: {"urls": [...], "users": [(name, version, selector)]}} of the selected recipes"""
+    rows = index.query("SELECT name, version, selector, urls, sha256 FROM sources ORDER BY name, version")
+    wanted = defaultdict(set)
+    for reference in references or []:
+        name, _, version = reference.partition("/")
+        wanted[name].add(version or None)
+
+    archives = {}
+    for row in rows:
+        if references:
+            versions = wanted.get(row["name"])
+            if versions is None or (None not in versions and row["version"] not in versions):
+                continue
+        if not row["sha256"]:
+            continue
+        sha256 = row["sha256"].lower()
+        entry = archives.setdefault(sha256, {"urls": [], "users": []})
+        for url in json.loads(row["urls"]):
+            if url not in entry["urls"]:
+                entry["urls"].append(url)
+        entry["users"].append((row["name"], row["version"], row["selector"]))
+    return archives
+
+
+def prefetch(archives, cache_dir, jobs=16, connections_per_host=4, timeout=60):
+    """Fetch every archive, return {sha256: (path, status, errors)}"""
+    limiter = HostLimiter(connections_per_host)
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {sha256: executor.submit(fetch, cache_dir, sha256, entry["urls"], limiter, timeout)
+                   for sha256, entry in archives.items()}
+        return {sha256: future.result() for sha256, future in futures.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Download and verify the sources listed in conandata.yml files into a shared cache."
+    )
+    parser.add_argument("references", nargs="*", help="recipes to fetch, as name or name/version.")
+    parser.add_argument("--all", action="store_true", help="fetch the sources of every recipe.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="cache folder (default: %(default)s).")
+    parser.add_argument("-j", "--jobs", type=int, default=16, help="concurrent downloads (default: %(default)s).")
+    parser.add_argument("--connections-per-host", type=int, default=4,
+                        help="concurrent downloads from the same host (default: %(default)s).")
+    parser.add_argument("--timeout", type=float, default=60, help="timeout of each connection, in seconds.")
+    add_index_arguments(parser)
+    args = parser.parse_args()
+
+    if not args.references and not args.all:
+        parser.error("give some references or --all")
+
+    with open_index(args.db, args.recipes) as index:
+        archives = select_sources(index, None if args.all else args.references)
+    results = prefetch(archives, args.cache_dir, args.jobs, args.connections_per_host, args.timeout)
+
+    counts = defaultdict(int)
+    for sha256, (_, status, errors) in sorted(results.items()):
+        counts[status] += 1
+        if status == "failed":
+            users = ", ".join(f"{name}/{version}" for name, version, _ in archives[sha256]["users"])
+            print(f"Failed to fetch {sha256} ({users}):", file=sys.stderr)
+            for error in errors:
+                print(f"    {error}", file=sys.stderr)
+    print(f"{len(results)} archives: {counts['downloaded']} downloaded, {counts['cached']} cached, "
+          f"{counts['failed']} failed")
+    if counts["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
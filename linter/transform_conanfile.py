@@ -2,12 +2,16 @@
 # Class ConanFile doesn't declare all the valid members and functions,
 #   some are injected by Conan dynamically to the class.
 
+import os
 import textwrap
 import astroid
 from astroid.builder import AstroidBuilder
 from astroid.manager import AstroidManager
 
 
+CONAN_STUBS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "conan_v1_stubs.py")
+
+
 def _settings_transform():
     module = AstroidBuilder(AstroidManager()).string_build(
         textwrap.dedent("""
@@ -30,6 +34,15 @@ def _user_info_build_transform():
     return module['UserInfoBuild']
 
 
+def _conan_class(modname, classname):
+    # Classes are copied from Conan 1.x by linter/generate_conan_stubs.py, the stubs are much faster
+    #   to parse than the modules where they are defined. CCI_LINTER_CONAN_STUBS=0 uses those modules
+    if os.getenv("CCI_LINTER_CONAN_STUBS", "1") == "0":
+        return astroid.MANAGER.ast_from_module_name(modname).lookup(classname)
+    stubs = astroid.MANAGER.ast_from_file(CONAN_STUBS_PATH, "linter.conan_v1_stubs", source=True)
+    return stubs.lookup(classname)
+
+
 def register(_):
     pass
 
@@ -38,16 +51,11 @@ def transform_conanfile(node):
 
     str_class = astroid.builtin_lookup("str")
     dict_class = astroid.builtin_lookup("dict")
-    info_class = astroid.MANAGER.ast_from_module_name("conans.model.info").lookup(
-        "ConanInfo")
-    build_requires_class = astroid.MANAGER.ast_from_module_name(
-        "conans.client.graph.graph_manager").lookup("_RecipeBuildRequires")
-    file_copier_class = astroid.MANAGER.ast_from_module_name(
-        "conans.client.file_copier").lookup("FileCopier")
-    file_importer_class = astroid.MANAGER.ast_from_module_name(
-        "conans.client.importer").lookup("_FileImporter")
-    python_requires_class = astroid.MANAGER.ast_from_module_name(
-        "conans.client.graph.python_requires").lookup("PyRequires")
+    info_class = _conan_class("conans.model.info", "ConanInfo")
+    build_requires_class = _conan_class("conans.client.graph.graph_manager", "_RecipeBuildRequires")
+    file_copier_class = _conan_class("conans.client.file_copier", "FileCopier")
+    file_importer_class = _conan_class("conans.client.importer", "_FileImporter")
+    python_requires_class = _conan_class("conans.client.graph.python_requires", "PyRequires")
 
     dynamic_fields = {
         "conan_data": str_class,
@@ -1,4 +1,10 @@
 import argparse
+import functools
+import glob
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
 
 
 def file_path(a_string):
@@ -7,3 +13,67 @@ def file_path(a_string):
     if not isfile(a_string):
         raise argparse.ArgumentTypeError(f"{a_string} does not point to a file")
     return a_string
+
+
+def add_path_arguments(parser):
+    parser.add_argument(
+        "path",
+        nargs="+",
+        help="files to validate, glob patterns (quoted) are expanded.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of worker processes (defaults to the number of CPUs).",
+    )
+
+
+def expand_paths(parser, patterns):
+    paths = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            paths.extend(sorted(glob.glob(pattern)))
+            continue
+        try:
+            paths.append(file_path(pattern))
+        except argparse.ArgumentTypeError as error:
+            parser.error(str(error))
+    return paths
+
+
+def lint_files(lint_file, paths, jobs=None):
+    """Run `lint_file` over every path and print its output in the same order as the paths
+
+    `lint_file` must be a module level function returning the list of lines to print, so it
+    can run in a worker process. Schemas are built once per process, not once per file.
+    An unexpected exception for one file is reported and the remaining files are still validated.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    guarded = functools.partial(_guarded_lint_file, lint_file)
+    if jobs == 1 or len(paths) < 2:
+        failed = _print_lines(map(guarded, paths))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            failed = _print_lines(executor.map(guarded, paths, chunksize=16))
+    if failed:
+        sys.exit(1)
+
+
+def _guarded_lint_file(lint_file, path):
+    try:
+        return lint_file(path), None
+    except Exception:
+        return [], traceback.format_exc()
+
+
+def _print_lines(results):
+    failed = False
+    for lines, error in results:
+        for line in lines:
+            print(line)
+        if error:
+            print(error, file=sys.stderr, end="")
+            failed = True
+    return failed
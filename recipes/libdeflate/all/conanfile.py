@@ -1,6 +1,9 @@
 from conan import ConanFile
+from conan.errors import ConanInvalidConfiguration
 from conan.tools.cmake import CMake, CMakeToolchain, cmake_layout
 from conan.tools.files import collect_libs, copy, get, rmdir
+from conan.tools.microsoft import is_msvc
+from conan.tools.scm import Version
 import os
 
 required_conan_version = ">=1.53.0"
@@ -18,15 +21,52 @@ class LibdeflateConan(ConanFile):
     options = {
         "shared": [True, False],
         "fPIC": [True, False],
+        "cpu_baseline": [None, "x86-64-v2", "x86-64-v3", "x86-64-v4", "armv8-crc", "armv8-crypto"],
+        "build_programs": [True, False],
     }
     default_options = {
         "shared": False,
         "fPIC": True,
+        "cpu_baseline": None,
+        "build_programs": False,
     }
+    options_description = {
+        "cpu_baseline": (
+            "Instruction set the binaries require. The fastest implementations it provides are selected at "
+            "compile time, without runtime CPU detection. None keeps the portable build with runtime dispatch"
+        ),
+        "build_programs": "Build and package the libdeflate-gzip and libdeflate-gunzip programs",
+    }
+
+    @property
+    def _cpu_baseline_flags(self):
+        # x86-64-v3 and later CPUs all have PCLMULQDQ (not every x86-64-v2 one), which is not part of the levels
+        if is_msvc(self):
+            return {
+                "x86-64-v3": ["/arch:AVX2"],
+                "x86-64-v4": ["/arch:AVX512"],
+            }
+        return {
+            "x86-64-v2": ["-march=x86-64-v2"],
+            "x86-64-v3": ["-march=x86-64-v3", "-mpclmul"],
+            "x86-64-v4": ["-march=x86-64-v4", "-mpclmul"],
+            "armv8-crc": ["-march=armv8-a+crc"],
+            "armv8-crypto": ["-march=armv8-a+crc+crypto"],
+        }
+
+    @property
+    def _compilers_minimum_version_x86_64_levels(self):
+        return {
+            "gcc": "11",
+            "clang": "12",
+            "apple-clang": "13",
+        }
 
     def config_options(self):
         if self.settings.os == "Windows":
             del self.options.fPIC
+        if self.settings.arch not in ["x86_64", "armv8"]:
+            del self.options.cpu_baseline
 
     def configure(self):
         if self.options.shared:
@@ -34,6 +74,21 @@ class LibdeflateConan(ConanFile):
         self.settings.rm_safe("compiler.cppstd")
         self.settings.rm_safe("compiler.libcxx")
 
+    def validate(self):
+        cpu_baseline = self.options.get_safe("cpu_baseline")
+        if not cpu_baseline:
+            return
+        cpu_baseline = str(cpu_baseline)
+        if cpu_baseline.startswith("x86-64") != (self.settings.arch == "x86_64"):
+            raise ConanInvalidConfiguration(f"{self.ref} cpu_baseline={cpu_baseline} is not available for arch={self.settings.arch}")
+        if cpu_baseline not in self._cpu_baseline_flags:
+            raise ConanInvalidConfiguration(f"{self.ref} cpu_baseline={cpu_baseline} is not supported by {self.settings.compiler}")
+        minimum_version = self._compilers_minimum_version_x86_64_levels.get(str(self.settings.compiler))
+        if cpu_baseline.startswith("x86-64") and minimum_version and Version(self.settings.compiler.version) < minimum_version:
+            raise ConanInvalidConfiguration(
+                f"{self.ref} cpu_baseline={cpu_baseline} requires {self.settings.compiler} >= {minimum_version}"
+            )
+
     def layout(self):
         cmake_layout(self, src_folder="src")
 
@@ -44,8 +99,16 @@ class LibdeflateConan(ConanFile):
         tc = CMakeToolchain(self)
         tc.variables["LIBDEFLATE_BUILD_STATIC_LIB"] = not self.options.shared
         tc.variables["LIBDEFLATE_BUILD_SHARED_LIB"] = self.options.shared
-        tc.variables["LIBDEFLATE_BUILD_GZIP"] = False
+        tc.variables["LIBDEFLATE_BUILD_GZIP"] = self.options.build_programs
+        tc.variables["LIBDEFLATE_USE_SHARED_LIB"] = self.options.shared
         tc.variables["LIBDEFLATE_BUILD_TESTS"] = False
+        cpu_baseline = self.options.get_safe("cpu_baseline")
+        if cpu_baseline:
+            # libdeflate selects its SIMD code paths from the predefined macros of the compiler
+            # (__AVX2__, __PCLMUL__, __ARM_FEATURE_CRC32...), never by running a program of the target,
+            # so they are kept when cross-building. Those enabled by these flags need no runtime detection.
+            flags = " ".join(self._cpu_baseline_flags[str(cpu_baseline)])
+            tc.blocks["cmake_flags_init"].template += f'\nstring(APPEND CMAKE_C_FLAGS_INIT " {flags}")'
         tc.generate()
 
     def build(self):
@@ -76,3 +139,6 @@ class LibdeflateConan(ConanFile):
         self.cpp_info.components["_libdeflate"].names["cmake_find_package_multi"] = f"libdeflate{target_suffix}"
         self.cpp_info.components["_libdeflate"].set_property("cmake_target_name", f"libdeflate::libdeflate{target_suffix}")
         self.cpp_info.components["_libdeflate"].set_property("pkg_config_name", "libdeflate")
+        if self.options.build_programs:
+            bindir = os.path.join(self.package_folder, "bin")
+            self.env_info.PATH.append(bindir)
@@ -21,10 +21,25 @@ class LZ4Conan(ConanFile):
     options = {
         "shared": [True, False],
         "fPIC": [True, False],
+        "memory_usage": [10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20],
+        "fast_decoding_loop": [True, False, "auto"],
+        "heap_mode": [True, False],
+        "build_programs": [True, False],
     }
     default_options = {
         "shared": False,
         "fPIC": True,
+        "memory_usage": 14,
+        "fast_decoding_loop": "auto",
+        "heap_mode": False,
+        "build_programs": False,
+    }
+    options_description = {
+        "memory_usage": "LZ4_MEMORY_USAGE, log2 of the size of the hash table in bytes: bigger tables improve "
+                        "the ratio but use more cache",
+        "fast_decoding_loop": "LZ4_FAST_DEC_LOOP, auto enables it on x86 and x86_64, and on aarch64 except with clang",
+        "heap_mode": "LZ4_HEAPMODE, allocate the compression state on the heap instead of the stack",
+        "build_programs": "Build and package the lz4 program",
     }
 
     def export_sources(self):
@@ -49,7 +64,7 @@ class LZ4Conan(ConanFile):
 
     def generate(self):
         tc = CMakeToolchain(self)
-        tc.variables["LZ4_BUILD_CLI"] = False
+        tc.variables["LZ4_BUILD_CLI"] = self.options.build_programs
         if Version(self.version) < "1.10.0":
             tc.variables["LZ4_BUILD_LEGACY_LZ4C"] = False
         tc.variables["LZ4_BUNDLED_MODE"] = False
@@ -58,6 +73,12 @@ class LZ4Conan(ConanFile):
         tc.cache_variables["CMAKE_POLICY_DEFAULT_CMP0042"] = "NEW"
         # Honor BUILD_SHARED_LIBS (see https://github.com/conan-io/conan/issues/11840)
         tc.cache_variables["CMAKE_POLICY_DEFAULT_CMP0077"] = "NEW"
+        if self.options.memory_usage != 14:
+            tc.preprocessor_definitions["LZ4_MEMORY_USAGE"] = self.options.memory_usage
+        if self.options.fast_decoding_loop != "auto":
+            tc.preprocessor_definitions["LZ4_FAST_DEC_LOOP"] = 1 if self.options.fast_decoding_loop else 0
+        if self.options.heap_mode:
+            tc.preprocessor_definitions["LZ4_HEAPMODE"] = 1
         tc.generate()
 
     @property
@@ -113,6 +134,11 @@ class LZ4Conan(ConanFile):
         self.cpp_info.libs = ["lz4"]
         if is_msvc(self) and self.options.shared:
             self.cpp_info.defines.append("LZ4_DLL_IMPORT=1")
+        if self.options.memory_usage != 14:
+            # The size of LZ4_stream_t depends on it, consumers must see the same value
+            self.cpp_info.defines.append(f"LZ4_MEMORY_USAGE={self.options.memory_usage}")
+        if self.options.build_programs:
+            self.env_info.PATH.append(os.path.join(self.package_folder, "bin"))
 
         # TODO: to remove in conan v2 once legacy generators removed
         self.cpp_info.build_modules["cmake_find_package"] = [self._module_file_rel_path]
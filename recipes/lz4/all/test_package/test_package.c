@@ -9,5 +9,6 @@ int main(int argc, char** argv)
 {
 	(void)argc; (void)argv;
     printf("Hello World ! LZ4 Library version = %d\n", LZ4_versionNumber());
+    printf("LZ4_MEMORY_USAGE = %d, sizeof(LZ4_stream_t) = %u\n", LZ4_MEMORY_USAGE, (unsigned)sizeof(LZ4_stream_t));
     return 0;
 }
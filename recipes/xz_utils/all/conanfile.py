@@ -28,10 +28,21 @@ class XZUtilsConan(ConanFile):
     options = {
         "shared": [True, False],
         "fPIC": [True, False],
+        "threading": [True, False],
+        "build_programs": [True, False],
+        "small": [True, False],
     }
     default_options = {
         "shared": False,
         "fPIC": True,
+        "threading": True,
+        "build_programs": True,
+        "small": False,
+    }
+    options_description = {
+        "threading": "Multithreaded .xz encoder, and decoder since 5.4 (lzma_stream_encoder_mt, lzma_stream_decoder_mt)",
+        "build_programs": "Build and package the xz, xzdec, lzmadec and lzmainfo programs, and the scripts",
+        "small": "Optimize liblzma for size instead of speed",
     }
 
     @property
@@ -57,6 +68,11 @@ class XZUtilsConan(ConanFile):
     def config_options(self):
         if self.settings.os == "Windows":
             del self.options.fPIC
+        if is_msvc(self):
+            # The Visual Studio projects only build liblzma, with threads
+            del self.options.threading
+            del self.options.build_programs
+            del self.options.small
 
     def configure(self):
         if self.options.shared:
@@ -88,6 +104,19 @@ class XZUtilsConan(ConanFile):
             tc.configure_args.append("--disable-doc")
             if self.settings.build_type == "Debug":
                 tc.configure_args.append("--enable-debug")
+            if not self.options.threading:
+                tc.configure_args.append("--disable-threads")
+            if not self.options.build_programs:
+                tc.configure_args.extend([
+                    "--disable-xz",
+                    "--disable-xzdec",
+                    "--disable-lzmadec",
+                    "--disable-lzmainfo",
+                    "--disable-lzma-links",
+                    "--disable-scripts",
+                ])
+            if self.options.small:
+                tc.configure_args.append("--enable-small")
             tc.generate()
 
     @property
@@ -192,8 +221,10 @@ class XZUtilsConan(ConanFile):
         self.cpp_info.libs = ["lzma"]
         if not self.options.shared:
             self.cpp_info.defines.append("LZMA_API_STATIC")
-        if self.settings.os in ["Linux", "FreeBSD"]:
+        if self.settings.os in ["Linux", "FreeBSD"] and self.options.get_safe("threading", True):
             self.cpp_info.system_libs.append("pthread")
+        if self.options.get_safe("build_programs"):
+            self.env_info.PATH.append(os.path.join(self.package_folder, "bin"))
 
         # TODO: to remove in conan v2 once cmake_find_package* & pkg_config generators removed
         self.cpp_info.names["cmake_find_package"] = "LibLZMA"
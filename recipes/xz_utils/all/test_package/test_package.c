@@ -1,8 +1,99 @@
 #include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
 #include <lzma.h>
 
+#ifdef XZ_UTILS_THREADING
+#define INPUT_SIZE (4 * 1024 * 1024)
+
+/* Run a stream over the whole input, returns the size of the output or 0 on error */
+static size_t code(lzma_stream* strm, const uint8_t* in, size_t in_size, uint8_t* out, size_t out_size) {
+    lzma_ret ret;
+    strm->next_in = in;
+    strm->avail_in = in_size;
+    strm->next_out = out;
+    strm->avail_out = out_size;
+    do {
+        ret = lzma_code(strm, LZMA_FINISH);
+    } while (ret == LZMA_OK);
+    if (ret != LZMA_STREAM_END) {
+        fprintf(stderr, "lzma_code failed: %d\n", (int)ret);
+        return 0;
+    }
+    return out_size - strm->avail_out;
+}
+
+/* Compress with several blocks, so that the multithreaded decoder decodes them in parallel */
+static int test_multithreading(void) {
+    lzma_stream strm = LZMA_STREAM_INIT;
+    lzma_mt encoder_options;
+    uint8_t* input = malloc(INPUT_SIZE);
+    size_t compressed_capacity = lzma_stream_buffer_bound(INPUT_SIZE);
+    uint8_t* compressed = malloc(compressed_capacity);
+    uint8_t* decompressed = malloc(INPUT_SIZE);
+    size_t compressed_size, decompressed_size;
+    size_t i;
+    int result = EXIT_FAILURE;
+
+    for (i = 0; i < INPUT_SIZE; ++i) {
+        input[i] = (uint8_t)((i * 7) ^ (i >> 11));
+    }
+
+    memset(&encoder_options, 0, sizeof(encoder_options));
+    encoder_options.threads = 2;
+    encoder_options.block_size = 512 * 1024;
+    encoder_options.preset = 1;
+    encoder_options.check = LZMA_CHECK_CRC64;
+    if (lzma_stream_encoder_mt(&strm, &encoder_options) != LZMA_OK) {
+        fprintf(stderr, "lzma_stream_encoder_mt failed\n");
+        goto cleanup;
+    }
+    compressed_size = code(&strm, input, INPUT_SIZE, compressed, compressed_capacity);
+    if (compressed_size == 0) {
+        goto cleanup;
+    }
+
+#if LZMA_VERSION >= 50040002
+    {
+        lzma_mt decoder_options;
+        memset(&decoder_options, 0, sizeof(decoder_options));
+        decoder_options.threads = 2;
+        decoder_options.memlimit_threading = 256 * 1024 * 1024;
+        decoder_options.memlimit_stop = UINT64_MAX;
+        if (lzma_stream_decoder_mt(&strm, &decoder_options) != LZMA_OK) {
+            fprintf(stderr, "lzma_stream_decoder_mt failed\n");
+            goto cleanup;
+        }
+    }
+#else
+    if (lzma_stream_decoder(&strm, UINT64_MAX, 0) != LZMA_OK) {
+        fprintf(stderr, "lzma_stream_decoder failed\n");
+        goto cleanup;
+    }
+#endif
+    decompressed_size = code(&strm, compressed, compressed_size, decompressed, INPUT_SIZE);
+    if (decompressed_size != INPUT_SIZE || memcmp(input, decompressed, INPUT_SIZE) != 0) {
+        fprintf(stderr, "multithreaded round-trip failed\n");
+        goto cleanup;
+    }
+    printf("Multithreaded round-trip: %u bytes compressed to %u bytes\n", (unsigned)INPUT_SIZE,
+           (unsigned)compressed_size);
+    result = EXIT_SUCCESS;
+
+cleanup:
+    lzma_end(&strm);
+    free(decompressed);
+    free(compressed);
+    free(input);
+    return result;
+}
+#endif
+
 int main() {
     printf("LZMA version %s\n", lzma_version_string());
+#ifdef XZ_UTILS_THREADING
+    return test_multithreading();
+#else
     return EXIT_SUCCESS;
+#endif
 }
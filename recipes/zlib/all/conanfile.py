@@ -1,6 +1,8 @@
 from conan import ConanFile
+from conan.tools.apple import fix_apple_shared_install_name
 from conan.tools.cmake import CMake, CMakeToolchain, cmake_layout
-from conan.tools.files import apply_conandata_patches, export_conandata_patches, get, load, replace_in_file, save
+from conan.tools.files import apply_conandata_patches, copy, export_conandata_patches, get, load, rename, replace_in_file, rmdir, save
+from conan.tools.microsoft import is_msvc
 from conan.tools.scm import Version
 import os
 
@@ -21,22 +23,45 @@ class ZlibConan(ConanFile):
     options = {
         "shared": [True, False],
         "fPIC": [True, False],
+        "implementation": ["zlib", "zlib-ng"],
     }
     default_options = {
         "shared": False,
         "fPIC": True,
+        "implementation": "zlib",
+    }
+    options_description = {
+        "implementation": "zlib-ng builds zlib-ng in compatibility mode, with the API, library names and targets of zlib",
     }
 
     @property
     def _is_mingw(self):
         return self.settings.os == "Windows" and self.settings.compiler == "gcc"
 
+    @property
+    def _zlib_ng(self):
+        # zlib-ng in compatibility mode: same API, ABI and library name, faster (de)compression with
+        # SIMD code paths selected at runtime
+        return self.options.get_safe("implementation") == "zlib-ng"
+
+    @property
+    def _libname(self):
+        if self.settings.os == "Windows" and not self._is_mingw:
+            return "zdll" if self.options.shared else "zlib"
+        return "z"
+
+    @property
+    def _zlib_ng_source_folder(self):
+        return os.path.join(self.build_folder, "zlib-ng")
+
     def export_sources(self):
         export_conandata_patches(self)
 
     def config_options(self):
         if self.settings.os == "Windows":
             del self.options.fPIC
+        if self.version not in self.conan_data.get("zlib_ng_sources", {}):
+            del self.options.implementation
 
     def configure(self):
         if self.options.shared:
@@ -53,6 +78,17 @@ class ZlibConan(ConanFile):
 
     def generate(self):
         tc = CMakeToolchain(self)
+        if self._zlib_ng:
+            tc.variables["ZLIB_COMPAT"] = True
+            tc.variables["ZLIB_ENABLE_TESTS"] = False
+            tc.variables["ZLIBNG_ENABLE_TESTS"] = False
+            tc.variables["WITH_GTEST"] = False
+            tc.variables["WITH_GZFILEOP"] = True
+            # The package must run on every CPU of the arch
+            tc.variables["WITH_NATIVE_INSTRUCTIONS"] = False
+            tc.variables["WITH_RUNTIME_CPU_DETECTION"] = True
+            tc.generate()
+            return
         tc.variables["SKIP_INSTALL_ALL"] = False
         tc.variables["SKIP_INSTALL_LIBRARIES"] = False
         tc.variables["SKIP_INSTALL_HEADERS"] = False
@@ -80,9 +116,15 @@ class ZlibConan(ConanFile):
                                       '#if defined(HAVE_STDARG_H) && (1-HAVE_STDARG_H-1 != 0)')
 
     def build(self):
-        self._patch_sources()
         cmake = CMake(self)
-        cmake.configure()
+        if self._zlib_ng:
+            # Sources depending on an option are fetched in build(), the source folder is shared by every package
+            get(self, **self.conan_data["zlib_ng_sources"][self.version],
+                destination=self._zlib_ng_source_folder, strip_root=True)
+            cmake.configure(build_script_folder=self._zlib_ng_source_folder)
+        else:
+            self._patch_sources()
+            cmake.configure()
         cmake.build()
 
     def _extract_license(self):
@@ -91,20 +133,45 @@ class ZlibConan(ConanFile):
         return license_contents
 
     def package(self):
-        save(self, os.path.join(self.package_folder, "licenses", "LICENSE"), self._extract_license())
+        if self._zlib_ng:
+            copy(self, "LICENSE.md", src=self._zlib_ng_source_folder, dst=os.path.join(self.package_folder, "licenses"))
+        else:
+            save(self, os.path.join(self.package_folder, "licenses", "LICENSE"), self._extract_license())
         cmake = CMake(self)
         cmake.install()
+        if self._zlib_ng:
+            rmdir(self, os.path.join(self.package_folder, "lib", "pkgconfig"))
+            rmdir(self, os.path.join(self.package_folder, "lib", "cmake"))
+            if self.settings.os == "Windows":
+                self._rename_zlib_ng_library()
+            fix_apple_shared_install_name(self)
+
+    def _rename_zlib_ng_library(self):
+        # zlib-ng names its Windows libraries differently (zlibstatic, d suffix in Debug...), while some consumers
+        # link zlib by name: https://github.com/zlib-ng/zlib-ng/blob/2.1.7/CMakeLists.txt#L1005-L1024
+        base = "zlib" if is_msvc(self) or self.options.shared else "z"
+        static_flag = "static" if is_msvc(self) and not self.options.shared else ""
+        build_type = "d" if self.settings.build_type == "Debug" else ""
+        zlib_ng_libname = f"{base}{static_flag}{build_type}"
+        if zlib_ng_libname == self._libname:
+            return
+        if is_msvc(self):
+            pattern = "{}.lib"
+        else:
+            pattern = "lib{}.dll.a" if self.options.shared else "lib{}.a"
+        lib_folder = os.path.join(self.package_folder, "lib")
+        rename(self, os.path.join(lib_folder, pattern.format(zlib_ng_libname)),
+                     os.path.join(lib_folder, pattern.format(self._libname)))
 
     def package_info(self):
         self.cpp_info.set_property("cmake_find_mode", "both")
         self.cpp_info.set_property("cmake_file_name", "ZLIB")
         self.cpp_info.set_property("cmake_target_name", "ZLIB::ZLIB")
         self.cpp_info.set_property("pkg_config_name", "zlib")
-        if self.settings.os == "Windows" and not self._is_mingw:
-            libname = "zdll" if self.options.shared else "zlib"
-        else:
-            libname = "z"
-        self.cpp_info.libs = [libname]
+        self.cpp_info.libs = [self._libname]
+        if self._zlib_ng:
+            # Same defines as the zlib-ng package built with zlib_compat and with_gzfileop
+            self.cpp_info.defines.extend(["ZLIB_COMPAT", "WITH_GZFILEOP"])
 
         self.cpp_info.names["cmake_find_package"] = "ZLIB"
         self.cpp_info.names["cmake_find_package_multi"] = "ZLIB"
@@ -27,6 +27,9 @@ int main(void) {
     printf("Compressed string is: %s\n", buffer_out);
 
     printf("ZLIB VERSION: %s\n", zlibVersion());
+#ifdef ZLIBNG_VERSION
+    printf("ZLIB-NG VERSION: %s\n", ZLIBNG_VERSION);
+#endif
 
     return EXIT_SUCCESS;
 }
@@ -1,6 +1,9 @@
 from conan import ConanFile
+from conan.errors import ConanInvalidConfiguration
 from conan.tools.cmake import CMake, CMakeToolchain, cmake_layout
 from conan.tools.files import apply_conandata_patches, collect_libs, copy, export_conandata_patches, get, replace_in_file, rmdir, rm
+from conan.tools.microsoft import is_msvc
+from conan.tools.scm import Version
 import glob
 import os
 
@@ -21,12 +24,26 @@ class ZstdConan(ConanFile):
         "fPIC": [True, False],
         "threading": [True, False],
         "build_programs": [True, False],
+        "legacy_support": [True, False],
+        "dictionary_builder": [True, False],
+        "asm": [True, False],
+        "with_bmi2": [True, False, "auto"],
     }
     default_options = {
         "shared": False,
         "fPIC": True,
         "threading": True,
         "build_programs": True,
+        "legacy_support": True,
+        "dictionary_builder": True,
+        "asm": True,
+        "with_bmi2": "auto",
+    }
+    options_description = {
+        "legacy_support": "Decode the frames of the formats older than v0.8 (zstd 1.0)",
+        "dictionary_builder": "Include the dictionary builder (ZDICT_train*) in the library, required by the programs",
+        "asm": "Use the x86_64 assembly Huffman decoder",
+        "with_bmi2": "Use BMI2 instructions: always (True), never (False) or after a runtime CPU check (auto)",
     }
 
     def export_sources(self):
@@ -35,6 +52,11 @@ class ZstdConan(ConanFile):
     def config_options(self):
         if self.settings.os == "Windows":
             del self.options.fPIC
+        if self.settings.arch != "x86_64":
+            del self.options.with_bmi2
+        if self.settings.arch != "x86_64" or is_msvc(self) or Version(self.version) < "1.5.2":
+            # The assembly decoder is never built by msvc
+            del self.options.asm
 
     def configure(self):
         if self.options.shared:
@@ -42,6 +64,11 @@ class ZstdConan(ConanFile):
         self.settings.rm_safe("compiler.cppstd")
         self.settings.rm_safe("compiler.libcxx")
 
+    def validate(self):
+        if self.options.build_programs and not self.options.dictionary_builder:
+            raise ConanInvalidConfiguration(f"{self.ref} programs need the dictionary builder, "
+                                            "set dictionary_builder=True or build_programs=False")
+
     def layout(self):
         cmake_layout(self, src_folder="src")
 
@@ -54,6 +81,16 @@ class ZstdConan(ConanFile):
         tc.variables["ZSTD_BUILD_STATIC"] = not self.options.shared or self.options.build_programs
         tc.variables["ZSTD_BUILD_SHARED"] = self.options.shared
         tc.variables["ZSTD_MULTITHREAD_SUPPORT"] = self.options.threading
+        tc.variables["ZSTD_LEGACY_SUPPORT"] = self.options.legacy_support
+        if not self.options.get_safe("asm", True):
+            tc.preprocessor_definitions["ZSTD_DISABLE_ASM"] = 1
+        with_bmi2 = str(self.options.get_safe("with_bmi2", "auto"))
+        if with_bmi2 == "False":
+            tc.preprocessor_definitions["DYNAMIC_BMI2"] = 0
+        elif with_bmi2 == "True":
+            # zstd defines STATIC_BMI2 from __BMI2__, or from __AVX2__ with msvc
+            bmi2_flag = "/arch:AVX2" if is_msvc(self) else "-mbmi2"
+            tc.blocks["cmake_flags_init"].template += f'\nstring(APPEND CMAKE_C_FLAGS_INIT " {bmi2_flag}")'
         tc.generate()
 
     def _patch_sources(self):
@@ -61,6 +98,10 @@ class ZstdConan(ConanFile):
         # Don't force PIC
         replace_in_file(self, os.path.join(self.source_folder, "build", "cmake", "lib", "CMakeLists.txt"),
                               "POSITION_INDEPENDENT_CODE On", "")
+        if not self.options.dictionary_builder:
+            replace_in_file(self, os.path.join(self.source_folder, "build", "cmake", "lib", "CMakeLists.txt"),
+                                  "file(GLOB DictBuilderSources ${LIBRARY_DIR}/dictBuilder/*.c)",
+                                  "set(DictBuilderSources)")
 
     def build(self):
         self._patch_sources()
@@ -75,6 +116,9 @@ class ZstdConan(ConanFile):
         rmdir(self, os.path.join(self.package_folder, "lib", "cmake"))
         rmdir(self, os.path.join(self.package_folder, "lib", "pkgconfig"))
         rmdir(self, os.path.join(self.package_folder, "share"))
+        if not self.options.dictionary_builder:
+            # Installed even without the dictBuilder sources, its ZDICT_* functions would not link
+            rm(self, "zdict.h", os.path.join(self.package_folder, "include"))
 
         if self.options.shared and self.options.build_programs:
             # If we build programs we have to build static libs (see logic in generate()),
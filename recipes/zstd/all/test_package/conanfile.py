@@ -1,12 +1,12 @@
 from conan import ConanFile
 from conan.tools.build import can_run
-from conan.tools.cmake import CMake, cmake_layout
+from conan.tools.cmake import CMake, CMakeToolchain, cmake_layout
 import os
 
 
 class TestPackageConan(ConanFile):
     settings = "os", "arch", "compiler", "build_type"
-    generators = "CMakeToolchain", "CMakeDeps", "VirtualRunEnv"
+    generators = "CMakeDeps", "VirtualRunEnv"
     test_type = "explicit"
 
     def layout(self):
@@ -15,6 +15,11 @@ class TestPackageConan(ConanFile):
     def requirements(self):
         self.requires(self.tested_reference_str, run=True)
 
+    def generate(self):
+        tc = CMakeToolchain(self)
+        tc.variables["ZSTD_DICTIONARY_BUILDER"] = self.dependencies["zstd"].options.dictionary_builder
+        tc.generate()
+
     def build(self):
         cmake = CMake(self)
         cmake.configure()
@@ -26,3 +31,6 @@ class TestPackageConan(ConanFile):
 
         bin_path = os.path.join(self.cpp.build.bindirs[0], "test_package")
         self.run(bin_path, env="conanrun")
+        # conan create . --version=x.y.z -c user.zstd:benchmark=True
+        if self.conf.get("user.zstd:benchmark", default=False, check_type=bool):
+            self.run(f"{bin_path} --benchmark", env="conanrun")
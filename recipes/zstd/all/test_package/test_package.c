@@ -1,12 +1,147 @@
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
+#include <time.h>
 #include <zstd.h>
+#ifdef ZSTD_DICTIONARY_BUILDER
+#include <zdict.h>
+#endif
 
-int main() {
+#define RECORD_COUNT 20000
+#define RECORD_CAPACITY 256
+#define DICTIONARY_CAPACITY (16 * 1024)
+
+/* Small JSON records, similar to each other but not identical */
+static size_t make_records(char* records, size_t* sizes) {
+    static const char* const kinds[] = {"click", "view", "purchase", "search"};
+    unsigned int state = 12345;
+    size_t total = 0;
+    int i;
+    for (i = 0; i < RECORD_COUNT; ++i) {
+        int length;
+        state = state * 1103515245u + 12345u;
+        length = snprintf(records + total, RECORD_CAPACITY,
+                          "{\"id\":%d,\"user\":\"user-%u\",\"event\":\"%s\",\"value\":%u,\"tags\":[\"a%u\",\"b%u\"]}",
+                          i, (state >> 8) % 5000, kinds[(state >> 4) % 4], state % 100000,
+                          (state >> 12) % 16, (state >> 16) % 16);
+        sizes[i] = (size_t)length;
+        total += (size_t)length;
+    }
+    return total;
+}
+
+static double seconds(clock_t start) {
+    return (double)(clock() - start) / CLOCKS_PER_SEC;
+}
+
+/* Compress and decompress every record on its own, with or without dictionaries */
+static int benchmark_level(const char* records, const size_t* sizes, size_t total, int level,
+                           const void* dictionary, size_t dictionary_size) {
+    ZSTD_CCtx* cctx = ZSTD_createCCtx();
+    ZSTD_DCtx* dctx = ZSTD_createDCtx();
+    ZSTD_CDict* cdict = dictionary ? ZSTD_createCDict(dictionary, dictionary_size, level) : NULL;
+    ZSTD_DDict* ddict = dictionary ? ZSTD_createDDict(dictionary, dictionary_size) : NULL;
+    size_t bound = ZSTD_compressBound(RECORD_CAPACITY);
+    char* compressed = malloc(bound * RECORD_COUNT);
+    size_t* compressed_sizes = malloc(sizeof(size_t) * RECORD_COUNT);
+    char decompressed[RECORD_CAPACITY];
+    size_t compressed_total = 0;
+    size_t offset = 0;
+    double compress_time, decompress_time;
+    clock_t start;
+    int i, result = 0;
+
+    start = clock();
+    for (i = 0; i < RECORD_COUNT; ++i) {
+        size_t size = cdict
+            ? ZSTD_compress_usingCDict(cctx, compressed + i * bound, bound, records + offset, sizes[i], cdict)
+            : ZSTD_compressCCtx(cctx, compressed + i * bound, bound, records + offset, sizes[i], level);
+        if (ZSTD_isError(size)) {
+            fprintf(stderr, "compression failed: %s\n", ZSTD_getErrorName(size));
+            result = 1;
+            goto cleanup;
+        }
+        compressed_sizes[i] = size;
+        compressed_total += size;
+        offset += sizes[i];
+    }
+    compress_time = seconds(start);
+
+    start = clock();
+    offset = 0;
+    for (i = 0; i < RECORD_COUNT; ++i) {
+        size_t size = ddict
+            ? ZSTD_decompress_usingDDict(dctx, decompressed, sizeof(decompressed), compressed + i * bound,
+                                         compressed_sizes[i], ddict)
+            : ZSTD_decompressDCtx(dctx, decompressed, sizeof(decompressed), compressed + i * bound,
+                                  compressed_sizes[i]);
+        if (ZSTD_isError(size) || size != sizes[i] || memcmp(decompressed, records + offset, size) != 0) {
+            fprintf(stderr, "record %d does not round-trip\n", i);
+            result = 1;
+            goto cleanup;
+        }
+        offset += sizes[i];
+    }
+    decompress_time = seconds(start);
+
+    printf("%-10s level %3d: ratio %5.2f, compression %8.1f MB/s, decompression %8.1f MB/s\n",
+           dictionary ? "dictionary" : "plain", level, (double)total / compressed_total,
+           total / 1e6 / (compress_time > 0 ? compress_time : 1e-9),
+           total / 1e6 / (decompress_time > 0 ? decompress_time : 1e-9));
+
+cleanup:
+    free(compressed_sizes);
+    free(compressed);
+    ZSTD_freeDDict(ddict);
+    ZSTD_freeCDict(cdict);
+    ZSTD_freeDCtx(dctx);
+    ZSTD_freeCCtx(cctx);
+    return result;
+}
+
+static int benchmark(void) {
+    static const int levels[] = {-5, -1, 1, 3, 6, 9, 12, 15, 19};
+    char* records = malloc(RECORD_CAPACITY * RECORD_COUNT);
+    size_t* sizes = malloc(sizeof(size_t) * RECORD_COUNT);
+    size_t total = make_records(records, sizes);
+    void* dictionary = NULL;
+    size_t dictionary_size = 0;
+    size_t i;
+    int result = 0;
+
+    printf("%d records, %zu bytes\n", RECORD_COUNT, total);
+#ifdef ZSTD_DICTIONARY_BUILDER
+    dictionary = malloc(DICTIONARY_CAPACITY);
+    dictionary_size = ZDICT_trainFromBuffer(dictionary, DICTIONARY_CAPACITY, records, sizes, RECORD_COUNT);
+    if (ZDICT_isError(dictionary_size)) {
+        fprintf(stderr, "dictionary training failed: %s\n", ZDICT_getErrorName(dictionary_size));
+        free(dictionary);
+        dictionary = NULL;
+        result = 1;
+    } else {
+        printf("trained a %zu bytes dictionary\n", dictionary_size);
+    }
+#endif
+    for (i = 0; i < sizeof(levels) / sizeof(levels[0]) && result == 0; ++i) {
+        result = benchmark_level(records, sizes, total, levels[i], NULL, 0);
+        if (result == 0 && dictionary) {
+            result = benchmark_level(records, sizes, total, levels[i], dictionary, dictionary_size);
+        }
+    }
+
+    free(dictionary);
+    free(sizes);
+    free(records);
+    return result;
+}
+
+int main(int argc, char** argv) {
     const char* originalData = "Sample text";
     size_t compressedSize = ZSTD_compressBound(strlen(originalData) + 1);
     printf("%zu\n", compressedSize);
 
+    if (argc > 1 && strcmp(argv[1], "--benchmark") == 0) {
+        return benchmark();
+    }
     return 0;
 }